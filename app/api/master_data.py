@@ -6,7 +6,8 @@ products, qualities, variables, specifications, and sample matrices.
 Provides Excel import/export functionality for batch data management.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
@@ -15,10 +16,12 @@ import os
 import tempfile
 
 from ..database.connection import get_db
-from ..services.master_data_service import MasterDataService, MasterDataQuery
+from ..services.master_data_service import MasterDataService, MasterDataQuery, table_types
+from ..services.job_service import JobService
 from ..services.auth_service import get_current_user
 from ..models.user import User
-import openpyxl
+from ..utils.http import cache_headers, content_etag, is_not_modified
+from ..core.config import settings
 
 router = APIRouter(prefix="/api/master-data", tags=["master-data"])
 
@@ -64,18 +67,26 @@ class SamplePointResponse(BaseModel):
 @router.get("/download/{table_type}")
 async def download_master_data_template(
     table_type: str,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     master_data_query = MasterDataQuery(db)
     
     try:
-        excel_path = await master_data_query.export_to_excel(table_type)
+        # Unchanged data: the client copy is still valid
+        etag, last_modified = master_data_query.export_version(table_type)
+        if is_not_modified(request, etag, last_modified):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED,
+                            headers=cache_headers(etag, last_modified))
+
+        excel_path, etag, last_modified = await master_data_query.export_cached(table_type)
         
         return FileResponse(
             path=excel_path,
             media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            filename=f"{table_type}.xlsx"
+            filename=f"{table_type}.xlsx",
+            headers=cache_headers(etag, last_modified)
         )
     
     except Exception as e:
@@ -108,6 +119,13 @@ async def upload_master_data(
                 detail="Only Excel files (.xlsx, .xls) are supported"
             )
 
+        # Validate file size (the service checks it again on the stream)
+        if file.size is not None and file.size > settings.MAX_FILE_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File too large. Maximum allowed size is {settings.MAX_FILE_SIZE} bytes"
+            )
+
         # Process the uploaded file
         result = await master_data_service.import_from_excel(
             file=file,
@@ -133,6 +151,8 @@ async def upload_master_data(
 
         return response
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -140,6 +160,70 @@ async def upload_master_data(
         )
 
 
+@router.post("/upload-async", status_code=status.HTTP_202_ACCEPTED)
+async def upload_master_data_async(
+    table_type: str,
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user)
+):
+    """Queue an Excel upload as a background job and return its status URL"""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can upload master data"
+        )
+
+    if not file.filename.endswith(('.xlsx', '.xls')):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only Excel files (.xlsx, .xls) are supported"
+        )
+
+    if table_type not in table_types:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported table type: {table_type}. Valid table types: {table_types}"
+        )
+
+    try:
+        # The upload is copied to the job directory in a worker thread, off the event loop
+        job = await run_in_threadpool(
+            JobService().submit_master_data_import,
+            file.file, file.filename, table_type, current_user.name, current_user.id
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
+
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "status_url": f"/api/master-data/jobs/{job['id']}"
+    }
+
+
+@router.get("/jobs/{job_id}")
+async def get_master_data_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Get the status, progress and result of a master data import job (owner or admin only)"""
+    job = JobService().get_job(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found or has expired"
+        )
+    if job.get("user_id") != current_user.id and not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only the owner of the job or an administrator can view it"
+        )
+    return job
+
+
 @router.get("/download-errors/{filename}")
 async def download_error_file(
     filename: str,
@@ -174,52 +258,77 @@ async def download_error_file(
         )
 
 
+def _cached_response(request: Request, response: Response, items: list):
+    """
+    Return a cached lookup list with HTTP caching headers.
+
+    The ETag is computed from the content, so a browser revalidating an
+    unchanged list gets 304 Not Modified without the body.
+    """
+    etag = content_etag(items)
+    headers = cache_headers(etag, cache_control=f"private, max-age={settings.MASTER_DATA_CACHE_MAX_AGE}")
+    if is_not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return items
+
+
 @router.get("/products", response_model=List[ProductResponse])
 async def get_products(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get list of all products"""
     master_data_query = MasterDataQuery(db)
     products = await master_data_query.get_products()
-    return products
+    return _cached_response(request, response, products)
 
 
 @router.get("/qualities", response_model=List[QualityResponse])
 async def get_qualities(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get list of all qualities"""
     master_data_query = MasterDataQuery(db)
     qualities = await master_data_query.get_qualities()
-    return qualities
+    return _cached_response(request, response, qualities)
 
 
 @router.get("/sample-points", response_model=List[SamplePointResponse])
 async def get_sample_points(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get list of all sample points"""
     master_data_query = MasterDataQuery(db)
     sample_points = await master_data_query.get_sample_points()
-    return sample_points
+    return _cached_response(request, response, sample_points)
 
 
 @router.get("/variables", response_model=List[VariableResponse])
 async def get_variables(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get list of all variables"""
     master_data_query = MasterDataQuery(db)
     variables = await master_data_query.get_variables()
-    return variables
+    return _cached_response(request, response, variables)
 
 
 @router.get("/qualities-by-product/{product_id}", response_model=List[QualityResponse])
 async def get_qualities_by_product(
+    request: Request,
+    response: Response,
     product_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -227,7 +336,7 @@ async def get_qualities_by_product(
     """Get list of qualities filtered by product using spec table"""
     master_data_query = MasterDataQuery(db)
     qualities = await master_data_query.get_qualities_by_product(product_id)
-    return qualities
+    return _cached_response(request, response, qualities)
 
 
 class SpecIdResponse(BaseModel):
@@ -249,6 +358,8 @@ async def get_spec_id(
 
 @router.get("/sample-points-by-product-quality", response_model=List[SamplePointResponse])
 async def get_sample_points_by_product_quality(
+    request: Request,
+    response: Response,
     product_id: int,
     quality_id: int,
     db: Session = Depends(get_db),
@@ -257,4 +368,4 @@ async def get_sample_points_by_product_quality(
     """Get sample points filtered by product and quality using samplematrix"""
     master_data_query = MasterDataQuery(db)
     sample_points = await master_data_query.get_sample_points_by_product_quality(product_id, quality_id)
-    return sample_points
+    return _cached_response(request, response, sample_points)
@@ -13,7 +13,6 @@ from pydantic import BaseModel
 from typing import Optional, List
 
 from ..database.connection import get_db
-from ..services.report_service import ReportService
 from ..services.auth_service import get_current_user
 from ..models.user import User
 
@@ -26,19 +25,27 @@ class ReportRequest(BaseModel):
     filename: Optional[str] = None
 
 
+def _report_service(db: Session):
+    """Report service of a request. The report module (reportlab) is imported on the first report"""
+    from ..services.report_service import ReportService
+    return ReportService(db)
+
+
 @router.get("/coa/{sample_number}")
 async def generate_coa_report(
     sample_number: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    report_service = ReportService(db)
+    report_service = _report_service(db)
     
     try:
-        pdf_path = await report_service.generate_coa_report(
-            sample_number=sample_number,
-            username=current_user.name
-        )
+        pdf_path = report_service.get_prerendered_report("COA", sample_number, current_user.name)
+        if pdf_path is None:
+            pdf_path = await report_service.generate_coa_report(
+                sample_number=sample_number,
+                username=current_user.name
+            )
         
         return FileResponse(
             path=pdf_path,
@@ -59,13 +66,15 @@ async def generate_coc_report(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    report_service = ReportService(db)
+    report_service = _report_service(db)
     
     try:
-        pdf_path = await report_service.generate_coc_report(
-            sample_number=sample_number,
-            username=current_user.name
-        )
+        pdf_path = report_service.get_prerendered_report("COC", sample_number, current_user.name)
+        if pdf_path is None:
+            pdf_path = await report_service.generate_coc_report(
+                sample_number=sample_number,
+                username=current_user.name
+            )
         
         return FileResponse(
             path=pdf_path,
@@ -86,13 +95,15 @@ async def generate_day_certificate_report(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    report_service = ReportService(db)
+    report_service = _report_service(db)
     
     try:
-        pdf_path = await report_service.generate_day_certificate_report(
-            sample_number=sample_number,
-            username=current_user.name
-        )
+        pdf_path = report_service.get_prerendered_report("DAY_COA", sample_number, current_user.name)
+        if pdf_path is None:
+            pdf_path = await report_service.generate_day_certificate_report(
+                sample_number=sample_number,
+                username=current_user.name
+            )
         
         return FileResponse(
             path=pdf_path,
@@ -114,7 +125,7 @@ async def generate_custom_report(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    report_service = ReportService(db)
+    report_service = _report_service(db)
     
     try:
         if report_request.report_type == "COA":
@@ -6,15 +6,18 @@ creation, retrieval, measurement management, and automated sample loading
 from logistic data. Supports production, customer, and manual samples.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Body, UploadFile, File
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from datetime import date
 
+from ..core.config import settings
 from ..database.connection import get_db
 from ..services.sample_service import SampleService
 from ..services.sample_loading_service import SampleLoadingService
+from ..services.logistic_ingestion_service import LogisticIngestionService
+from ..services.production_scheduler import ProductionScheduler
 from ..services.auth_service import get_current_user
 from ..models.user import User
 
@@ -144,6 +147,7 @@ async def update_samples(
 
     Validates that all measurement values are within the allowed min/max range
     before updating. If any value is out of range, raises an error.
+    Completed samples get their certificates pre-rendered in the background.
 
     Args:
         samples: List of samples to update
@@ -155,6 +159,13 @@ async def update_samples(
     # Convert Pydantic models to dictionaries
     samples_dict = [sample.model_dump() for sample in samples]
     result = await sample_service.update_samples_batch(samples=samples_dict)
+
+    # Render the certificates of completed samples before anyone asks for them
+    from ..services.report_service import schedule_report_prerender
+    schedule_report_prerender(
+        [sample["sample_number"] for sample in samples_dict],
+        current_user.name
+    )
     return result
 
 
@@ -186,7 +197,8 @@ async def load_customer_samples(
     - Retrieves logistic data for the given date
     - Validates article codes against the map table
     - Checks for customer specifications
-    - Creates or updates customer samples
+    - Creates or updates customer samples, skipping the orders unchanged since the last load
+    - Removes the samples of orders no longer in the logistic data
     - Creates measurements based on specifications
 
     Migrated from MATLAB function: loadCustomerSample.m
@@ -211,13 +223,18 @@ async def load_customer_samples(
         "message": result['message'],
         "success": result['success'],
         "errors": result.get('errors'),
-        "pending_data": result.get('pending_data')
+        "pending_data": result.get('pending_data'),
+        "new": result['new'],
+        "changed": result['changed'],
+        "removed": result['removed'],
+        "unchanged": result['unchanged']
     }
 
 
 @router.post("/load-production-samples")
 async def load_production_samples(
     sample_date: str = Query(..., description="Sample date in YYYY-MM-DD format"),
+    end_date: Optional[str] = Query(None, description="Last date of a range in YYYY-MM-DD format"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -225,18 +242,23 @@ async def load_production_samples(
     Generate production samples based on sample matrix and frequency for the specified date.
 
     This endpoint:
-    - Checks if the date is the first day of any period (semester, quarter, month, week)
-    - Generates samples based on the sample matrix for matching frequencies
-    - Always generates daily samples
-    - Creates measurements based on specifications
+    - Looks up the sample matrices due on the date (or on each day up to end_date) in the
+      calendar of working days: daily, first working day of the week, month, quarter or
+      semester, and days with loadings for the loading frequencies
+    - Skips the sample matrices that already have a sample on the date
+    - Creates the samples and their measurements based on specifications in one bulk operation
 
     Migrated from MATLAB function: loadProductionSample.m
     """
     loading_service = SampleLoadingService(db)
-    result = await loading_service.load_production_samples(
-        sample_date=sample_date,
-        user_id=current_user.id
-    )
+    try:
+        result = await loading_service.load_production_samples(
+            sample_date=sample_date,
+            user_id=current_user.id,
+            end_date=end_date
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
     if not result['success'] and result.get('errors'):
         raise HTTPException(
@@ -250,7 +272,128 @@ async def load_production_samples(
     return {
         "message": result['message'],
         "success": result['success'],
-        "errors": result.get('errors')
+        "errors": result.get('errors'),
+        "created": result['created'],
+        "existing": result['existing']
+    }
+
+
+@router.get("/production-schedule")
+async def get_production_schedule(
+    start_date: str = Query(..., description="First date in YYYY-MM-DD format"),
+    end_date: str = Query(..., description="Last date in YYYY-MM-DD format"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the sample matrices due on every day of a range, without creating samples.
+    """
+    try:
+        schedule = ProductionScheduler(db).get_schedule(start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return {
+        day: [
+            {
+                "sample_matrix_id": matrix['id'],
+                "frequency": matrix['frequency'],
+                "product": matrix['Product'],
+                "quality": matrix['Quality'],
+                "sample_point": matrix['SamplePoint']
+            }
+            for matrix in matrices
+        ]
+        for day, matrices in schedule.items()
+    }
+
+
+class LogisticBatchRequest(BaseModel):
+    rows: List[Dict[str, Any]]
+    source: str = "api"
+    replace_dates: bool = False
+    reload_samples: bool = False
+
+
+async def _logistic_batch_response(service: LogisticIngestionService, result: Dict[str, Any],
+                                   reload_samples: bool, current_user: User) -> Dict[str, Any]:
+    if not result['success']:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "message": result['message'],
+                "errors": result['errors']
+            }
+        )
+
+    if reload_samples and result['changed_dates']:
+        result['reloaded'] = await service.reload_customer_samples(result['changed_dates'], current_user.id)
+    return result
+
+
+@router.post("/logistic-data")
+async def push_logistic_data(
+    request: LogisticBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Ingest a batch of logistic data rows.
+
+    Rows are upserted on order_number_pvs and loading date; the response lists
+    the dates whose logistic data changed, the only ones that need their
+    customer samples loaded again (done right away with reload_samples).
+    With replace_dates the batch is the complete data of its dates.
+    """
+    service = LogisticIngestionService(db)
+    result = service.ingest(request.rows, source=request.source, user_id=current_user.id,
+                            replace_dates=request.replace_dates)
+    return await _logistic_batch_response(service, result, request.reload_samples, current_user)
+
+
+@router.post("/logistic-data/upload")
+async def upload_logistic_data(
+    file: UploadFile = File(...),
+    source: str = Query("file", description="Name of the feed"),
+    replace_dates: bool = Query(False, description="The file holds all the logistic data of its dates"),
+    reload_samples: bool = Query(False, description="Load the customer samples of the changed dates"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Ingest a CSV or NDJSON file of logistic data.
+
+    See POST /logistic-data for the upsert and the changed dates.
+    """
+    if file.size is not None and file.size > settings.MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File too large. Maximum allowed size is {settings.MAX_FILE_SIZE} bytes"
+        )
+
+    service = LogisticIngestionService(db)
+    try:
+        rows = service.read_batch(file.file, file.filename)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    result = service.ingest(rows, source=source, filename=file.filename, user_id=current_user.id,
+                            replace_dates=replace_dates)
+    return await _logistic_batch_response(service, result, reload_samples, current_user)
+
+
+@router.get("/logistic-data/high-water-mark")
+async def get_logistic_high_water_mark(
+    source: Optional[str] = Query(None, description="Name of the feed (all feeds by default)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the latest loading date and time ingested, so a feed can send only newer rows.
+    """
+    return {
+        "source": source,
+        "high_water_mark": LogisticIngestionService(db).get_high_water_mark(source)
     }
 
 
@@ -327,6 +470,34 @@ async def create_sample(
     return response
 
 
+class RefreshSpecificationsRequest(BaseModel):
+    sample_numbers: List[str]
+
+
+@router.post("/refresh-specifications")
+async def refresh_samples_specifications(
+    refresh_request: RefreshSpecificationsRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Refresh the specifications of several samples in one batched pass.
+
+    Args:
+        refresh_request: Sample numbers to refresh
+
+    Returns:
+        Measurements by sample number and the sample numbers not found
+    """
+    sample_service = SampleService(db)
+    result = await sample_service.refresh_samples_specifications(refresh_request.sample_numbers)
+    return {
+        "message": f"Specifications refreshed for {len(result['measurements'])} samples",
+        "measurements": result["measurements"],
+        "not_found": result["not_found"]
+    }
+
+
 @router.post("/{sample_number}/refresh")
 async def refresh_sample_specifications(
     sample_number: str,
@@ -338,6 +509,36 @@ async def refresh_sample_specifications(
     return {"message": "Sample specifications refreshed successfully", "measurement":measurement}
 
 
+@router.get("/completion-status")
+async def get_samples_status(
+    sample_date: Optional[str] = Query(None, description="Sample date (YYYY-MM-DD)"),
+    sample_numbers: Optional[List[str]] = Query(None, description="Sample numbers"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the completion status of all samples of a date or of a list of samples.
+
+    Args:
+        sample_date: Sample date (YYYY-MM-DD)
+        sample_numbers: Sample numbers, repeated query parameter
+
+    Returns:
+        List of completion statuses, one per sample
+    """
+    if not sample_date and not sample_numbers:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide sample_date or sample_numbers"
+        )
+
+    sample_service = SampleService(db)
+    return await sample_service.get_samples_completion_status(
+        sample_date=sample_date,
+        sample_numbers=sample_numbers
+    )
+
+
 @router.get("/{sample_number}/status")
 async def get_sample_status(
     sample_number: str,
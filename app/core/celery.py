@@ -0,0 +1,53 @@
+"""
+Celery application module.
+
+Defines the Celery application run by the celery-worker and celery-beat
+services of docker-compose.yml (celery -A app.core.celery worker|beat) and the
+schedule of the daily sample loading. The tasks are defined in
+app/services/tasks.py.
+
+For local testing, CELERY_TASK_ALWAYS_EAGER=True runs the tasks in the calling
+process, so no broker or worker is needed.
+"""
+
+from celery import Celery
+from celery.schedules import crontab
+
+from .config import settings
+
+celery_app = Celery(
+    "lims",
+    broker=settings.CELERY_BROKER_URL,
+    backend=settings.CELERY_RESULT_BACKEND,
+    include=["app.services.tasks"]
+)
+
+celery_app.conf.update(
+    timezone=settings.CELERY_TIMEZONE,
+    enable_utc=True,
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    task_always_eager=settings.CELERY_TASK_ALWAYS_EAGER,
+    task_eager_propagates=True,
+    # A task is acknowledged when it finishes, so it is run again if its worker dies
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+    result_expires=settings.JOB_RETENTION_HOURS * 3600,
+)
+
+# crontab counts the days of the week from Sunday (0), WORKING_DAYS from Monday (0)
+working_days = ",".join(str((day + 1) % 7) for day in settings.WORKING_DAYS)
+
+celery_app.conf.beat_schedule = {
+    "load-production-samples": {
+        "task": "app.services.tasks.load_production_samples",
+        "schedule": crontab(hour=settings.SAMPLE_LOAD_HOUR, minute=settings.SAMPLE_LOAD_MINUTE,
+                            day_of_week=working_days),
+    },
+    "load-customer-samples": {
+        "task": "app.services.tasks.load_customer_samples",
+        "schedule": crontab(hour=settings.SAMPLE_LOAD_HOUR, minute=settings.SAMPLE_LOAD_MINUTE,
+                            day_of_week=working_days),
+    },
+}
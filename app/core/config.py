@@ -44,6 +44,17 @@ class Settings(BaseSettings):
     DATABASE_USER: str
     DATABASE_PASSWORD: str
     DATABASE_DRIVER: str = "SQL Server"
+    AUTO_CREATE_TABLES: bool = False  # Create missing tables at startup; otherwise run python -m app.database.migrate
+    DB_POOL_SIZE: int = 0  # Connections kept open by each worker process (0 = NullPool, one connection per session)
+    DB_MAX_OVERFLOW: int = 10  # Extra connections a worker process may open under load
+    
+    # Server Settings (gunicorn.conf.py)
+    WORKERS: int = 0  # Worker processes; 0 = one per CPU core
+    WORKER_TIMEOUT: int = 120  # Seconds a busy worker may go without notifying the master before it is restarted
+    GRACEFUL_TIMEOUT: int = 30  # Seconds a worker has to finish its requests on shutdown or reload
+    KEEPALIVE: int = 5  # Seconds an idle keep-alive connection is kept open
+    PRELOAD_APP: bool = True  # Import the application once in the master process before forking the workers
+    MAX_REQUESTS: int = 0  # Requests after which a worker is replaced (0 = never)
     
     # CORS Settings
     CORS_ORIGINS: list[str] = ["http://localhost:3000", "http://localhost:8080"]
@@ -55,19 +66,35 @@ class Settings(BaseSettings):
     UPLOAD_DIR: str = "uploads"
     REPORTS_DIR: str = "reports"
     TEMP_DIR: str = "temp"
+    EXPORT_CACHE_DIR: str = "temp/exports"  # Cached master data exports
+    EXPORT_CACHE_KEEP_MINUTES: int = 10  # Superseded exports are kept this long after they were last served
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
     
     # Logging Settings
     LOG_LEVEL: str = "INFO"
     LOG_FILE: str = "app.log"
+    SLOW_QUERY_MS: int = 500  # Statements slower than this are logged with redacted parameters
+    
+    # Master Data Cache Settings
+    MASTER_DATA_CACHE_TTL: int = 300  # Seconds a cached lookup list is reused by a worker
+    MASTER_DATA_CACHE_MAX_AGE: int = 60  # Seconds browsers may reuse a lookup response
     
     # Pagination Settings
     DEFAULT_PAGE_SIZE: int = 50
     MAX_PAGE_SIZE: int = 1000
     
     # Background Tasks Settings
+    IMPORT_JOB_WORKERS: int = 2  # Threads running master data import jobs per process
+    JOB_RETENTION_HOURS: int = 72  # Finished job records older than this are removed
+    REPORT_PRERENDER_WORKERS: int = 2  # Threads pre-rendering certificates of completed samples
+    USE_CELERY: bool = False  # Queue imports and report pre-rendering to the Celery workers instead of the thread pools
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/0"
+    CELERY_TASK_ALWAYS_EAGER: bool = False  # Run tasks in the calling process (local testing, no worker needed)
+    CELERY_TIMEZONE: str = "Europe/Brussels"
+    SAMPLE_LOAD_HOUR: int = 6  # Local time of the scheduled daily sample loading (working days)
+    SAMPLE_LOAD_MINUTE: int = 0
+    SCHEDULER_USER_ID: int = 1  # tuser.id recorded as creator of the scheduled samples
     
     # Email Settings (Optional)
     SMTP_HOST: Optional[str] = None
@@ -116,6 +143,7 @@ class Settings(BaseSettings):
             self.UPLOAD_DIR,
             self.REPORTS_DIR,
             self.TEMP_DIR,
+            self.EXPORT_CACHE_DIR,
             self.REPORT_TEMPLATES_DIR,
             self.SIGNATURE_DIR
         ]
@@ -131,7 +159,4 @@ class Settings(BaseSettings):
 
 
 # Create global settings instance
-settings = Settings()
-
-# Ensure directories exist on startup
-settings.ensure_directories()
\ No newline at end of file
+settings = Settings()
\ No newline at end of file
@@ -0,0 +1,85 @@
+"""
+Application metrics module.
+
+This module defines the Prometheus metrics of the LIMS application and renders
+them for the /metrics endpoint. When PROMETHEUS_MULTIPROC_DIR is set, every
+worker process writes its samples to that directory and /metrics aggregates
+the samples of all workers, so the endpoint can be served by any of them.
+"""
+
+import os
+from typing import Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Render durations of reports are longer than those of API requests
+REPORT_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+IMPORT_BUCKETS = (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+REQUEST_DURATION = Histogram(
+    "lims_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"]
+)
+
+REQUESTS_IN_FLIGHT = Gauge(
+    "lims_http_requests_in_flight",
+    "HTTP requests being processed",
+    multiprocess_mode="livesum"
+)
+
+DB_CONNECTIONS_IN_USE = Gauge(
+    "lims_db_connections_in_use",
+    "Database connections checked out of the engine pool",
+    multiprocess_mode="livesum"
+)
+
+REPORT_RENDER_DURATION = Histogram(
+    "lims_report_render_duration_seconds",
+    "PDF report render duration by report type",
+    ["report_type"],
+    buckets=REPORT_BUCKETS
+)
+
+SAMPLE_LOAD_ROWS = Counter(
+    "lims_sample_load_rows_processed_total",
+    "Rows processed by the sample loaders",
+    ["source"]
+)
+
+LOGISTIC_INGEST_ROWS = Counter(
+    "lims_logistic_ingest_rows_total",
+    "Logistic data rows ingested by outcome",
+    ["outcome"]
+)
+
+MASTER_DATA_IMPORT_DURATION = Histogram(
+    "lims_master_data_import_duration_seconds",
+    "Master data save duration by view and outcome",
+    ["view", "outcome"],
+    buckets=IMPORT_BUCKETS
+)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Render the current metrics in the Prometheus text format.
+
+    Returns:
+        Tuple[bytes, str]: Metrics payload and its content type.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
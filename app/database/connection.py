@@ -7,19 +7,33 @@ table creation, and raw SQL execution.
 """
 
 from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import NullPool
-from typing import Generator
+from contextvars import ContextVar
+from typing import Any, Dict, Generator, Optional
 import logging
+import time
 
 from ..core.config import settings
+from ..core.metrics import DB_CONNECTIONS_IN_USE
 
 logger = logging.getLogger(__name__)
 
+# By default (DB_POOL_SIZE=0) every session opens its own connection (NullPool), as used
+# with SQL Server and pyodbc, whose ODBC driver manager pools the connections itself.
+# With DB_POOL_SIZE > 0 every worker process has its own pool of DB_POOL_SIZE connections
+# (plus DB_MAX_OVERFLOW under load); gunicorn.conf.py discards the pool inherited from
+# the master after the fork
+if settings.DB_POOL_SIZE > 0:
+    pool_options = {"pool_size": settings.DB_POOL_SIZE, "max_overflow": settings.DB_MAX_OVERFLOW}
+else:
+    pool_options = {"poolclass": NullPool}
+
 # Create database engine
 engine = create_engine(
     settings.database_url_sync,
-    poolclass=NullPool,  # Use NullPool for SQL Server with pyodbc
+    **pool_options,
     echo=settings.DEBUG,  # Log SQL queries in debug mode
     pool_pre_ping=True,   # Verify connections before use
     pool_recycle=3600,    # Recycle connections every hour
@@ -46,6 +60,96 @@ def set_sqlite_pragma(dbapi_connection, connection_record):
     pass
 
 
+# ========================================
+# Query Instrumentation
+# ========================================
+# Statement count and DB time of the current request; the dict is shared by
+# the tasks and threadpool calls that copy the request context
+query_stats: ContextVar[Optional[Dict[str, Any]]] = ContextVar("query_stats", default=None)
+
+
+def start_query_stats() -> Dict[str, Any]:
+    """
+    Start counting the statements of the current request.
+
+    Returns:
+        Dict[str, Any]: Counters updated by the engine events: 'count' and
+            'duration' (seconds).
+    """
+    stats = {"count": 0, "duration": 0.0}
+    query_stats.set(stats)
+    return stats
+
+
+def redact_parameters(parameters: Any, executemany: bool = False) -> Any:
+    """
+    Replace statement parameter values by their type names for logging.
+
+    Args:
+        parameters (Any): DBAPI parameters (sequence or mapping).
+        executemany (bool): True if parameters is a list of parameter sets.
+
+    Returns:
+        Any: Parameters with every value replaced, e.g. ['<str>', '<int>'].
+    """
+    if executemany:
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, dict):
+        return {key: f"<{type(value).__name__}>" for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [f"<{type(value).__name__}>" for value in parameters]
+    return "<redacted>"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+
+    stats = query_stats.get()
+    if stats is not None:
+        stats["count"] += 1
+        stats["duration"] += elapsed
+
+    if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        logger.warning(
+            f"Slow query ({elapsed * 1000:.1f} ms): {' '.join(statement.split())} "
+            f"parameters={redact_parameters(parameters, executemany)}"
+        )
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    DB_CONNECTIONS_IN_USE.inc()
+
+
+def _on_checkin(dbapi_connection, connection_record):
+    DB_CONNECTIONS_IN_USE.dec()
+
+
+def instrument_engine(target: Engine):
+    """
+    Attach the query counter and slow query log to an engine.
+
+    Every statement is counted in the stats of the current request (see
+    start_query_stats) and statements slower than SLOW_QUERY_MS are logged
+    with their parameters redacted. Checked out connections are tracked in
+    the lims_db_connections_in_use metric.
+
+    Args:
+        target (Engine): Engine to instrument.
+    """
+    if not event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        event.listen(target, "before_cursor_execute", _before_cursor_execute)
+        event.listen(target, "after_cursor_execute", _after_cursor_execute)
+        event.listen(target, "checkout", _on_checkout)
+        event.listen(target, "checkin", _on_checkin)
+
+
+instrument_engine(engine)
+
+
 def get_db() -> Generator[Session, None, None]:
     """
     Dependency to get database session
@@ -65,9 +169,10 @@ def get_db() -> Generator[Session, None, None]:
 
 
 def create_tables():
-    """Create all database tables"""
+    """Create the database tables of the models that do not exist yet"""
     try:
         from ..models.base import Base
+        from ..models import laboratory, sample, specification, user  # noqa: F401 (register the tables)
         Base.metadata.create_all(bind=engine)
         logger.info("Database tables created successfully")
     except Exception as e:
@@ -0,0 +1,40 @@
+"""
+Database migration command.
+
+Creates the tables of the application models that do not exist yet. The
+application no longer does this on every startup (unless AUTO_CREATE_TABLES is
+set), so run it once per deployment, before starting the workers:
+
+    python -m app.database.migrate
+
+The SQL scripts in migrations/ are applied manually, as before.
+"""
+
+import logging
+import sys
+
+from .connection import create_tables, test_connection
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> int:
+    """
+    Run the migration.
+
+    Returns:
+        int: Process exit code (0 on success).
+    """
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    if not test_connection():
+        logger.error("Database connection failed")
+        return 1
+    try:
+        create_tables()
+    except Exception:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,7 +3,8 @@ Sample database models module.
 
 This module defines the database models related to samples and their measurements
 in the LIMS system, including Sample, Measurement, and Map models for managing
-laboratory sample data and test results.
+laboratory sample data and test results, the LogisticBatch records of the
+logistic data ingestion and the SampleLoadState of the customer samples.
 """
 
 from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, Numeric, Text
@@ -144,4 +145,60 @@ class Map(BaseModel):
     
     # Relationships
     product = relationship("Product", back_populates="maps")
-    quality = relationship("Quality", back_populates="maps")
\ No newline at end of file
+    quality = relationship("Quality", back_populates="maps")
+
+class LogisticBatch(BaseModel):
+    """
+    LogisticBatch model recording the batches of logistic data ingested.
+
+    Every batch pushed to the API or uploaded as a file is recorded with its
+    row counts and the dates it changed. The high-water mark of a source is the
+    latest loading date and time it has delivered, so a feed can send only the
+    rows after it.
+
+    Attributes:
+        source (str): Name of the feed that delivered the batch.
+        filename (str): Name of the uploaded file, if any.
+        received_rows (int): Rows in the batch.
+        inserted_rows (int): Rows added to logisticdata.
+        updated_rows (int): Rows of logisticdata changed.
+        deleted_rows (int): Rows removed from logisticdata.
+        unchanged_rows (int): Rows already loaded as they are.
+        high_water_mark (str): Latest loading date and time in the batch (YYYY-MM-DD HH:MM).
+        changed_dates (str): Comma-separated dates (YYYY-MM-DD) whose logistic data changed.
+        created_by_id (int): Foreign key to the user who sent the batch.
+    """
+    __tablename__ = "logisticbatch"
+
+    source = Column(String(40), nullable=False, index=True)
+    filename = Column(String(255), nullable=True)
+    received_rows = Column(Integer, nullable=False, default=0)
+    inserted_rows = Column(Integer, nullable=False, default=0)
+    updated_rows = Column(Integer, nullable=False, default=0)
+    deleted_rows = Column(Integer, nullable=False, default=0)
+    unchanged_rows = Column(Integer, nullable=False, default=0)
+    high_water_mark = Column(String(16), nullable=True)
+    changed_dates = Column(Text, nullable=True)
+    created_by_id = Column(Integer, ForeignKey("tuser.id"), nullable=True)
+
+
+class SampleLoadState(BaseModel):
+    """
+    SampleLoadState model recording what was last loaded into a customer sample.
+
+    The hash covers the logistic data of the order and the specification
+    (flags and limits) the sample was loaded with, so reloading a date only
+    touches the orders whose hash changed.
+
+    Attributes:
+        sample_id (int): Foreign key to the customer sample.
+        date (str): Sample date (YYYY-MM-DD).
+        order_number_pvs (int): PVS order number of the sample.
+        row_hash (str): SHA-256 of the logistic row and specification loaded.
+    """
+    __tablename__ = "sampleloadstate"
+
+    sample_id = Column(Integer, ForeignKey("sample.id"), nullable=False, unique=True)
+    date = Column(String(10), nullable=False, index=True)
+    order_number_pvs = Column(Integer, nullable=True)
+    row_hash = Column(String(64), nullable=False)
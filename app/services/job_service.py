@@ -0,0 +1,312 @@
+"""
+Background job service module.
+
+This module runs long master data imports outside the HTTP request. Jobs are
+executed by an in-process thread pool and their state is stored as JSON files
+in TEMP_DIR/jobs, so the status of a job can be polled from any worker process.
+The job directory is created with the first job, not at import.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Optional
+
+from ..core.config import settings
+from ..database.connection import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+class JobStore:
+    """
+    File-backed store of background job records.
+
+    Each job is a JSON document written atomically (temporary file plus
+    os.replace), so readers never see a partially written record.
+
+    Attributes:
+        directory (str): Directory holding the job records and uploaded files.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def path(self, job_id: str, suffix: str = ".json") -> str:
+        """Return the path of a file of the job"""
+        return os.path.join(self.directory, f"{job_id}{suffix}")
+
+    def create(self, kind: str, **fields: Any) -> Dict[str, Any]:
+        """
+        Create a queued job record.
+
+        Args:
+            kind (str): Job type, e.g. 'master-data-import'.
+            **fields: Additional fields stored in the record.
+
+        Returns:
+            Dict[str, Any]: The new job record.
+        """
+        self.purge()
+        now = datetime.now().isoformat()
+        job = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": "queued",
+            "progress": {"step": "queued", "done": 0, "total": 0},
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+            **fields
+        }
+        self._write(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the job record, or None if the job does not exist"""
+        if not JOB_ID_PATTERN.match(job_id):
+            return None
+        try:
+            with open(self.path(job_id), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def update(self, job_id: str, **fields: Any) -> Dict[str, Any]:
+        """
+        Update fields of a job record.
+
+        Args:
+            job_id (str): Job identifier.
+            **fields: Fields to set.
+
+        Returns:
+            Dict[str, Any]: The updated job record.
+        """
+        with self._lock:
+            job = self.get(job_id) or {"id": job_id}
+            job.update(fields)
+            job["updated_at"] = datetime.now().isoformat()
+            self._write(job)
+        return job
+
+    def fail_orphaned(self) -> int:
+        """
+        Fail the queued and running jobs of the thread pool of a process that is gone.
+
+        The thread pool jobs record the pid of their process. When that process
+        no longer exists, or its pid now belongs to the process calling this
+        method at startup, the job was lost with the restart and is marked as
+        failed instead of staying queued or running forever. Celery jobs have
+        no pid: they are kept by the broker across restarts.
+
+        Returns:
+            int: Number of jobs marked as failed.
+        """
+        failed = 0
+        for name in self._names():
+            if not name.endswith(".json"):
+                continue
+            job = self.get(name[:-len(".json")])
+            if not job or job.get("status") not in ("queued", "running") or not job.get("pid"):
+                continue
+            if job["pid"] == os.getpid() or not _process_exists(job["pid"]):
+                self.update(job["id"], status="failed", error="The server restarted before the job finished",
+                            finished_at=datetime.now().isoformat())
+                failed += 1
+        return failed
+
+    def purge(self):
+        """Remove the files of jobs older than JOB_RETENTION_HOURS"""
+        limit = time.time() - settings.JOB_RETENTION_HOURS * 3600
+        for name in self._names():
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < limit:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def _names(self):
+        try:
+            return os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+
+    def _write(self, job: Dict[str, Any]):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.path(job["id"], f".{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(job, f, default=str)
+        os.replace(tmp_path, self.path(job["id"]))
+
+
+def _process_exists(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # The process exists but belongs to another user
+        return True
+    return True
+
+
+_job_store: Optional[JobStore] = None
+
+
+def get_job_store() -> JobStore:
+    """Return the job store of TEMP_DIR/jobs, created on first use"""
+    global _job_store
+    if _job_store is None:
+        _job_store = JobStore(os.path.join(settings.TEMP_DIR, "jobs"))
+    return _job_store
+
+
+executor = ThreadPoolExecutor(max_workers=settings.IMPORT_JOB_WORKERS, thread_name_prefix="import-job")
+
+
+class JobService:
+    """
+    Service class for queuing master data imports as background jobs.
+
+    Uploaded files are copied to the job directory and processed by the
+    in-process thread pool, or by a Celery worker when USE_CELERY is set,
+    with their own database session. Progress, stats
+    and the error file URL are published in the job record.
+
+    Attributes:
+        store (JobStore): Store of the job records.
+    """
+
+    def __init__(self, store: Optional[JobStore] = None):
+        self.store = store or get_job_store()
+
+    def submit_master_data_import(self, stream: BinaryIO, filename: str, table_type: str,
+                                  username: str, user_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Queue the import of an uploaded workbook.
+
+        The upload is copied in chunks to the job directory and MAX_FILE_SIZE
+        is enforced during the copy.
+
+        Args:
+            stream (BinaryIO): Upload stream.
+            filename (str): Original file name.
+            table_type (str): View name to import into.
+            username (str): User who submitted the upload.
+            user_id (Optional[int]): Id of that user, the owner of the job.
+
+        Returns:
+            Dict[str, Any]: The queued job record.
+
+        Raises:
+            ValueError: If the file exceeds MAX_FILE_SIZE.
+        """
+        # Thread pool jobs record their process, see JobStore.fail_orphaned
+        job = self.store.create("master-data-import", table_type=table_type,
+                                filename=filename, username=username, user_id=user_id,
+                                pid=None if settings.USE_CELERY else os.getpid())
+        extension = os.path.splitext(filename or "")[1].lower() or ".xlsx"
+        upload_path = self.store.path(job["id"], extension)
+        try:
+            self._copy_upload(stream, upload_path)
+        except Exception as e:
+            self.store.update(job["id"], status="failed", error=str(e))
+            if os.path.exists(upload_path):
+                os.remove(upload_path)
+            raise
+
+        if settings.USE_CELERY:
+            # The worker reads the upload from the job directory, which it must share
+            from .tasks import import_master_data
+            import_master_data.delay(job["id"], upload_path, filename, table_type)
+        else:
+            executor.submit(self.run_master_data_import, job["id"], upload_path, filename, table_type)
+        logger.info(f"Queued import job {job['id']} for {table_type} ({filename})")
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the job record, or None if the job does not exist"""
+        return self.store.get(job_id)
+
+    def fail_orphaned_jobs(self) -> int:
+        """Fail the thread pool jobs lost with a restart (see JobStore.fail_orphaned)"""
+        failed = self.store.fail_orphaned()
+        if failed:
+            logger.warning(f"Marked {failed} import jobs interrupted by a restart as failed")
+        return failed
+
+    def _copy_upload(self, stream: BinaryIO, path: str, chunk_size: int = 1024 * 1024):
+        size = 0
+        stream.seek(0)
+        with open(path, "wb") as f:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > settings.MAX_FILE_SIZE:
+                    raise ValueError(
+                        f"File too large. Maximum allowed size is {settings.MAX_FILE_SIZE} bytes"
+                    )
+                f.write(chunk)
+
+    def run_master_data_import(self, job_id: str, path: str, filename: str, table_type: str):
+        """Import a queued upload and record the outcome in its job (run by the thread pool or a Celery worker)"""
+        # Imported here to avoid a circular import with the master data service
+        from .master_data_service import MasterDataService
+
+        last_update = [0.0]
+
+        def progress(step: str, done: int, total: int):
+            # The record is written at most twice per second
+            now = time.monotonic()
+            if step != "validating" or done == 0 or now - last_update[0] >= 0.5:
+                last_update[0] = now
+                self.store.update(job_id, progress={"step": step, "done": done, "total": total})
+
+        db = SessionLocal()
+        try:
+            self.store.update(job_id, status="running", started_at=datetime.now().isoformat())
+            service = MasterDataService(db)
+            with open(path, "rb") as stream:
+                df = service.read_excel_stream(stream, filename)
+            result = service.import_dataframe(df, table_type, progress=progress)
+
+            error_file_url = None
+            if result.get("error_file"):
+                error_file_url = f"/api/master-data/download-errors/{result['error_file']}"
+            self.store.update(
+                job_id,
+                status="completed",
+                progress={"step": "completed", "done": len(df), "total": len(df)},
+                result={
+                    "rows_processed": result["processed"],
+                    "errors": result["errors"],
+                    "has_errors": result["has_errors"],
+                    "error_file_url": error_file_url
+                },
+                finished_at=datetime.now().isoformat()
+            )
+            logger.info(f"Import job {job_id} completed: {result['processed']}")
+        except Exception as e:
+            logger.error(f"Import job {job_id} failed: {e}", exc_info=True)
+            self.store.update(job_id, status="failed", error=str(e),
+                              finished_at=datetime.now().isoformat())
+        finally:
+            db.close()
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,379 @@
+"""
+Logistic data ingestion service module.
+
+This module loads batches of logistic data (the loadings of customer orders)
+into the logisticdata table incrementally. A batch is a CSV or NDJSON file or a
+list of rows pushed to the API. Its rows are upserted on the PVS order number
+and loading date with one executemany per statement, instead of reloading the
+whole table row by row.
+
+Every batch is recorded in logisticbatch with the high-water mark of its source
+and the dates it changed, so only those dates need to be run again through
+SampleLoadingService.load_customer_samples.
+
+Rows use the column names of logisticdata (case-insensitive):
+date, time, name_client, order_number_pvs, article_no, order_number_client,
+description and loading_ton. The date may include the loading time
+(YYYY-MM-DD HH:MM), which is used when the time column is empty.
+"""
+
+import csv
+import io
+import itertools
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, func, text
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.metrics import LOGISTIC_INGEST_ROWS
+from ..models.sample import LogisticBatch
+from .sample_loading_service import SampleLoadingService
+
+logger = logging.getLogger(__name__)
+
+# Maximum length of the text columns of logisticdata
+TEXT_COLUMNS = {'name_client': 60, 'order_number_client': 40, 'description': 60}
+
+chunk_size = 1000
+
+
+class LogisticIngestionService:
+    """
+    Service for the incremental ingestion of logistic data.
+
+    Attributes:
+        db (Session): SQLAlchemy database session.
+    """
+
+    def __init__(self, db: Session):
+        """
+        Initialize the logistic ingestion service.
+
+        Args:
+            db (Session): SQLAlchemy database session.
+        """
+        self.db = db
+
+    def read_batch(self, stream: BinaryIO, filename: str) -> List[Dict[str, Any]]:
+        """
+        Read the rows of a CSV or NDJSON batch file.
+
+        CSV files need a header row; the delimiter (comma, semicolon or tab) is
+        detected from it. NDJSON files have one JSON object per line.
+
+        Args:
+            stream (BinaryIO): File stream.
+            filename (str): File name; its extension selects the format.
+
+        Returns:
+            List[Dict[str, Any]]: Raw rows, validated later by ingest.
+
+        Raises:
+            ValueError: If the format is not supported or the file cannot be parsed.
+        """
+        extension = os.path.splitext(filename or "")[1].lower()
+        try:
+            if extension == ".csv":
+                return self._read_csv(stream)
+            if extension in (".ndjson", ".jsonl"):
+                return self._read_ndjson(stream)
+        except UnicodeDecodeError:
+            raise ValueError("The file must be UTF-8 encoded")
+        raise ValueError("Only CSV (.csv) and NDJSON (.ndjson, .jsonl) files are supported")
+
+    def _read_csv(self, stream: BinaryIO) -> List[Dict[str, Any]]:
+        text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+        try:
+            header = text_stream.readline()
+            delimiter = max([',', ';', '\t'], key=header.count)
+            reader = csv.DictReader(itertools.chain([header], text_stream), delimiter=delimiter)
+            return list(reader)
+        finally:
+            # Leave the upload stream open for its owner
+            text_stream.detach()
+
+    def _read_ndjson(self, stream: BinaryIO) -> List[Dict[str, Any]]:
+        rows = []
+        for number, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Line {number}: invalid JSON ({e.msg})")
+            if not isinstance(row, dict):
+                raise ValueError(f"Line {number}: a JSON object is expected")
+            rows.append(row)
+        return rows
+
+    def _parse_row(self, raw: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+        """Normalize a raw row to the columns of logisticdata, returning (row, errors)"""
+        values = {}
+        for key, value in raw.items():
+            if key is None:
+                continue
+            if isinstance(value, str):
+                value = value.strip()
+            values[str(key).strip().lower()] = None if value == '' else value
+
+        row, errors = {}, []
+
+        date_value = str(values.get('date') or '').replace('T', ' ')
+        day, _, clock = date_value.partition(' ')
+        try:
+            row['date'] = datetime.strptime(day, '%Y-%m-%d').strftime('%Y-%m-%d')
+        except ValueError:
+            errors.append(f"Invalid date '{values.get('date') or ''}', expected YYYY-MM-DD")
+
+        clock = values.get('time') or clock
+        row['time'] = None
+        if clock:
+            try:
+                hours, minutes = (int(part) for part in str(clock).split(':')[:2])
+                if not (0 <= hours < 24 and 0 <= minutes < 60):
+                    raise ValueError
+                row['time'] = f"{hours:02d}:{minutes:02d}"
+            except ValueError:
+                errors.append(f"Invalid time '{clock}', expected HH:MM")
+
+        for column, required in (('order_number_pvs', True), ('article_no', False)):
+            value = values.get(column)
+            row[column] = None
+            if value is None:
+                if required:
+                    errors.append(f"{column} is required")
+                continue
+            try:
+                number = float(value)
+                if not number.is_integer():
+                    raise ValueError
+                row[column] = int(number)
+            except (TypeError, ValueError):
+                errors.append(f"{column} '{value}' is not a whole number")
+
+        for column, length in TEXT_COLUMNS.items():
+            value = values.get(column)
+            row[column] = None if value is None else str(value)
+            if row[column] is not None and len(row[column]) > length:
+                errors.append(f"{column} exceeds {length} characters")
+
+        value = values.get('loading_ton')
+        row['loading_ton'] = None
+        if value is not None:
+            try:
+                row['loading_ton'] = float(str(value).replace(',', '.'))
+            except ValueError:
+                errors.append(f"loading_ton '{value}' is not a number")
+
+        return row, errors
+
+    def _values(self, row: Dict[str, Any]) -> Tuple:
+        """Comparable values of a row read from the batch or from logisticdata"""
+        time_value = row.get('time')
+        ton = row.get('loading_ton')
+        return (
+            str(time_value)[:5] if time_value else None,
+            (row.get('name_client') or '').strip() or None,
+            None if row.get('article_no') is None else int(row['article_no']),
+            (row.get('order_number_client') or '').strip() or None,
+            (row.get('description') or '').strip() or None,
+            None if ton is None else round(float(ton), 6)
+        )
+
+    def _current_rows(self, batch: Dict[Tuple[int, str], Dict[str, Any]],
+                      replace_dates: bool) -> Dict[Tuple[int, str], List[Tuple[int, Tuple]]]:
+        """
+        Load the rows of logisticdata that the batch may change.
+
+        Returns {(order_number_pvs, date): [(id, values)]}: the rows of the batch
+        orders, or of every batch date with replace_dates.
+        """
+        select = ("SELECT id, date, time, name_client, order_number_pvs, article_no, "
+                  "order_number_client, Description AS description, loading_ton FROM logisticdata")
+        dates = {date for _, date in batch}
+        if replace_dates:
+            first, last = min(dates), max(dates)
+            end = (datetime.strptime(last, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+            results = [self.db.execute(text(f"{select} WHERE date >= :start AND date < :end"),
+                                       {'start': first, 'end': end})]
+        else:
+            statement = text(f"{select} WHERE order_number_pvs IN :orders").bindparams(
+                bindparam('orders', expanding=True))
+            orders = sorted({order for order, _ in batch})
+            results = [self.db.execute(statement, {'orders': orders[k:k + chunk_size]})
+                       for k in range(0, len(orders), chunk_size)]
+
+        current = {}
+        for result in results:
+            for t in result:
+                row = dict(t._mapping)
+                # SQL Server returns a datetime, SQLite the stored text
+                key = (int(row['order_number_pvs']), str(row['date'])[:10])
+                if key in batch or (replace_dates and key[1] in dates):
+                    current.setdefault(key, []).append((int(row['id']), self._values(row)))
+        return current
+
+    def ingest(self, rows: Iterable[Dict[str, Any]], source: str = "api", filename: Optional[str] = None,
+               user_id: Optional[int] = None, replace_dates: bool = False) -> Dict[str, Any]:
+        """
+        Upsert a batch of logistic data.
+
+        Rows are matched on order_number_pvs and loading date: new orders are
+        inserted, changed orders updated and identical ones left alone. When an
+        order appears more than once, its last row wins. With replace_dates the
+        batch holds all the logistic data of every date in it, so the orders of
+        those dates that are missing from the batch are deleted. Nothing is
+        written if any row is invalid.
+
+        Args:
+            rows (Iterable[Dict[str, Any]]): Raw rows of the batch.
+            source (str): Name of the feed, used for its high-water mark.
+            filename (Optional[str]): Name of the uploaded file, if any.
+            user_id (Optional[int]): User who sent the batch.
+            replace_dates (bool): Delete the orders of the batch dates missing from it.
+
+        Returns:
+            Dict[str, Any]: success, message, errors, the row counts (received,
+                inserted, updated, deleted, unchanged), changed_dates and the
+                high_water_mark of the source.
+        """
+        batch = {}
+        errors = []
+        received = 0
+        for number, raw in enumerate(rows, 1):
+            received += 1
+            row, row_errors = self._parse_row(raw)
+            if row_errors:
+                errors += [f"Row {number}: {error}" for error in row_errors]
+            else:
+                batch[(row['order_number_pvs'], row['date'])] = row
+
+        counts = {'received': received, 'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+        if errors:
+            return dict(counts, success=False, message=f"{len(errors)} errors found, no rows were loaded",
+                        errors=errors, changed_dates=[], high_water_mark=self.get_high_water_mark(source))
+        if not batch:
+            return dict(counts, success=True, message="No rows received", errors=None,
+                        changed_dates=[], high_water_mark=self.get_high_water_mark(source))
+
+        try:
+            current = self._current_rows(batch, replace_dates)
+
+            inserts, updates, deletes = [], [], []
+            changed_dates = set()
+            for key, row in batch.items():
+                existing = current.pop(key, [])
+                if not existing:
+                    inserts.append(row)
+                    changed_dates.add(key[1])
+                    continue
+                (row_id, values), duplicates = existing[0], existing[1:]
+                if duplicates:
+                    # Left by the full reloads; the order keeps a single row
+                    deletes += [{'id': duplicate_id} for duplicate_id, _ in duplicates]
+                    changed_dates.add(key[1])
+                if values == self._values(row):
+                    counts['unchanged'] += 1
+                else:
+                    updates.append(dict(row, id=row_id))
+                    changed_dates.add(key[1])
+
+            # Only left with replace_dates: orders no longer delivered on their date
+            for (_, date), existing in current.items():
+                deletes += [{'id': row_id} for row_id, _ in existing]
+                changed_dates.add(date)
+
+            if deletes:
+                self.db.execute(text("DELETE FROM logisticdata WHERE id=:id"), deletes)
+            if updates:
+                self.db.execute(text("""
+                    UPDATE logisticdata SET time=:time, name_client=:name_client, article_no=:article_no,
+                    order_number_client=:order_number_client, Description=:description, loading_ton=:loading_ton
+                    WHERE id=:id
+                """), updates)
+            if inserts:
+                self.db.execute(text("""
+                    INSERT INTO logisticdata(date, time, name_client, order_number_pvs, article_no,
+                    order_number_client, Description, loading_ton)
+                    VALUES (:date, :time, :name_client, :order_number_pvs, :article_no,
+                    :order_number_client, :description, :loading_ton)
+                """), inserts)
+
+            counts.update(inserted=len(inserts), updated=len(updates), deleted=len(deletes))
+            changed_dates = sorted(changed_dates)
+            record = LogisticBatch(
+                source=source,
+                filename=filename,
+                received_rows=received,
+                inserted_rows=counts['inserted'],
+                updated_rows=counts['updated'],
+                deleted_rows=counts['deleted'],
+                unchanged_rows=counts['unchanged'],
+                high_water_mark=max(f"{row['date']} {row['time'] or '00:00'}" for row in batch.values()),
+                changed_dates=",".join(changed_dates),
+                created_by_id=user_id
+            )
+            self.db.add(record)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error ingesting logistic data from {source}: {str(e)}")
+            raise
+
+        for outcome in ('inserted', 'updated', 'deleted', 'unchanged'):
+            LOGISTIC_INGEST_ROWS.labels(outcome=outcome).inc(counts[outcome])
+
+        message = (f"Received {received} rows: {counts['inserted']} inserted, {counts['updated']} updated, "
+                   f"{counts['deleted']} deleted, {counts['unchanged']} unchanged")
+        logger.info(f"Logistic batch {record.id} from {source}: {message}")
+        return dict(counts, success=True, message=message, errors=None, batch_id=record.id,
+                    changed_dates=changed_dates, high_water_mark=self.get_high_water_mark(source))
+
+    def get_high_water_mark(self, source: Optional[str] = None) -> Optional[str]:
+        """
+        Get the latest loading date and time ingested.
+
+        Args:
+            source (Optional[str]): Feed name. Defaults to all feeds.
+
+        Returns:
+            Optional[str]: YYYY-MM-DD HH:MM, or None if nothing was ingested.
+        """
+        query = self.db.query(func.max(LogisticBatch.high_water_mark))
+        if source:
+            query = query.filter(LogisticBatch.source == source)
+        return query.scalar()
+
+    async def reload_customer_samples(self, dates: List[str], user_id: int) -> Dict[str, Dict[str, Any]]:
+        """
+        Run the customer sample loading again for the dates changed by a batch.
+
+        With USE_CELERY the dates are queued to the Celery workers.
+
+        Args:
+            dates (List[str]): Changed dates in YYYY-MM-DD format.
+            user_id (int): User recorded as the creator of new samples.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: success, message and errors per date.
+        """
+        results = {}
+        if settings.USE_CELERY:
+            from .tasks import load_customer_samples
+            for date in dates:
+                load_customer_samples.delay(date)
+                results[date] = {'success': True, 'message': "Queued", 'errors': None}
+            return results
+
+        loader = SampleLoadingService(self.db)
+        for date in dates:
+            result = await loader.load_customer_samples(date, user_id)
+            results[date] = {'success': result['success'], 'message': result['message'],
+                             'errors': result.get('errors')}
+        return results
@@ -8,19 +8,36 @@ specifications, and other reference data. Migrated from MATLAB master data manag
 
 from sqlalchemy.orm import Session
 from fastapi import UploadFile
-import pandas as pd
 import tempfile
 import os
-from typing import List, Dict, Any, Optional
-from tempfile import TemporaryDirectory
+import glob
+import hashlib
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple, BinaryIO, Iterator, Callable, TYPE_CHECKING
 import logging
-from openpyxl.utils import get_column_letter
 from sqlalchemy import  text
-from ..services.view import saveView, getView
+from ..core.config import settings
+from ..utils.cache import ReferenceCache
+
+# pandas, openpyxl, xlsxwriter and the view module (pandas, numpy) are imported by the
+# methods that read or write workbooks, so they are not loaded at application startup
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = logging.getLogger(__name__)
 
 
+# Reference lists used by the frontend dropdowns. They only change through master data
+# uploads, which invalidate the cache; the TTL bounds staleness across worker processes
+lookup_cache = ReferenceCache("master-data-lookups", ttl=settings.MASTER_DATA_CACHE_TTL)
+
+
+def invalidate_lookup_cache():
+    """Drop every cached master data lookup list"""
+    lookup_cache.invalidate()
+
+
 table_types = ["products", "qualities", "variables", "holidays", "sample_points",
                        "spec-client", "spec-gen", "samplematrix", "maps" ]
 
@@ -37,136 +54,237 @@ class MasterDataQuery:
     def __init__(self, db: Session):
         self.db = db
               
-    def _auto_size_columns(self, worksheet, df: pd.DataFrame):
-        """Auto-size Excel columns based on content"""
-        for idx, col in enumerate(df.columns, 1):
-            column_letter = get_column_letter(idx)
-            # Calculate max length for column
-            # Check column header length
-            max_length = len(str(col))
-            
-            # Check data lengths
-            if col in df.columns:
-                try:
-                    max_data_length = df[col].astype(str).str.len().max()
-                    max_length = max(max_length, max_data_length)
-                except:
-                    pass
-            
+    def _write_view_workbook(self, table_type: str, excel_path: str) -> int:
+        """
+        Stream the rows of a view into an Excel workbook with auto-sized columns.
+
+        Rows are written straight from the database cursor into an xlsxwriter
+        workbook in constant_memory mode, and the column widths are computed
+        while writing, so memory use does not grow with the size of the table.
+
+        Args:
+            table_type (str): View name to export.
+            excel_path (str): Path of the workbook to create.
+
+        Returns:
+            int: Number of data rows written.
+        """
+        import xlsxwriter
+        from .view import streamView
+
+        label_names, rows = streamView(self.db, table_type)
+        workbook = xlsxwriter.Workbook(excel_path, {
+            'constant_memory': True,
+            'strings_to_formulas': False,
+            'strings_to_urls': False,
+            'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+        })
+        try:
+            worksheet = workbook.add_worksheet(table_type)
+            header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center'})
+            worksheet.write_row(0, 0, label_names, header_format)
+            widths = [len(str(label)) for label in label_names]
+
+            nrows = 0
+            for row in rows:
+                nrows += 1
+                for col, value in enumerate(row):
+                    if value is None:
+                        continue
+                    worksheet.write(nrows, col, value)
+                    widths[col] = max(widths[col], len(str(value)))
+
             # Add some padding and set a reasonable max width
-            adjusted_width = min(max_length + 2, 50)
-            worksheet.column_dimensions[column_letter].width = adjusted_width
+            for col, width in enumerate(widths):
+                worksheet.set_column(col, col, min(width + 2, 50))
+        finally:
+            workbook.close()
+        return nrows
+
+    async def export_to_excel(self, table_type: str, persistent_path: Optional[str] = None) -> str:
+        """
+        Export master data to Excel file with auto-sized columns.
 
-    async def export_to_excel(self, table_type: str) -> str:
-        """Export master data to Excel file with auto-sized columns"""
+        The workbook is written to a unique temporary file and then moved over
+        the previous export, so concurrent downloads never read a partial file.
+
+        Args:
+            table_type (str): View name to export.
+            persistent_path (Optional[str]): Destination of the workbook. Defaults
+                to <table_type>.xlsx in the system temp directory.
+
+        Returns:
+            str: Path of the exported workbook.
+        """
         logger.info(f"Exporting {table_type} to Excel")
-        with TemporaryDirectory() as temp_dir:
-            filename = f"{table_type}.xlsx"
-            excel_path = os.path.join(temp_dir, filename)
-            try:
-                if table_type in table_types:
-                    logger.info(f"Fetching all {table_type}")
-                    data = getView(self.db, table_type)
-                else:
-                   logger.error(f"Unsupported table type: {table_type}. Valid table types: {table_types}")
-                   raise ValueError(f"Unsupported table type: {table_type}. Valid table types: {table_types}")
+        if table_type not in table_types:
+            logger.error(f"Unsupported table type: {table_type}. Valid table types: {table_types}")
+            raise ValueError(f"Unsupported table type: {table_type}. Valid table types: {table_types}")
+
+        if persistent_path is None:
+            persistent_path = os.path.join(tempfile.gettempdir(), f"{table_type}.xlsx")
+        persistent_dir = os.path.dirname(os.path.abspath(persistent_path))
+        fd, excel_path = tempfile.mkstemp(prefix=f"{table_type}_", suffix=".xlsx", dir=persistent_dir)
+        os.close(fd)
+        try:
+            logger.info(f"Fetching all {table_type}")
+            nrows = self._write_view_workbook(table_type, excel_path)
+            os.replace(excel_path, persistent_path)
+        except Exception as e:
+            logger.error(f"Failed to export {table_type} to Excel: {e}")
+            if os.path.exists(excel_path):
+                os.remove(excel_path)
+            raise
+
+        logger.info(f"Successfully exported {nrows} rows to {persistent_path}")
+        return persistent_path
+
+    def export_version(self, table_type: str) -> Tuple[str, Optional[datetime]]:
+        """
+        Get the data version of a master data export.
+
+        The version is computed from the row count, highest id and last
+        updated_at of every table read by the view, so it changes whenever
+        the exported data changes, whichever worker made the change.
+
+        Args:
+            table_type (str): View name to export.
 
-                df = pd.DataFrame(data)
-                # Export to Excel with auto-sizing
-                with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
-                    df.to_excel(writer, sheet_name=table_type, index=False)
+        Returns:
+            Tuple[str, Optional[datetime]]: ETag of the export and last
+                modification time of its data (None if unknown).
+        """
+        if table_type not in table_types:
+            raise ValueError(f"Unsupported table type: {table_type}. Valid table types: {table_types}")
+        from .view import viewVersion
 
-                    # Auto-size columns
-                    worksheet = writer.sheets[table_type]
-                    self._auto_size_columns(worksheet, df)
+        version = viewVersion(self.db, table_type)
+        etag = hashlib.sha1(f"{table_type}:{version}".encode()).hexdigest()[:20]
+        updated = [t[3] for t in version if isinstance(t[3], datetime)]
+        return etag, max(updated) if updated else None
 
-                logger.info(f"Successfully exported {len(df)} rows to {excel_path}")
+    async def export_cached(self, table_type: str) -> Tuple[str, str, Optional[datetime]]:
+        """
+        Export master data to Excel, reusing the cached workbook of the current data version.
 
-                # Copy file to persistent location before temp dir is deleted
-                persistent_dir = tempfile.gettempdir()
-                persistent_path = os.path.join(persistent_dir, filename)
+        Workbooks are stored in EXPORT_CACHE_DIR under a name that includes the
+        ETag, so every worker finds the export of the current version. Serving a
+        workbook refreshes its modification time; when a new version is
+        generated, the previous versions not served for EXPORT_CACHE_KEEP_MINUTES
+        are removed, so downloads still streaming an older version complete.
 
-                import shutil
-                shutil.copy(excel_path, persistent_path)
+        Args:
+            table_type (str): View name to export.
 
-                return persistent_path
-            except Exception as e:
-                logger.error(f"Failed to export {table_type} to Excel: {e}")
-                raise
+        Returns:
+            Tuple[str, str, Optional[datetime]]: Path of the workbook, its ETag
+                and the last modification time of its data.
+        """
+        etag, last_modified = self.export_version(table_type)
+        cached_path = os.path.join(settings.EXPORT_CACHE_DIR, f"{table_type}_{etag}.xlsx")
+        if os.path.exists(cached_path):
+            logger.info(f"Serving cached export of {table_type} ({etag})")
+            try:
+                os.utime(cached_path)
+                return cached_path, etag, last_modified
+            except FileNotFoundError:
+                # Removed by another worker in the meantime
+                pass
+
+        await self.export_to_excel(table_type, cached_path)
+        limit = time.time() - settings.EXPORT_CACHE_KEEP_MINUTES * 60
+        for old_path in glob.glob(os.path.join(settings.EXPORT_CACHE_DIR, f"{table_type}_*.xlsx")):
+            if os.path.basename(old_path) != os.path.basename(cached_path):
+                try:
+                    if os.path.getmtime(old_path) < limit:
+                        os.remove(old_path)
+                except OSError:
+                    pass
+        return cached_path, etag, last_modified
 
     async def get_products(self):
-        """Get list of all products"""
-        query = text("SELECT id, name, bruto FROM product ORDER BY name")
-        result = self.db.execute(query)
-        products = []
-        for row in result:
-            products.append({
-                "id": row[0],
-                "name": row[1],
-                "bruto": row[2]
-            })
-        return products
+        """Get list of all products (cached, see lookup_cache)"""
+        def load():
+            query = text("SELECT id, name, bruto FROM product ORDER BY name")
+            result = self.db.execute(query)
+            products = []
+            for row in result:
+                products.append({
+                    "id": row[0],
+                    "name": row[1],
+                    "bruto": row[2]
+                })
+            return products
+        return lookup_cache.get("products", load)
 
     async def get_qualities(self):
-        """Get list of all qualities"""
-        query = text("SELECT id, name, long_name FROM quality ORDER BY name")
-        result = self.db.execute(query)
-        qualities = []
-        for row in result:
-            qualities.append({
-                "id": row[0],
-                "name": row[1],
-                "long_name": row[2]
-            })
-        return qualities
+        """Get list of all qualities (cached, see lookup_cache)"""
+        def load():
+            query = text("SELECT id, name, long_name FROM quality ORDER BY name")
+            result = self.db.execute(query)
+            qualities = []
+            for row in result:
+                qualities.append({
+                    "id": row[0],
+                    "name": row[1],
+                    "long_name": row[2]
+                })
+            return qualities
+        return lookup_cache.get("qualities", load)
 
     async def get_sample_points(self):
-        """Get list of all sample points"""
-        query = text("SELECT id, name FROM samplepoint ORDER BY name")
-        result = self.db.execute(query)
-        sample_points = []
-        for row in result:
-            sample_points.append({
-                "id": row[0],
-                "name": row[1]
-            })
-        return sample_points
+        """Get list of all sample points (cached, see lookup_cache)"""
+        def load():
+            query = text("SELECT id, name FROM samplepoint ORDER BY name")
+            result = self.db.execute(query)
+            sample_points = []
+            for row in result:
+                sample_points.append({
+                    "id": row[0],
+                    "name": row[1]
+                })
+            return sample_points
+        return lookup_cache.get("sample_points", load)
 
     async def get_variables(self):
-        """Get list of all variables"""
-        query = text("SELECT id, short_name, test, element, unit, ord FROM variable ORDER BY ord, short_name")
-        result = self.db.execute(query)
-        variables = []
-        for row in result:
-            variables.append({
-                "id": row[0],
-                "short_name": row[1],
-                "test": row[2],
-                "element": row[3],
-                "unit": row[4],
-                "ord": row[5]
-            })
-        return variables
+        """Get list of all variables (cached, see lookup_cache)"""
+        def load():
+            query = text("SELECT id, short_name, test, element, unit, ord FROM variable ORDER BY ord, short_name")
+            result = self.db.execute(query)
+            variables = []
+            for row in result:
+                variables.append({
+                    "id": row[0],
+                    "short_name": row[1],
+                    "test": row[2],
+                    "element": row[3],
+                    "unit": row[4],
+                    "ord": row[5]
+                })
+            return variables
+        return lookup_cache.get("variables", load)
 
     async def get_qualities_by_product(self, product_id: int):
-        """Get list of qualities filtered by product using spec table"""
-        query = text("""
-            SELECT DISTINCT q.id, q.name, q.long_name
-            FROM quality q, spec s
-            WHERE s.type_spec='GEN'
-              AND s.quality_id = q.id
-              AND s.product_id = :product_id
-            ORDER BY q.name
-        """)
-        result = self.db.execute(query, {"product_id": product_id})
-        qualities = []
-        for row in result:
-            qualities.append({
-                "id": row[0],
-                "name": row[1],
-                "long_name": row[2]
-            })
-        return qualities
+        """Get list of qualities filtered by product using spec table (cached, see lookup_cache)"""
+        def load():
+            query = text("""
+                SELECT DISTINCT q.id, q.name, q.long_name
+                FROM quality q, spec s
+                WHERE s.type_spec='GEN'
+                  AND s.quality_id = q.id
+                  AND s.product_id = :product_id
+                ORDER BY q.name
+            """)
+            result = self.db.execute(query, {"product_id": product_id})
+            qualities = []
+            for row in result:
+                qualities.append({
+                    "id": row[0],
+                    "name": row[1],
+                    "long_name": row[2]
+                })
+            return qualities
+        return lookup_cache.get(("qualities_by_product", product_id), load)
 
     async def get_spec_id(self, product_id: int, quality_id: int):
         """Get spec_id from product_id and quality_id"""
@@ -184,24 +302,25 @@ class MasterDataQuery:
         return None
 
     async def get_sample_points_by_product_quality(self, product_id: int, quality_id: int):
-        """Get sample points filtered by product and quality using samplematrix"""
-        query = text("""
-            SELECT DISTINCT sp.id, sp.name
-            FROM samplepoint sp, samplematrix sm
-            WHERE sm.samplepoint_id = sp.id
-              AND sm.product_id = :product_id
-              AND sm.quality_id = :quality_id
-            ORDER BY sp.name
-        """)
-        result = self.db.execute(query, {"product_id": product_id, "quality_id": quality_id})
-        sample_points = []
-        for row in result:
-            sample_points.append({
-                "id": row[0],
-                "name": row[1]
-            })
-        return sample_points
-
+        """Get sample points filtered by product and quality using samplematrix (cached, see lookup_cache)"""
+        def load():
+            query = text("""
+                SELECT DISTINCT sp.id, sp.name
+                FROM samplepoint sp, samplematrix sm
+                WHERE sm.samplepoint_id = sp.id
+                  AND sm.product_id = :product_id
+                  AND sm.quality_id = :quality_id
+                ORDER BY sp.name
+            """)
+            result = self.db.execute(query, {"product_id": product_id, "quality_id": quality_id})
+            sample_points = []
+            for row in result:
+                sample_points.append({
+                    "id": row[0],
+                    "name": row[1]
+                })
+            return sample_points
+        return lookup_cache.get(("sample_points_by_product_quality", product_id, quality_id), load)
 
 
 # Class that stores the DML methods
@@ -231,45 +350,145 @@ class MasterDataService:
         file: UploadFile,
         table_type: str
     ) -> Dict[str, Any]:
-        """Import master data from Excel file"""
+        """
+        Import master data from Excel file.
+
+        The workbook is parsed straight from the spooled upload stream, without
+        copying it into memory or to a temporary file first.
+
+        Args:
+            file (UploadFile): Uploaded workbook (.xlsx, or .xls through pandas).
+            table_type (str): View name to import into.
+
+        Returns:
+            Dict[str, Any]: Processed counts, errors, pending rows and error file.
+
+        Raises:
+            ValueError: If the table type is unsupported or the file exceeds MAX_FILE_SIZE.
+        """
         logger.info(f"Importing {table_type} from Excel file: {file.filename}")
-        with TemporaryDirectory() as temp_dir:
-            temp_path = os.path.join(temp_dir, file.filename)
-            try:
-                with open(temp_path, "wb") as temp_file:
-                    content = await file.read()
-                    temp_file.write(content)
-                df = pd.read_excel(temp_path, sheet_name=0)
-                if table_type in table_types:
-                    msgerror, stat, pendingdata= saveView(table_type, self.db, df)
-
-                    error_file_url = None
-                    # If there are errors, save the non-processed rows to an Excel file
-                    if len(msgerror) > 0 and not pendingdata.empty:
-                        error_file_url = self._save_error_rows(pendingdata, table_type)
-                        logger.info(f"Saved {len(pendingdata)} error rows to {error_file_url}")
-
-                    # Return errors and error file info without raising exception
-                    return {
-                        "processed": stat,
-                        "errors": msgerror,
-                        "pendingdata": pendingdata.to_dict('records'), 
-                        "error_file": error_file_url,
-                        "has_errors": len(msgerror) > 0
-                    }
-                else:
-                   logger.error(f"Unsupported table type: {table_type}. Valid table types: {table_types}")
-                   raise ValueError(f"Unsupported table type: {table_type}. Valid table types: {table_types}")
-            except Exception as e:
-                logger.error(f"Failed to import from Excel: {e}")
-                raise
-
-        return {"processed":stat, "errors": [], "pendingdata": pendingdata, "error_file": None, "has_errors": False}
-
-    def _save_error_rows(self, pendingdata: pd.DataFrame, table_type: str) -> str:
+        try:
+            if table_type not in table_types:
+                logger.error(f"Unsupported table type: {table_type}. Valid table types: {table_types}")
+                raise ValueError(f"Unsupported table type: {table_type}. Valid table types: {table_types}")
+
+            df = self.read_excel_stream(file.file, file.filename)
+            return self.import_dataframe(df, table_type)
+        except Exception as e:
+            logger.error(f"Failed to import from Excel: {e}")
+            raise
+
+    def import_dataframe(
+        self,
+        df: "pd.DataFrame",
+        table_type: str,
+        progress: Optional[Callable[[str, int, int], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Save the rows of an uploaded sheet with saveView.
+
+        Args:
+            df (pd.DataFrame): Rows of the uploaded sheet.
+            table_type (str): View name to import into.
+            progress (Optional[Callable[[str, int, int], None]]): Called as
+                progress(step, done, total) while the rows are processed.
+
+        Returns:
+            Dict[str, Any]: Processed counts, errors, pending rows and error file.
+        """
+        from .view import saveView
+
+        try:
+            msgerror, stat, pendingdata = saveView(table_type, self.db, df, progress=progress)
+        finally:
+            invalidate_lookup_cache()
+
+        error_file_url = None
+        # If there are errors, save the non-processed rows to an Excel file
+        if len(msgerror) > 0 and not pendingdata.empty:
+            error_file_url = self._save_error_rows(pendingdata, table_type)
+            logger.info(f"Saved {len(pendingdata)} error rows to {error_file_url}")
+
+        # Return errors and error file info without raising exception
+        return {
+            "processed": stat,
+            "errors": msgerror,
+            "pendingdata": pendingdata.to_dict('records'),
+            "error_file": error_file_url,
+            "has_errors": len(msgerror) > 0
+        }
+
+    def read_excel_stream(self, stream: BinaryIO, filename: str) -> "pd.DataFrame":
+        """
+        Read the first sheet of a workbook from a binary stream.
+
+        The size is checked against MAX_FILE_SIZE before parsing. .xlsx files
+        are read with openpyxl in read-only mode, which parses the sheet XML
+        incrementally, and the rows are streamed into a single DataFrame
+        (saveView validates and applies the whole sheet in one transaction).
+
+        Args:
+            stream (BinaryIO): Seekable binary stream of the workbook.
+            filename (str): Original file name, used to detect the format.
+
+        Returns:
+            pd.DataFrame: Sheet rows with the first row as column names.
+
+        Raises:
+            ValueError: If the file exceeds MAX_FILE_SIZE.
+        """
+        import openpyxl
+        import pandas as pd
+
+        stream.seek(0, os.SEEK_END)
+        size = stream.tell()
+        stream.seek(0)
+        if size > settings.MAX_FILE_SIZE:
+            raise ValueError(
+                f"File too large: {size} bytes. Maximum allowed size is {settings.MAX_FILE_SIZE} bytes"
+            )
+
+        if (filename or "").lower().endswith(".xls"):
+            return pd.read_excel(stream, sheet_name=0)
+
+        workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return pd.DataFrame()
+            columns = [f"Unnamed: {i}" if name is None else str(name) for i, name in enumerate(header)]
+            # Blank rows between data rows are kept and trailing blank rows (formatted
+            # but empty cells) dropped, like pd.read_excel does (see _sheet_records)
+            return pd.DataFrame.from_records(self._sheet_records(rows, len(columns)), columns=columns)
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _sheet_records(rows: Iterator[tuple], width: int) -> Iterator[tuple]:
+        """
+        Yield the sheet rows padded to width, dropping the trailing blank rows.
+
+        Blank rows between data rows are kept, like pd.read_excel does, so the
+        row numbers in the validation messages match the sheet.
+        """
+        blank = (None,) * width
+        pending = 0
+        for row in rows:
+            row = tuple(row[:width]) + (None,) * (width - len(row))
+            if row == blank:
+                pending += 1
+                continue
+            for _ in range(pending):
+                yield blank
+            pending = 0
+            yield row
+
+    def _save_error_rows(self, pendingdata: "pd.DataFrame", table_type: str) -> str:
         """Save non-processed rows to an Excel file and return the file path"""
         import uuid
         from datetime import datetime
+        import pandas as pd
 
         # Generate unique filename with timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -0,0 +1,326 @@
+"""
+Production sample scheduler module.
+
+This module decides which sample matrices are due on which days and creates
+their production samples in bulk. The calendar of a year is computed once per
+set of holidays for every frequency of the samplematrix view:
+
+    Day                              every working day
+    Week, Month, Quarter, 1/2 year   first working day of the period
+    Day - loading, Delivery,         working days with loadings of the product
+    Batch - loading                  and quality in the logistic data
+    Batch                            not scheduled: production batches are not
+                                     recorded, so these samples are created manually
+
+Working days are the WORKING_DAYS weekdays that are not in the holidays table.
+Replaces the per-frequency first-day-of-period queries of loadProductionSample.m.
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.metrics import SAMPLE_LOAD_ROWS
+
+logger = logging.getLogger(__name__)
+
+FREQUENCY_DESCRIPTIONS = {
+    'Day': 'Daily sample',
+    'Week': 'Weekly sample',
+    'Month': 'Monthly sample',
+    'Quarter': 'Quarterly sample',
+    '1/2 year': '1/2 year sample',
+}
+
+# Key of the period a day belongs to, per frequency sampled on the first working day of the period
+PERIODS = {
+    'Week': lambda day: day - timedelta(days=day.weekday()),
+    'Month': lambda day: (day.year, day.month),
+    'Quarter': lambda day: (day.year, (day.month - 1) // 3),
+    '1/2 year': lambda day: (day.year, (day.month - 1) // 6),
+}
+
+LOADING_FREQUENCIES = ('Day - loading', 'Delivery', 'Batch - loading')
+
+# Frequencies as stored in samplematrix (case and spacing vary) -> calendar frequency
+FREQUENCIES = {frequency.lower(): frequency for frequency in ['Day', *PERIODS, *LOADING_FREQUENCIES]}
+
+chunk_size = 1000
+
+
+@lru_cache(maxsize=16)
+def build_calendar(year: int, holidays: frozenset, working_days: tuple) -> Dict[str, Tuple[date, ...]]:
+    """
+    Compute the days of a year every frequency is due on.
+
+    Args:
+        year (int): Calendar year.
+        holidays (frozenset): Holiday dates (YYYY-MM-DD).
+        working_days (tuple): Working weekdays (Monday is 0).
+
+    Returns:
+        Dict[str, Tuple[date, ...]]: Sorted due days per frequency. The loading
+            frequencies are due on every working day, subject to loadings.
+    """
+    first = date(year, 1, 1)
+    # Start a week early, so a week that begins in December is due in December
+    days = [first + timedelta(days=k) for k in range(-7, (date(year + 1, 1, 1) - first).days)]
+    working = [day for day in days if day.weekday() in working_days and day.isoformat() not in holidays]
+
+    calendar = {'Day': tuple(day for day in working if day.year == year)}
+    for frequency in LOADING_FREQUENCIES:
+        calendar[frequency] = calendar['Day']
+    for frequency, period in PERIODS.items():
+        first_days = {}
+        for day in working:
+            first_days.setdefault(period(day), day)
+        calendar[frequency] = tuple(day for day in first_days.values() if day.year == year)
+    return calendar
+
+
+class ProductionScheduler:
+    """
+    Scheduler of the production samples of the sample matrices.
+
+    Attributes:
+        db (Session): SQLAlchemy database session.
+    """
+
+    def __init__(self, db: Session):
+        """
+        Initialize the production scheduler.
+
+        Args:
+            db (Session): SQLAlchemy database session.
+        """
+        self.db = db
+
+    def _due_days(self, start: date, end: date) -> Dict[str, set]:
+        """Due days between start and end (inclusive) per frequency"""
+        holidays = frozenset(str(r[0])[:10] for r in self.db.execute(text("SELECT date FROM holidays")))
+        due = {}
+        for year in range(start.year, end.year + 1):
+            for frequency, days in build_calendar(year, holidays, tuple(settings.WORKING_DAYS)).items():
+                due.setdefault(frequency, set()).update(day for day in days if start <= day <= end)
+        return due
+
+    def _loading_days(self, start: date, end: date) -> set:
+        """(date, product_id, quality_id) of the loadings between start and end"""
+        sql = text("""
+            SELECT DISTINCT SUBSTRING(CONVERT(VARCHAR,l.date,20),1,10) as date, m.product_id, m.quality_id
+            FROM logisticdata l, map m
+            WHERE l.article_no = m.article_code AND l.date >= :start AND l.date < :end
+        """)
+        rows = self.db.execute(sql, {'start': start.isoformat(), 'end': (end + timedelta(days=1)).isoformat()})
+        return {(r[0], int(r[1]), int(r[2])) for r in rows}
+
+    def get_schedule(self, start_date: str, end_date: str) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get the sample matrices due on every day of a range.
+
+        Args:
+            start_date (str): First date in YYYY-MM-DD format.
+            end_date (str): Last date in YYYY-MM-DD format.
+
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: Due sample matrices per date, for the
+                dates with at least one.
+
+        Raises:
+            ValueError: If a date is invalid or the range is empty.
+        """
+        start = datetime.strptime(start_date, '%Y-%m-%d').date()
+        end = datetime.strptime(end_date, '%Y-%m-%d').date()
+        if end < start:
+            raise ValueError("end_date must not be before start_date")
+
+        matrices = [dict(r._mapping) for r in self.db.execute(text("""
+            SELECT x.id, x.frequency, x.sample_point_id, x.product_id, x.quality_id, p.name as Product,
+                q.name as Quality, sp.name as SamplePoint
+            FROM samplematrix x, product p, quality q, samplepoint sp
+            WHERE x.product_id=p.id
+            AND x.quality_id=q.id
+            AND x.sample_point_id=sp.id
+            ORDER BY x.id
+        """))]
+
+        due_days = self._due_days(start, end)
+        loadings = None
+        schedule = {}
+        for matrix in matrices:
+            frequency = FREQUENCIES.get((matrix['frequency'] or '').strip().lower())
+            if frequency is None:
+                continue
+            matrix['frequency'] = frequency
+            if frequency in LOADING_FREQUENCIES and loadings is None:
+                loadings = self._loading_days(start, end)
+            for day in due_days[frequency]:
+                day = day.isoformat()
+                if frequency in LOADING_FREQUENCIES and \
+                        (day, matrix['product_id'], matrix['quality_id']) not in loadings:
+                    continue
+                schedule.setdefault(day, []).append(matrix)
+        return dict(sorted(schedule.items()))
+
+    def _select_chunked(self, sql: str, ids: List[int]) -> List[Any]:
+        statement = text(sql).bindparams(bindparam('ids', expanding=True))
+        rows = []
+        for k in range(0, len(ids), chunk_size):
+            rows += self.db.execute(statement, {'ids': ids[k:k + chunk_size]}).fetchall()
+        return rows
+
+    def create_samples(self, start_date: str, end_date: str, user_id: int) -> Dict[str, Any]:
+        """
+        Create the production samples due between two dates.
+
+        Sample matrices that already have a production sample on a date are
+        skipped, so a date can be loaded again safely. Every sample gets the
+        variables of its matrix with the limits of the general specification of
+        its product and quality. Everything is inserted with one executemany per
+        table and committed once.
+
+        Args:
+            start_date (str): First date in YYYY-MM-DD format.
+            end_date (str): Last date in YYYY-MM-DD format.
+            user_id (int): User recorded as the creator of the samples.
+
+        Returns:
+            Dict[str, Any]: success, message, errors and the number of samples
+                created and already existing.
+
+        Raises:
+            ValueError: If a date is invalid or the range is empty.
+        """
+        schedule = self.get_schedule(start_date, end_date)
+        due = [(day, matrix) for day, matrices in schedule.items() for matrix in matrices]
+        SAMPLE_LOAD_ROWS.labels(source="production").inc(len(due))
+
+        try:
+            existing = {(int(r[0]), r[1]) for r in self.db.execute(text("""
+                SELECT sample_matrix_id, date FROM sample
+                WHERE type_sample='PRO' AND sample_matrix_id IS NOT NULL AND date >= :start AND date <= :end
+            """), {'start': start_date, 'end': end_date})}
+            pending = [(day, matrix) for day, matrix in due if (matrix['id'], day) not in existing]
+
+            matrix_ids = sorted({matrix['id'] for _, matrix in pending})
+            variables = {}
+            for r in self._select_chunked("""
+                SELECT d.sample_matrix_id, d.variable_id, v.name FROM dsamplematrix d, variable v
+                WHERE d.variable_id=v.id AND d.sample_matrix_id IN :ids
+            """, matrix_ids):
+                variables.setdefault(int(r[0]), []).append((int(r[1]), r[2]))
+
+            # General specification of every product/quality, and its limits
+            spec_ids = {}
+            for r in self.db.execute(text("SELECT id, product_id, quality_id FROM spec WHERE type_spec='GEN'")):
+                spec_ids.setdefault((int(r[1]), int(r[2])), int(r[0]))
+            limits = {}
+            for r in self._select_chunked("""
+                SELECT spec_id, variable_id, min_value, max_value FROM dspec WHERE spec_id IN :ids
+            """, sorted({spec_ids[key] for key in {(m['product_id'], m['quality_id']) for _, m in pending}
+                         if key in spec_ids})):
+                limits[(int(r[0]), int(r[1]))] = (r[2], r[3])
+
+            # Last sequence number of the production samples of every date
+            sequences = {r[0]: int(r[1]) for r in self.db.execute(text("""
+                SELECT date, MAX(SUBSTRING(sample_number,11,3)) FROM sample
+                WHERE type_sample='PRO' AND date >= :start AND date <= :end
+                GROUP BY date
+            """), {'start': start_date, 'end': end_date}) if r[1] and str(r[1]).isdigit()}
+
+            errors = []
+            samples, measurements = [], {}
+            creation_date = datetime.now()
+            base_time = datetime.strptime('06:00', '%H:%M')
+            times = {}
+            for day, matrix in pending:
+                spec_id = spec_ids.get((matrix['product_id'], matrix['quality_id']))
+                if not spec_id:
+                    errors.append(f"No specification found for Product={matrix['Product']}, "
+                                  f"Quality={matrix['Quality']}")
+                    continue
+                if not variables.get(matrix['id']):
+                    errors.append(f"No variables found for Product={matrix['Product']}, "
+                                  f"Quality={matrix['Quality']}, SamplePoint={matrix['SamplePoint']}")
+                    continue
+
+                sequences[day] = sequences.get(day, 0) + 1
+                times[day] = times.get(day, -1) + 1
+                sample_number = f"P{datetime.strptime(day, '%Y-%m-%d').strftime('%d%m%Y')}_{sequences[day]:03d}"
+                samples.append({
+                    'spec_id': spec_id,
+                    'sample_matrix_id': matrix['id'],
+                    'product_id': matrix['product_id'],
+                    'quality_id': matrix['quality_id'],
+                    'user_id': user_id,
+                    'creation_date': creation_date,
+                    'date': day,
+                    # One minute apart from 06:00, in the order of the matrices
+                    'time': (base_time + timedelta(minutes=times[day])).strftime('%H:%M'),
+                    'description': FREQUENCY_DESCRIPTIONS.get(matrix['frequency'], f"{matrix['frequency']} sample"),
+                    'sample_number': sample_number,
+                    'sample_point_id': matrix['sample_point_id']
+                })
+                measurements[sample_number] = [
+                    (variable_id, name) + limits.get((spec_id, variable_id), (None, None))
+                    for variable_id, name in variables[matrix['id']]
+                ]
+
+            if samples:
+                self.db.execute(text("""
+                    INSERT INTO sample(
+                        type_sample, spec_id, customer, sample_matrix_id,
+                        product_id, quality_id, created_by_id, creation_date,
+                        date, time, description, sample_number, sample_point_id, article_no
+                    )
+                    VALUES (
+                        'PRO', :spec_id, 'INC', :sample_matrix_id,
+                        :product_id, :quality_id, :user_id, :creation_date,
+                        :date, :time, :description, :sample_number, :sample_point_id, 0
+                    )
+                """), samples)
+
+                sample_ids = {}
+                numbers = [sample['sample_number'] for sample in samples]
+                statement = text("SELECT id, sample_number FROM sample WHERE type_sample='PRO' "
+                                 "AND sample_number IN :numbers").bindparams(bindparam('numbers', expanding=True))
+                for k in range(0, len(numbers), chunk_size):
+                    for r in self.db.execute(statement, {'numbers': numbers[k:k + chunk_size]}):
+                        sample_ids[r[1]] = int(r[0])
+
+                def limit(value):
+                    # Negative limits mean no limit
+                    return None if value is None or float(value) < 0 else value
+
+                rows = [
+                    {'sample_id': sample_ids[number], 'variable_id': variable_id, 'variable_name': name,
+                     'min_val': limit(min_value), 'max_val': limit(max_value)}
+                    for number, variable_rows in measurements.items()
+                    for variable_id, name, min_value, max_value in variable_rows
+                ]
+                self.db.execute(text("""
+                    INSERT INTO measurement(sample_id, variable_id, variable_name, min_value, max_value, value)
+                    VALUES (:sample_id, :variable_id, :variable_name, :min_val, :max_val, NULL)
+                """), rows)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error creating production samples: {e}")
+            raise
+
+        # The same matrix fails the same way on every date of the range
+        errors = list(dict.fromkeys(errors))
+        period = start_date if start_date == end_date else f"{start_date} to {end_date}"
+        return {
+            'success': len(errors) == 0,
+            'message': (f"Production samples loaded for {period}: {len(samples)} created, "
+                        f"{len(due) - len(pending)} already existing"),
+            'errors': errors if errors else None,
+            'created': len(samples),
+            'existing': len(due) - len(pending)
+        }
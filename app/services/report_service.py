@@ -12,15 +12,38 @@ from reportlab.lib.pagesizes import A4, landscape
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
+import asyncio
+import glob
+import hashlib
+import logging
 import os
+import re
+import shutil
 import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
+from ..core.config import settings
+from ..core.metrics import REPORT_RENDER_DURATION
 from ..models.sample import Sample, Measurement
 from ..models.laboratory import Product, Quality, SamplePoint, Variable
 from ..models.user import User
 
+logger = logging.getLogger(__name__)
+
+# Report store for reports rendered ahead of download
+PRERENDER_DIR = os.path.join(settings.REPORTS_DIR, "prerendered")
+
+# Sample flag that requires each report type
+required_reports = {"COA": "coa", "COC": "coc", "DAY_COA": "day_coa"}
+
+report_executor = ThreadPoolExecutor(
+    max_workers=settings.REPORT_PRERENDER_WORKERS,
+    thread_name_prefix="report-prerender"
+)
+
 
 class ReportService:
     """
@@ -67,6 +90,7 @@ class ReportService:
         Raises:
             ValueError: If the sample is not found.
         """
+        start = time.perf_counter()
         # Get sample data with all related information
         sample = await self._get_sample_with_measurements(sample_number)
         
@@ -110,6 +134,7 @@ class ReportService:
 
         # Build PDF
         doc.build(content)
+        REPORT_RENDER_DURATION.labels(report_type="COA").observe(time.perf_counter() - start)
         
         return pdf_path
 
@@ -136,6 +161,7 @@ class ReportService:
         Raises:
             ValueError: If the sample is not found.
         """
+        start = time.perf_counter()
         # Similar to COA but with COC-specific formatting
         sample = await self._get_sample_with_measurements(sample_number)
         
@@ -164,6 +190,7 @@ class ReportService:
         content.extend(await self._create_coc_footer(username))
 
         doc.build(content)
+        REPORT_RENDER_DURATION.labels(report_type="COC").observe(time.perf_counter() - start)
         return pdf_path
 
     async def generate_day_certificate_report(
@@ -184,6 +211,7 @@ class ReportService:
         Returns:
             str: Path to the generated PDF file.
         """
+        start = time.perf_counter()
         # Get sample data
         sample_data = await self._get_COA_Data(sample_number)
 
@@ -232,8 +260,168 @@ class ReportService:
         content.extend(await self._create_day_certificate_footer(username))
 
         doc.build(content)
+        REPORT_RENDER_DURATION.labels(report_type="DAY_COA").observe(time.perf_counter() - start)
         return pdf_path
 
+    def report_version(self, sample_number: str) -> Optional[str]:
+        """
+        Compute the version stamp of the report data of a sample.
+
+        The stamp is a hash of the sample, product, quality and measurement
+        fields the reports print, so it changes with every edit of that data,
+        including the raw SQL updates of the sample loading that leave
+        updated_at untouched.
+
+        Args:
+            sample_number (str): Number of the sample.
+
+        Returns:
+            Optional[str]: Version stamp, or None if the sample is not found.
+        """
+        sample = (
+            self.db.query(Sample, Product.name_coa, Product.bruto, Quality.long_name)
+            .outerjoin(Product, Sample.product_id == Product.id)
+            .outerjoin(Quality, Sample.quality_id == Quality.id)
+            .filter(Sample.sample_number == sample_number)
+            .first()
+        )
+        if not sample:
+            return None
+
+        measurements = (
+            self.db.query(
+                Measurement.id,
+                Measurement.variable,
+                Measurement.value,
+                Measurement.min_value,
+                Measurement.max_value,
+                Measurement.less,
+                Measurement.test_date,
+                Measurement.tested_by_id,
+                Variable.name,
+                Variable.test,
+                Variable.element,
+                Variable.unit,
+                Variable.typevar,
+                Variable.ord
+            )
+            .outerjoin(Variable, Measurement.variable_id == Variable.id)
+            .filter(Measurement.sample_id == sample[0].id)
+            .order_by(Measurement.id)
+            .all()
+        )
+
+        columns = [column.name for column in Sample.__table__.columns
+                   if column.name not in ("created_at", "updated_at")]
+        data = (
+            tuple(getattr(sample[0], column) for column in columns),
+            tuple(sample[1:]),
+            [tuple(measurement) for measurement in measurements]
+        )
+        return hashlib.sha1(repr(data).encode()).hexdigest()[:16]
+
+    def footer_version(self, username: str) -> str:
+        """Return the stamp of the report footer: the user name and the date it prints"""
+        footer = f"{username}|{datetime.now().strftime('%Y-%m-%d')}"
+        return hashlib.sha1(footer.encode()).hexdigest()[:8]
+
+    def prerendered_path(self, report_type: str, sample_number: str, version: str) -> str:
+        """Return the report store path of a pre-rendered report"""
+        safe_number = re.sub(r"[^A-Za-z0-9_-]", "_", sample_number)
+        return os.path.join(PRERENDER_DIR, f"{report_type}_{safe_number}_{version}.pdf")
+
+    def get_prerendered_report(self, report_type: str, sample_number: str, username: str) -> Optional[str]:
+        """
+        Find the pre-rendered report of a sample.
+
+        A pre-rendered report is only returned while its data is unchanged
+        and its footer shows the requesting user and today's date. The footer
+        is checked first against the files in the report store, so a download
+        by another user or on another day does not query the data version.
+
+        Args:
+            report_type (str): COA, COC or DAY_COA.
+            sample_number (str): Number of the sample.
+            username (str): Name of the user downloading the report.
+
+        Returns:
+            Optional[str]: Path to the PDF file, or None if no up-to-date
+                pre-rendered report exists.
+        """
+        footer = self.footer_version(username)
+        if not glob.glob(self.prerendered_path(report_type, sample_number, f"*_{footer}")):
+            return None
+        version = self.report_version(sample_number)
+        if version is None:
+            return None
+        path = self.prerendered_path(report_type, sample_number, f"{version}_{footer}")
+        return path if os.path.exists(path) else None
+
+    async def prerender_sample_reports(self, sample_number: str, username: str) -> List[str]:
+        """
+        Render the required certificates of a completed sample into the report store.
+
+        A sample is complete when every measurement has a value, as computed by
+        SampleService.get_sample_completion_status. The reports required by the
+        sample flags (coa, coc, day_coa = 'X') are rendered once per data
+        version, user and day as the footer prints them; older versions of
+        the same report are removed.
+
+        Args:
+            sample_number (str): Number of the sample.
+            username (str): Name of the user who completed the sample.
+
+        Returns:
+            List[str]: Report types rendered by this call.
+        """
+        # Imported here to avoid loading the sample service with every report
+        from .sample_service import SampleService
+
+        sample = self.db.query(Sample).filter(Sample.sample_number == sample_number).first()
+        if not sample:
+            return []
+
+        report_types = [
+            report_type for report_type, flag in required_reports.items()
+            if getattr(sample, flag) == 'X'
+        ]
+        if not report_types:
+            return []
+
+        completion = await SampleService(self.db).get_sample_completion_status(sample_number)
+        if not completion["is_complete"]:
+            return []
+
+        version = f"{self.report_version(sample_number)}_{self.footer_version(username)}"
+        generators = {
+            "COA": self.generate_coa_report,
+            "COC": self.generate_coc_report,
+            "DAY_COA": self.generate_day_certificate_report
+        }
+        os.makedirs(PRERENDER_DIR, exist_ok=True)
+
+        rendered = []
+        for report_type in report_types:
+            path = self.prerendered_path(report_type, sample_number, version)
+            if os.path.exists(path):
+                continue
+
+            pdf_path = await generators[report_type](sample_number=sample_number, username=username)
+            shutil.move(pdf_path, path)
+            shutil.rmtree(os.path.dirname(pdf_path), ignore_errors=True)
+
+            # Remove the reports of older data versions
+            pattern = self.prerendered_path(report_type, sample_number, "*")
+            for old_path in glob.glob(pattern):
+                if old_path != path:
+                    try:
+                        os.remove(old_path)
+                    except OSError:
+                        pass
+            rendered.append(report_type)
+
+        return rendered
+
     async def _get_sample_with_measurements(self, sample_number: str) -> Optional[Dict[str, Any]]:
         sample = (
             self.db.query(Sample)
@@ -752,4 +940,41 @@ class ReportService:
         content.append(signature_table)
 
         return content
-        
\ No newline at end of file
+        
+
+
+def schedule_report_prerender(sample_numbers: List[str], username: str):
+    """
+    Queue the pre-rendering of the reports of updated samples.
+
+    Each sample is rendered by the report thread pool, or by a Celery worker
+    when USE_CELERY is set, with its own database session, so the request
+    that updated the samples does not wait for it.
+
+    Args:
+        sample_numbers (List[str]): Numbers of the updated samples.
+        username (str): Name of the user who updated the samples.
+    """
+    for sample_number in dict.fromkeys(sample_numbers):
+        if not sample_number:
+            continue
+        if settings.USE_CELERY:
+            from .tasks import prerender_sample_reports
+            prerender_sample_reports.delay(sample_number, username)
+        else:
+            report_executor.submit(_prerender_sample_reports, sample_number, username)
+
+
+def _prerender_sample_reports(sample_number: str, username: str):
+    # Imported here so report rendering does not need the database driver
+    from ..database.connection import SessionLocal
+
+    db = SessionLocal()
+    try:
+        rendered = asyncio.run(ReportService(db).prerender_sample_reports(sample_number, username))
+        if rendered:
+            logger.info(f"Pre-rendered {', '.join(rendered)} for sample {sample_number}")
+    except Exception as e:
+        logger.error(f"Pre-rendering reports for sample {sample_number} failed: {e}", exc_info=True)
+    finally:
+        db.close()
@@ -8,18 +8,23 @@ Migrated from MATLAB functions: loadCustomerSample.m and loadProductionSample.m
 
 Key features:
 - Automated customer sample loading from logistic data
-- Production sample scheduling based on frequency (daily, weekly, monthly, etc.)
-- Holiday-aware first-day-of-period calculations
+- Production sample scheduling based on frequency (daily, weekly, monthly, etc.),
+  with a holiday-aware calendar of working days (see production_scheduler.py)
 - Automatic measurement generation based on specifications
 - Article code mapping for customer orders
 """
 
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import List, Dict, Any, Tuple, Optional
+import hashlib
+import json
 import logging
 
+from ..core.metrics import SAMPLE_LOAD_ROWS
+from .production_scheduler import ProductionScheduler
+
 logger = logging.getLogger(__name__)
 
 
@@ -215,26 +220,70 @@ class SampleLoadingService:
                         'variable_id': variable_id
                     })
 
+    def _order_hash(self, row: Dict[str, Any], spec_id: int, limits: List[Dict]) -> str:
+        """Hash of the logistic row and specification a customer sample is loaded from"""
+        def number(value):
+            return None if value is None else float(value)
+
+        payload = [
+            row['time'], row['name_client'], row['article_no'], row['order_number_client'],
+            row['Description'], number(row['loading_ton']), spec_id,
+            [row.get(flag) for flag in ('coa', 'certificate', 'coc', 'day_coa', 'opm', 'onedecimal')],
+            sorted((limit['variable_id'], number(limit.get('min')), number(limit.get('max'))) for limit in limits)
+        ]
+        return hashlib.sha256(json.dumps(payload, default=str).encode()).hexdigest()
+
     async def load_customer_samples(self, sample_date: str, user_id: int) -> Dict[str, Any]:
         """
         Load customer samples from logistic data for given date.
         Migrated from loadCustomerSample.m
+
+        Only the orders that are new, changed or removed since the last load are
+        touched: every sample records a hash of its logistic row and specification
+        in sampleloadstate, and existing samples with the same hash are skipped.
+        Samples of removed orders are only deleted while no result was entered;
+        the others are reported as errors. The result counts the new, changed,
+        removed and unchanged orders.
         """
         errors = []
         pending_data = []
+        counts = {'new': 0, 'changed': 0, 'removed': 0, 'unchanged': 0}
 
         try:
-            # First, clean up samples that don't have corresponding logistic data
-            sql_cleanup = text("""
-                DELETE FROM sample
-                WHERE type_sample='CLI' AND NOT EXISTS(
+            # First, remove the samples of the date whose order left the logistic data.
+            # Samples with results entered are kept and reported, so a gap in the feed
+            # does not destroy test data
+            orphans = self.db.execute(text("""
+                SELECT id, sample_number, order_number_pvs,
+                    (SELECT COUNT(*) FROM measurement m WHERE m.sample_id=sample.id AND m.value IS NOT NULL) as results
+                FROM sample
+                WHERE type_sample='CLI' AND date=:sample_date AND NOT EXISTS(
                     SELECT * FROM logisticdata l
                     WHERE sample.date=SUBSTRING(CONVERT(VARCHAR,l.date,20),1,10)
                     AND sample.order_number_pvs=l.order_number_pvs
                 )
-            """)
-            self.db.execute(sql_cleanup)
-            self.db.commit()
+            """), {'sample_date': sample_date}).fetchall()
+            removed = []
+            for sample_id, sample_number, order_number_pvs, results in orphans:
+                if results:
+                    errors.append(
+                        f"Sample {sample_number} has results but order {order_number_pvs} "
+                        f"is no longer in the logistic data; it was not removed"
+                    )
+                else:
+                    removed.append({'sample_id': sample_id})
+            if removed:
+                self.db.execute(text("DELETE FROM sampleloadstate WHERE sample_id=:sample_id"), removed)
+                # Only the empty measurement rows created by the loader
+                self.db.execute(text("DELETE FROM measurement WHERE sample_id=:sample_id"), removed)
+                self.db.execute(text("DELETE FROM sample WHERE id=:sample_id"), removed)
+                counts['removed'] = len(removed)
+
+            # Hash of what was last loaded into every sample of the date
+            loaded = {int(r[0]): r[1] for r in self.db.execute(text(
+                "SELECT sample_id, row_hash FROM sampleloadstate WHERE date=:sample_date"
+            ), {'sample_date': sample_date})}
+            states = {}
 
             # Get logistic data and check for existing samples
             sql_main = text("""
@@ -299,6 +348,8 @@ class SampleLoadingService:
                 'user_id': user_id
             }).fetchall()
 
+            spec_ids = {}
+            spec_limits = {}
             for row in data:
                 row_dict = dict(row._mapping)
                 typerow = row_dict['typerow']
@@ -318,12 +369,11 @@ class SampleLoadingService:
                     pending_data.append(row_dict)
                     continue
                 
-                # Get spec_id and limits
-                spec_id, _ = self._get_spec_id(
-                    row_dict['product_id'],
-                    row_dict['quality_id'],
-                    row_dict.get('customer', '')
-                )
+                # Get spec_id and limits (the orders of a date share few specifications)
+                spec_key = (row_dict['product_id'], row_dict['quality_id'], row_dict.get('customer', ''))
+                if spec_key not in spec_ids:
+                    spec_ids[spec_key], _ = self._get_spec_id(*spec_key)
+                spec_id = spec_ids[spec_key]
 
                 if not spec_id:
                     errors.append(
@@ -333,17 +383,23 @@ class SampleLoadingService:
                     continue
 
                 # Get variable limits from spec
-                sql_limits = text("""
-                    SELECT v.name as variable, d.variable_id, d.min_value as min, d.max_value as max
-                    FROM dspec d, variable v
-                    WHERE d.variable_id=v.id AND d.spec_id=:spec_id
-                """)
-                limits = [dict(r._mapping) for r in self.db.execute(sql_limits, {'spec_id': spec_id})]
+                if spec_id not in spec_limits:
+                    sql_limits = text("""
+                        SELECT v.name as variable, d.variable_id, d.min_value as min, d.max_value as max
+                        FROM dspec d, variable v
+                        WHERE d.variable_id=v.id AND d.spec_id=:spec_id
+                    """)
+                    spec_limits[spec_id] = [dict(r._mapping) for r in self.db.execute(sql_limits, {'spec_id': spec_id})]
+                limits = spec_limits[spec_id]
 
-                # Process based on typerow
-                sample_number = self._get_sample_number(sample_date, 'CLI')
+                # Skip the samples loaded from the same logistic row and specification
+                row_hash = self._order_hash(row_dict, spec_id, limits)
+                if typerow == 'U' and loaded.get(row_dict['id']) == row_hash:
+                    counts['unchanged'] += 1
+                    continue
 
                 if typerow == 'N':
+                    sample_number = self._get_sample_number(sample_date, 'CLI')
                     # Insert new sample
                     current_time = datetime.now()
 
@@ -402,14 +458,17 @@ class SampleLoadingService:
                     # Insert measurements if COA or Day_COA is required
                     if row_dict.get('coa') == 'X' or row_dict.get('day_coa') == 'X':
                         self._insert_measurements(sample_id, limits)
-
-                    self.db.commit()
+                    counts['new'] += 1
 
                 elif typerow == 'U':
-                    # Update existing sample
+                    # Update the existing sample; it keeps its sample number
                     sql_update = text("""
                         UPDATE sample SET
-                            sample_number=:sample_number,
+                            time=:time,
+                            article_no=:article_no,
+                            order_number_client=:order_number_client,
+                            description=:description,
+                            loading_ton=:loading_ton,
                             coa=:coa,
                             certificate=:certificate,
                             coc=:coc,
@@ -420,7 +479,11 @@ class SampleLoadingService:
                     """)
 
                     self.db.execute(sql_update, {
-                        'sample_number': sample_number,
+                        'time': row_dict['time'],
+                        'article_no': row_dict['article_no'],
+                        'order_number_client': row_dict['order_number_client'],
+                        'description': row_dict['Description'],
+                        'loading_ton': row_dict['loading_ton'],
                         'coa': row_dict.get('coa', ''),
                         'certificate': row_dict.get('certificate', ''),
                         'coc': row_dict.get('coc', ''),
@@ -434,14 +497,29 @@ class SampleLoadingService:
                     # Update measurements
                     sample_id = row_dict['id']
                     self._update_measurements(sample_id, limits)
+                    counts['changed'] += 1
+
+                states[sample_id] = {'sample_id': sample_id, 'date': sample_date,
+                                     'order_number_pvs': row_dict['order_number_pvs'], 'row_hash': row_hash}
+
+            if states:
+                self.db.execute(text("DELETE FROM sampleloadstate WHERE sample_id=:sample_id"),
+                                [{'sample_id': sample_id} for sample_id in states])
+                self.db.execute(text("""
+                    INSERT INTO sampleloadstate(sample_id, date, order_number_pvs, row_hash)
+                    VALUES (:sample_id, :date, :order_number_pvs, :row_hash)
+                """), list(states.values()))
+            self.db.commit()
 
-                    self.db.commit()
+            SAMPLE_LOAD_ROWS.labels(source="customer").inc(len(data))
 
             return {
                 'success': len(errors) == 0,
-                'message': f"Processed {len(data)} records",
+                'message': (f"Processed {len(data)} records: {counts['new']} new, {counts['changed']} changed, "
+                            f"{counts['removed']} removed, {counts['unchanged']} unchanged"),
                 'errors': errors if errors else None,
-                'pending_data': pending_data if pending_data else None
+                'pending_data': pending_data if pending_data else None,
+                **counts
             }
 
         except Exception as e:
@@ -449,267 +527,13 @@ class SampleLoadingService:
             logger.error(f"Error loading customer samples: {e}")
             raise
 
-    def _get_first_day_of_period(self, date_obj: datetime, frequency: str) -> str:
-        """Get the first non-holiday day of the period based on frequency"""
-
-        if frequency == '1/2 year':
-            # First day of semester (Jan 1 or Jul 1)
-            month = 1 if date_obj.month <= 6 else 7
-            first_day = datetime(date_obj.year, month, 1)
-
-        elif frequency == 'Month':
-            # First day of month
-            first_day = datetime(date_obj.year, date_obj.month, 1)
-
-        elif frequency == 'Quarter':
-            # First day of quarter
-            quarter = (date_obj.month - 1) // 3 + 1
-            month = (quarter - 1) * 3 + 1
-            first_day = datetime(date_obj.year, month, 1)
-
-        elif frequency == 'Week':
-            # First day of week (Monday)
-            days_since_monday = date_obj.weekday()
-            first_day = date_obj - timedelta(days=days_since_monday)
-
-        else:
-            # For 'Day' or others, return the date itself
-            return date_obj.strftime('%Y-%m-%d')
-
-        # Check for holidays and skip to next non-holiday
-        offset = 0
-        while True:
-            check_date = first_day + timedelta(days=offset)
-            date_str = check_date.strftime('%Y-%m-%d')
-
-            sql = text("SELECT * FROM holidays WHERE date=:date")
-            result = self.db.execute(sql, {'date': date_str}).first()
-
-            if not result:
-                return date_str
-
-            offset += 1
-
-    async def load_production_samples(self, sample_date: str, user_id: int) -> Dict[str, Any]:
+    async def load_production_samples(self, sample_date: str, user_id: int,
+                                      end_date: Optional[str] = None) -> Dict[str, Any]:
         """
         Load production samples based on sample matrix and frequency.
         Migrated from loadProductionSample.m
-        """
-        errors = []
-        date_obj = datetime.strptime(sample_date, '%Y-%m-%d')
 
-        try:
-            # Check each frequency type
-            frequencies = ['1/2 year', 'Week', 'Month', 'Quarter']
-
-            for frequency in frequencies:
-                first_day = self._get_first_day_of_period(date_obj, frequency)
-
-                # Only process if sample_date is the first day of the period
-                if first_day == sample_date:
-                    description = {
-                        '1/2 year': '1/2 year sample',
-                        'Week': 'Weekly sample',
-                        'Month': 'Monthly sample',
-                        'Quarter': 'Quarterly sample'
-                    }.get(frequency, f'{frequency} sample')
-
-                    freq_errors = await self._load_production_samples_by_frequency(
-                        sample_date, frequency, user_id, description, 'PRO'
-                    )
-                    errors.extend(freq_errors)
-
-            # Always process daily samples
-            daily_errors = await self._load_production_samples_by_frequency(
-                sample_date, 'Day', user_id, 'Daily sample', 'PRO'
-            )
-            errors.extend(daily_errors)
-
-            return {
-                'success': len(errors) == 0,
-                'message': f"Production samples loaded for {sample_date}",
-                'errors': errors if errors else None
-            }
-
-        except Exception as e:
-            self.db.rollback()
-            logger.error(f"Error loading production samples: {e}")
-            raise
-
-    async def _load_production_samples_by_frequency(
-        self,
-        sample_date: str,
-        frequency: str,
-        user_id: int,
-        description: str,
-        type_sample: str
-    ) -> List[str]:
-        """Load production samples for a specific frequency"""
-        errors = []
-
-        # Get sample matrix entries for this frequency that don't have samples yet
-        sql_matrix = text("""
-            SELECT x.id, x.sample_point_id, x.spec_id, x.product_id, x.quality_id, p.name as Product, 
-                q.name as Quality, sp.name as SamplePoint
-            FROM samplematrix x, product p, quality q, samplepoint sp
-            WHERE frequency=:frequency
-            AND x.product_id=p.id
-            AND x.quality_id=q.id
-            AND x.sample_point_id=sp.id
-            AND NOT EXISTS(
-                SELECT * FROM sample s
-                WHERE type_sample=:type_sample
-                AND s.date=:sample_date
-                AND x.product_id=s.product_id
-            )
-        """)
-
-        matrix_entries = self.db.execute(sql_matrix, {
-            'frequency': frequency,
-            'type_sample': type_sample,
-            'sample_date': sample_date
-        }).fetchall()
-
-        # Generate time offsets for each sample (starting from 06:00, +1 minute each)
-        base_time = datetime.strptime('06:00', '%H:%M')
-
-        for idx, entry in enumerate(matrix_entries):
-            entry_dict = dict(entry._mapping)
-            sample_time = (base_time + timedelta(minutes=idx)).strftime('%H:%M')
-
-            error = await self._insert_production_sample(
-                entry_dict, user_id, sample_date, description, type_sample, sample_time
-            )
-
-            if error:
-                errors.append(error)
-
-        self.db.commit()
-        return errors
-
-    async def _insert_production_sample(
-        self,
-        matrix_entry: Dict,
-        user_id: int,
-        sample_date: str,
-        description: str,
-        type_sample: str,
-        sample_time: str
-    ) -> Optional[str]:
-        """Insert a single production sample"""
-        product_id = matrix_entry['product_id']
-        quality_id = matrix_entry['quality_id']
-        sample_matrix_id = matrix_entry['id']
-        sample_point_id = matrix_entry['sample_point_id']
-
-        # Check for duplicates
-        sql_check = text("""
-            SELECT id FROM sample
-            WHERE type_sample=:type_sample
-            AND sample_matrix_id=:sample_matrix_id
-            AND date=:sample_date
-            AND time=:sample_time
-        """)
-        existing = self.db.execute(sql_check, {
-            'type_sample': type_sample,
-            'sample_matrix_id': sample_matrix_id,
-            'sample_date': sample_date,
-            'sample_time': sample_time
-        }).first()
-
-        if existing:
-            return None  # Skip duplicates silently
-
-        # Get spec ID
-        spec_id, _ = self._get_spec_id(product_id, quality_id, '')
-
-        if not spec_id:
-            return (
-                f"No specification found for Product={matrix_entry['Product']}, "
-                f"Quality={matrix_entry['Quality']}"
-            )
-
-        # Get variable limits
-        sql_limits = text("""
-            SELECT v.name as variable, d.variable_id, NULL as min, NULL as max
-            FROM dsamplematrix d, variable v
-            WHERE d.variable_id=v.id AND d.sample_matrix_id=:sample_matrix_id
-            AND NOT EXISTS(
-                SELECT * FROM dspec d2, samplematrix sm, spec sp
-                WHERE sm.product_id=sp.product_id
-                AND sm.quality_id=sp.quality_id
-                AND sp.type_spec='GEN'
-                AND d.variable_id = d2.variable_id
-            )
-            UNION
-            SELECT v.name as variable, d.variable_id, d2.min_value as min, d2.max_value as max
-            FROM dsamplematrix d, variable v, dspec d2, samplematrix sm, spec sp
-            WHERE d.variable_id=v.id
-            AND d.sample_matrix_id=:sample_matrix_id
-            AND sp.type_spec='GEN'
-            AND d.sample_matrix_id=sm.id
-            AND d2.spec_id=sp.id
-            AND sm.product_id=sp.product_id
-            AND sm.quality_id=sp.quality_id
-            AND d.variable_id = d2.variable_id
-        """)
-
-        limits = [dict(r._mapping) for r in self.db.execute(sql_limits, {
-            'sample_matrix_id': sample_matrix_id
-        })]
-
-        if not limits:
-            return (
-                f"No variables found for Product={matrix_entry['Product']}, "
-                f"Quality={matrix_entry['Quality']}, SamplePoint={matrix_entry['SamplePoint']}"
-            )
-
-        # Generate sample number
-        sample_number = self._get_sample_number(sample_date, type_sample)
-
-        # Insert sample
-        current_time = datetime.now()
-
-        sql_insert = text("""
-            INSERT INTO sample(
-                type_sample, spec_id, customer, sample_matrix_id,
-                product_id, quality_id, created_by_id, creation_date,
-                date, time, description, sample_number, sample_point_id, article_no
-            )
-            OUTPUT INSERTED.id
-            VALUES (
-                :type_sample, :spec_id, 'INC', :sample_matrix_id,
-                :product_id, :quality_id, :user_id, :creation_date,
-                :date, :time, :description, :sample_number, :sample_point_id, 0
-            )
-        """)
-
-        result = self.db.execute(sql_insert, {
-            'type_sample': type_sample,
-            'spec_id': spec_id,
-            'sample_matrix_id': sample_matrix_id,
-            'product_id': product_id,
-            'quality_id': quality_id,
-            'user_id': user_id,
-            'creation_date': current_time,
-            'date': sample_date,
-            'time': sample_time,
-            'description': description,
-            'sample_number': sample_number,
-            'sample_point_id': sample_point_id
-        })
-
-        # Get inserted sample ID from OUTPUT clause
-        row = result.first()
-        if row:
-            sample_id = int(row[0]) if row[0] is not None else None
-        else:
-            sample_id = None
-
-        if sample_id is None:
-            raise ValueError("Failed to retrieve inserted sample ID for production sample")
-
-        # Insert measurements
-        self._insert_measurements(sample_id, limits)
-
-        return None
+        Creates the samples of every sample matrix due on the date, or on each
+        day up to end_date, in one bulk operation (see ProductionScheduler).
+        """
+        return ProductionScheduler(self.db).create_samples(sample_date, end_date or sample_date, user_id)
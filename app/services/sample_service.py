@@ -7,7 +7,7 @@ and specification-based measurement generation for different sample types.
 """
 
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, func
 from typing import Optional, List, Dict, Any
 from datetime import datetime, date
 import logging
@@ -288,15 +288,95 @@ class SampleService:
         Raises:
             ValueError: If the sample is not found.
         """
-        sample = self.db.query(Sample).filter(Sample.sample_number == sample_number).first()
+        result = await self.refresh_samples_specifications([sample_number])
 
-        if not sample:
+        if result["not_found"]:
             raise ValueError(f"Sample {sample_number} not found")
 
-        # Refresh measurements based on current specifications
-        measurement = await self._generate_sample_measurements(sample)
-        return measurement
-    
+        return next(iter(result["measurements"].values()))
+
+    async def refresh_samples_specifications(self, sample_numbers: List[str]) -> Dict[str, Any]:
+        """
+        Refresh the measurements of many samples in one batched pass.
+
+        Samples, specifications, sample matrices and measurements are each
+        loaded with one query per 1000 samples, instead of several queries
+        per sample and per measurement.
+
+        Args:
+            sample_numbers (List[str]): Sample numbers to refresh.
+
+        Returns:
+            Dict[str, Any]: 'measurements' maps each sample number to its
+                measurement list (None when no specification applies) and
+                'not_found' lists the unknown sample numbers.
+        """
+        sample_numbers = list(dict.fromkeys(sample_numbers))
+        samples = []
+        for i in range(0, len(sample_numbers), 1000):
+            samples.extend(
+                self.db.query(Sample)
+                .filter(Sample.sample_number.in_(sample_numbers[i:i + 1000]))
+                .all()
+            )
+
+        found = {sample.sample_number.strip() for sample in samples}
+        not_found = [n for n in sample_numbers if n.strip() not in found]
+        if not samples:
+            return {"measurements": {}, "not_found": not_found}
+
+        product_ids = list({sample.product_id for sample in samples})
+
+        # Customer (CLI) and general (GEN) specifications of the products involved
+        specs = {}
+        spec_rows = (
+            self.db.query(Spec)
+            .filter(Spec.type_spec.in_(["CLI", "GEN"]), Spec.product_id.in_(product_ids))
+            .order_by(Spec.id)
+            .all()
+        )
+        # Customers are matched without case and surrounding blanks, like the
+        # case-insensitive comparison of the database
+        for spec in spec_rows:
+            customer = spec.customer.strip().casefold() if spec.type_spec == "CLI" and spec.customer else None
+            specs.setdefault((spec.type_spec, spec.product_id, spec.quality_id, customer), spec)
+
+        matrices = {}
+        if any(sample.type_sample == "PRO" for sample in samples):
+            matrix_rows = (
+                self.db.query(SampleMatrix)
+                .filter(SampleMatrix.product_id.in_(product_ids))
+                .order_by(SampleMatrix.id)
+                .all()
+            )
+            for matrix in matrix_rows:
+                matrices.setdefault((matrix.product_id, matrix.quality_id, matrix.sample_point_id), matrix)
+
+        measurements = {}
+        spec_samples = []
+        for sample in samples:
+            number = sample.sample_number.strip()
+            measurements[number] = None
+            if sample.type_sample == "PRO":
+                matrix = matrices.get((sample.product_id, sample.quality_id, sample.sample_point_id))
+                if not matrix:
+                    logger.warning(f"No sample matrix found for sample {sample.id}")
+                    continue
+                measurements[number] = await self._create_measurements_from_matrix(sample, matrix)
+            elif sample.type_sample == "CLI":
+                customer = sample.customer.strip().casefold() if sample.customer else None
+                if ("CLI", sample.product_id, sample.quality_id, customer) in specs:
+                    spec_samples.append(sample)
+            elif sample.type_sample == "MAN":
+                if ("GEN", sample.product_id, sample.quality_id, None) in specs:
+                    spec_samples.append(sample)
+
+        spec_measurements = await self._load_spec_measurements(spec_samples)
+        for sample in spec_samples:
+            measurements[sample.sample_number.strip()] = spec_measurements.get(sample.id, [])
+
+        return {"measurements": measurements, "not_found": not_found}
+
     async def get_samples_with_measurements(self, sample_date: str) -> List[Dict[str, Any]]:
         """
         Get samples for a specific date with measurements (CLI and MAN types only).
@@ -555,37 +635,79 @@ class SampleService:
             Dict[str, Any]: Dictionary containing total_measurements, completed_measurements,
                 completion_percentage, and is_complete flag.
         """
-        sample = (
-            self.db.query(Sample)
-            .filter(Sample.sample_number == sample_number)
-            .first()
-        )
+        statuses = await self.get_samples_completion_status(sample_numbers=[sample_number])
 
-        if not sample:
+        if not statuses:
             raise ValueError(f"Sample {sample_number} not found")
 
-        measurements = (
-            self.db.query(Measurement)
-            .filter(Measurement.sample_id == sample.id)
-            .all()
-        )
+        status_info = statuses[0]
+        status_info["sample_number"] = sample_number
+        return status_info
 
-        total_measurements = len(measurements)
-        completed_measurements = len([m for m in measurements if m.value is not None])
-        
-        completion_percentage = (
-            (completed_measurements / total_measurements * 100) 
-            if total_measurements > 0 
-            else 0
+    async def get_samples_completion_status(
+        self,
+        sample_date: Optional[str] = None,
+        sample_numbers: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Calculate the testing completion status of many samples at once.
+
+        Measurements are counted in the database with one grouped COUNT query
+        (per 1000 sample numbers) instead of loading them. The counts are grouped
+        by sample id, so samples sharing a number are not merged.
+
+        Args:
+            sample_date (Optional[str]): Filter by sample date (YYYY-MM-DD format).
+            sample_numbers (Optional[List[str]]): Filter by sample numbers.
+
+        Returns:
+            List[Dict[str, Any]]: One completion status per sample, with the same
+                fields as get_sample_completion_status plus the sample_id.
+        """
+        query = (
+            self.db.query(
+                Sample.id,
+                Sample.sample_number,
+                func.count(Measurement.id),
+                func.count(Measurement.value)
+            )
+            .outerjoin(Measurement, Measurement.sample_id == Sample.id)
         )
 
-        return {
-            "sample_number": sample_number,
-            "total_measurements": total_measurements,
-            "completed_measurements": completed_measurements,
-            "completion_percentage": round(completion_percentage, 2),
-            "is_complete": completion_percentage == 100
-        }
+        if sample_date:
+            query = query.filter(Sample.date == sample_date)
+
+        if sample_numbers is None:
+            rows = query.group_by(Sample.id, Sample.sample_number).order_by(Sample.id).all()
+        else:
+            # Keep the IN list below the SQL Server parameter limit
+            sample_numbers = list(dict.fromkeys(sample_numbers))
+            rows = []
+            for i in range(0, len(sample_numbers), 1000):
+                rows.extend(
+                    query.filter(Sample.sample_number.in_(sample_numbers[i:i + 1000]))
+                    .group_by(Sample.id, Sample.sample_number)
+                    .order_by(Sample.id)
+                    .all()
+                )
+
+        result = []
+        for sample_id, sample_number, total_measurements, completed_measurements in rows:
+            completion_percentage = (
+                (completed_measurements / total_measurements * 100)
+                if total_measurements > 0
+                else 0
+            )
+            result.append({
+                "sample_id": sample_id,
+                "sample_number": sample_number.strip() if sample_number else sample_number,
+                "total_measurements": total_measurements,
+                "completed_measurements": completed_measurements,
+                "completion_percentage": round(completion_percentage, 2),
+                "is_complete": completion_percentage == 100
+            })
+
+        return result
 
     async def _generate_sample_number(self, type_sample: str) -> str:
         """
@@ -760,26 +882,50 @@ class SampleService:
         Returns:
             List[Dict[str, Any]]: List of processed measurement dictionaries with formatted values.
         """
-        # Query measurements joined with sample and variable, ordered by variable.ord
-        measurements = (
-            self.db.query(Measurement)
-            .join(Variable, Measurement.variable_id == Variable.id)
-            .join(Sample, Measurement.sample_id == Sample.id)
-            .filter(Sample.sample_number == sample.sample_number)
-            .order_by(Variable.ord)
-            .all()
-        )
+        measurements = await self._load_spec_measurements([sample])
+        return measurements.get(sample.id, [])
 
-        # Process measurements to create formatted result
-        result = []
-        for measurement in measurements:
-            # Get variable information
-            variable = (
-                self.db.query(Variable)
-                .filter(Variable.id == measurement.variable_id)
-                .first()
+    async def _load_spec_measurements(self, samples: List[Sample]) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Load the formatted measurements of several samples.
+
+        Measurement and variable columns are fetched in one projection query
+        per 1000 samples, ordered by variable.ord.
+
+        Args:
+            samples (List[Sample]): The sample objects.
+
+        Returns:
+            Dict[int, List[Dict[str, Any]]]: Measurement dictionaries by sample id.
+        """
+        sample_numbers = {sample.id: sample.sample_number.strip() for sample in samples}
+        sample_ids = list(sample_numbers)
+
+        rows = []
+        for i in range(0, len(sample_ids), 1000):
+            rows.extend(
+                self.db.query(
+                    Measurement.id,
+                    Measurement.sample_id,
+                    Measurement.variable_id,
+                    Variable.name.label("variable"),
+                    Measurement.value,
+                    Measurement.min_value,
+                    Measurement.max_value,
+                    Measurement.less,
+                    Measurement.test_date,
+                    Measurement.tested_by_id,
+                    Variable.typevar
+                )
+                .join(Variable, Measurement.variable_id == Variable.id)
+                .filter(Measurement.sample_id.in_(sample_ids[i:i + 1000]))
+                .order_by(Measurement.sample_id, Variable.ord)
+                .all()
             )
 
+        # Process measurements to create formatted result
+        result = {sample_id: [] for sample_id in sample_ids}
+        for measurement in rows:
             # Initialize str_value
             str_value = ""
 
@@ -798,7 +944,7 @@ class SampleService:
 
             # Create measurement dictionary
             measurement_dict = {
-                "sample_number": sample.sample_number.strip(),
+                "sample_number": sample_numbers[measurement.sample_id],
                 "id": measurement.id,
                 "sample_id": measurement.sample_id,
                 "variable_id": measurement.variable_id,
@@ -810,11 +956,11 @@ class SampleService:
                 "less": measurement.less if measurement.less is not None else False,
                 "test_date": measurement.test_date,
                 "tested_by_id": measurement.tested_by_id,
-                "typevar": variable.typevar if variable else None,
+                "typevar": measurement.typevar,
                 "modified": 0  # Default value as in MATLAB code
             }
 
-            result.append(measurement_dict)
+            result[measurement.sample_id].append(measurement_dict)
 
         return result
 
@@ -0,0 +1,134 @@
+"""
+Celery tasks module.
+
+Runs the heavy jobs of the LIMS on the Celery workers instead of inside HTTP
+requests: the daily loading of customer and production samples (scheduled in
+app/core/celery.py), the pre-rendering of the reports of completed samples and
+master data imports (queued instead of the in-process thread pools when
+USE_CELERY is set).
+
+Every task opens its own database session. The sample loaders and the report
+pre-rendering are retried with exponential backoff when they raise (e.g. the
+database is unreachable); data errors are returned in the task result.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from ..core.celery import celery_app
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+retry_options = {
+    "autoretry_for": (Exception,),
+    "retry_backoff": 60,
+    "retry_backoff_max": 900,
+    "retry_jitter": True,
+    "max_retries": 5,
+}
+
+
+def run_async(coro):
+    """
+    Run a service coroutine to completion from a task.
+
+    Eager tasks may be called from a request, inside a running event loop; the
+    coroutine then runs in a thread with its own loop.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+def _load_samples(loader: str, sample_date: Optional[str]) -> Dict[str, Any]:
+    from ..database.connection import SessionLocal
+    from .sample_loading_service import SampleLoadingService
+
+    sample_date = sample_date or celery_app.now().strftime("%Y-%m-%d")
+    db = SessionLocal()
+    try:
+        service = SampleLoadingService(db)
+        result = run_async(getattr(service, loader)(sample_date, settings.SCHEDULER_USER_ID))
+    finally:
+        db.close()
+
+    logger.info(f"{loader} for {sample_date}: {result['message']}")
+    return {
+        "sample_date": sample_date,
+        "success": result["success"],
+        "message": result["message"],
+        "errors": result.get("errors")
+    }
+
+
+@celery_app.task(**retry_options)
+def load_customer_samples(sample_date: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Load the customer samples of a date from the logistic data.
+
+    Args:
+        sample_date (Optional[str]): Date in YYYY-MM-DD format. Defaults to
+            today in CELERY_TIMEZONE.
+
+    Returns:
+        Dict[str, Any]: Date, success flag, message and data errors.
+    """
+    return _load_samples("load_customer_samples", sample_date)
+
+
+@celery_app.task(**retry_options)
+def load_production_samples(sample_date: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Create the production samples of the sample matrices due on a date.
+
+    Args:
+        sample_date (Optional[str]): Date in YYYY-MM-DD format. Defaults to
+            today in CELERY_TIMEZONE.
+
+    Returns:
+        Dict[str, Any]: Date, success flag, message and data errors.
+    """
+    return _load_samples("load_production_samples", sample_date)
+
+
+@celery_app.task(**retry_options)
+def prerender_sample_reports(sample_number: str, username: str) -> List[str]:
+    """
+    Pre-render the reports of a completed sample.
+
+    Args:
+        sample_number (str): Sample number.
+        username (str): Name of the user who completed the sample.
+
+    Returns:
+        List[str]: Report types rendered.
+    """
+    from ..database.connection import SessionLocal
+    from .report_service import ReportService
+
+    db = SessionLocal()
+    try:
+        rendered = run_async(ReportService(db).prerender_sample_reports(sample_number, username))
+    finally:
+        db.close()
+    if rendered:
+        logger.info(f"Pre-rendered {', '.join(rendered)} for sample {sample_number}")
+    return rendered
+
+
+@celery_app.task
+def import_master_data(job_id: str, path: str, filename: str, table_type: str):
+    """
+    Run a queued master data import job (see JobService).
+
+    Not retried: the outcome, including failures, is recorded in the job.
+    """
+    from .job_service import JobService
+
+    JobService().run_master_data_import(job_id, path, filename, table_type)
@@ -6,7 +6,7 @@ password management, and signature image handling.
 """
 
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import text, bindparam
 from fastapi import HTTPException, UploadFile, status
 from typing import List, Dict, Any, Optional
 import os
@@ -16,9 +16,18 @@ from datetime import datetime
 from ..models.user import User, UserOption, OptionMenu
 from ..core.security import get_password_hash, verify_password
 from .email_service import EmailService
+from ..utils.cache import ReferenceCache
 
 logger = logging.getLogger(__name__)
 
+# Cached optionmenu name-to-id map shared by all UserService instances
+option_menu_cache = ReferenceCache("optionmenu")
+
+
+def invalidate_option_menu_cache():
+    """Drop the cached optionmenu map. Call after optionmenu rows change."""
+    option_menu_cache.invalidate()
+
 
 class UserService:
     """
@@ -419,33 +428,78 @@ class UserService:
         return access_list
 
     async def update_user_access(self, user_id: int, options: List[str]) -> Dict[str, str]:
-        """Update user access permissions"""
-        # Delete existing access
-        delete_query = "DELETE FROM optionuser WHERE user_id = :user_id"
-        self.db.execute(text(delete_query), {"user_id": user_id})
-
-        # Insert new access
-        for option_name in options:
-            # Get option ID
-            option_query = "SELECT id FROM optionmenu WHERE name = :name"
-            result = self.db.execute(text(option_query), {"name": option_name})
-            row = result.fetchone()
-
-            if row:
-                option_id = row[0]
+        """
+        Update user access permissions.
+
+        Compares the requested options with the current optionuser rows and
+        applies only the difference (one bulk DELETE and one executemany
+        INSERT) inside a single transaction.
+
+        Args:
+            user_id (int): ID of the user.
+            options (List[str]): Names of the menu options the user should have.
+
+        Returns:
+            Dict[str, str]: Success message.
+        """
+        option_ids = self._resolve_option_ids(options)
+
+        # Get current access
+        access_query = "SELECT option_id FROM optionuser WHERE user_id = :user_id"
+        result = self.db.execute(text(access_query), {"user_id": user_id})
+        current_ids = {row[0] for row in result.fetchall()}
+
+        to_insert = sorted(option_ids - current_ids)
+        to_delete = sorted(current_ids - option_ids)
+
+        try:
+            if to_delete:
+                delete_query = text("""
+                    DELETE FROM optionuser
+                    WHERE user_id = :user_id AND option_id IN :option_ids
+                """).bindparams(bindparam("option_ids", expanding=True))
+                self.db.execute(delete_query, {"user_id": user_id, "option_ids": to_delete})
+
+            if to_insert:
                 insert_query = """
                     INSERT INTO optionuser (user_id, option_id)
                     VALUES (:user_id, :option_id)
                 """
-                self.db.execute(text(insert_query), {
-                    "user_id": user_id,
-                    "option_id": option_id
-                })
-
-        self.db.commit()
+                self.db.execute(text(insert_query), [
+                    {"user_id": user_id, "option_id": option_id}
+                    for option_id in to_insert
+                ])
+
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            # The cached map may hold ids of options that no longer exist
+            invalidate_option_menu_cache()
+            raise
 
         return {"message": "User access updated successfully"}
 
+    def _resolve_option_ids(self, options: List[str]) -> set:
+        """
+        Map option names to optionmenu ids using the cached name-to-id map.
+
+        Unknown names are ignored. If a name is missing from the cache, the map
+        is reloaded once in case the option was added after it was cached.
+        """
+        keys = {option_name.strip().lower() for option_name in options if option_name}
+        name_to_id = option_menu_cache.get("name_to_id", self._load_option_menu_map)
+
+        if not keys.issubset(name_to_id):
+            option_menu_cache.invalidate()
+            name_to_id = option_menu_cache.get("name_to_id", self._load_option_menu_map)
+
+        return {name_to_id[key] for key in keys if key in name_to_id}
+
+    def _load_option_menu_map(self) -> Dict[str, int]:
+        """Load the optionmenu name-to-id map (names compared trimmed and case-insensitive)"""
+        result = self.db.execute(text("SELECT id, name FROM optionmenu"))
+        return {row[1].strip().lower(): row[0] for row in result if row[1]}
+
     async def get_menu_options(self):
         """Get all available menu options"""
         query = "SELECT id, name FROM optionmenu ORDER BY name"
@@ -458,4 +512,9 @@ class UserService:
                 "name": row[1]
             })
 
+        # Refresh the cached name-to-id map with the rows just read
+        option_menu_cache.set("name_to_id", {
+            option["name"].strip().lower(): option["id"] for option in options if option["name"]
+        })
+
         return options
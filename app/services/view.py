@@ -16,11 +16,17 @@ The view system supports:
 """
 
 import pandas as pd
-from sqlalchemy import text
+from sqlalchemy import text, bindparam
+import ast
 import math
 import numpy as np
 from datetime import datetime
 import re
+import time
+
+from ..core.config import settings
+from ..core.metrics import MASTER_DATA_IMPORT_DURATION
+from ..utils.cache import ReferenceCache
 
 def convert_numpy_types(obj):
     """
@@ -113,15 +119,6 @@ def isNull(value):
 
 
 
-# Define the function to check foreign key constraint
-def checkFK0(db, query, parameters):
-    r = db.execute(text(query), params= parameters)
-    T = list(r)
-    if len(T)>0:
-        return int(T[0][0])
-    else:
-        return 0
-
 # Define the function to check foreign key constraint
 def checkFK(db, query, **kwargs):
     r = db.execute(text(query), params= kwargs)
@@ -132,41 +129,181 @@ def checkFK(db, query, **kwargs):
         return 0
 
 
-# This function updates the detail of specification in dspec table based on
-# the intervals saved in spec for a given id (idspec)
-def updatedSpec(db, id, row, cols):
-    sql = "DELETE FROM dspec WHERE spec_id=:id"
-    db.execute(text(sql), {'id':id} )
-    db.commit()
-    for col in cols:
-        min_val = row['min_'+col[0].strip().lower()]
-        if col[1]['typevar'] == 'I':
-            max_val = row['max_'+col[0].strip().lower()]
+# Normalizes a value the way SQL Server compares it in a WHERE clause
+# (trailing blanks and case are ignored for strings)
+def refKey(value):
+    if isNull(value):
+        return None
+    if isinstance(value, str):
+        return value.rstrip().lower()
+    return value
+
+
+# This function returns the table columns of the unique key of view_name
+def keyColumns(view_name, key):
+    columns = []
+    for col in key:
+        if 'fk' in view[view_name]['cols'][col]:
+            columns.append(view[view_name]['cols'][col]['column'])
         else:
-            max_val = None
-        idvariable = col[1]['id']  
-        if not min_val is None or not max_val is None:                            
-           sql = "INSERT INTO dSpec(spec_id, variable_id, min_value, max_value) VALUES( :p1, :p2, :p3, :p4) ; "
-           db.execute(text(sql), {'p1':id, 'p2':idvariable, 'p3':min_val, 'p4':max_val}    )
-    db.commit()
+            columns.append(col)
+    return columns
+
+
+# This function preloads everything the validation needs to look up in the database,
+# so an upload is validated with one query per table instead of one per cell:
+#   'fk'   : {table: {name: id}} for every FK table referenced in view[...]['cols']
+#   'keys' : [{key tuple: id}] for every unique key of the view
+#   'ids'  : {id: [(key index, key tuple)]}, the reverse map of 'keys'
+#   'dcols': memo of the denormalized column queries by parameter values
+def loadLookups(db, view_name):
+    lookups = {'fk': {}, 'keys': [], 'ids': {}, 'dcols': {}}
+    for label, value in view[view_name]['cols'].items():
+        if 'fk' in value and value['fk'] not in lookups['fk']:
+            table = value['fk']
+            names = {}
+            for t in db.execute(text("SELECT id, name FROM " + table)):
+                if not isNull(t[1]):
+                    names.setdefault(refKey(t[1]), int(t[0]))
+            lookups['fk'][table] = names
+
+    lookups['keys'] = loadKeys(db, view_name)
+    for n, keyset in enumerate(lookups['keys']):
+        for values, id in keyset.items():
+            lookups['ids'].setdefault(id, []).append((n, values))
+    return lookups
+
+
+# This function returns [{key tuple: id}] for every unique key of view_name
+def loadKeys(db, view_name):
+    where = ""
+    if 'filter' in view[view_name]:
+        for col, value in view[view_name]['filter'].items():
+            if type(value) is str:
+                value = "'" + value + "'"
+            where = where + col + "=" + value + " AND "
+    if where != "":
+        where = " WHERE " + where[0:-4]
+
+    keysets = []
+    for key in view[view_name].get('keys', []):
+        columns = keyColumns(view_name, key)
+        sql = "SELECT id, " + ", ".join(columns) + " FROM " + view[view_name]['table'] + where
+        keyset = {}
+        for t in db.execute(text(sql)):
+            keyset.setdefault(tuple(refKey(v) for v in t[1:]), int(t[0]))
+        keysets.append(keyset)
+    return keysets
+
+
+# This function returns the set of ids of the records of view_name
+def loadIds(db, view_name):
+    return {int(t[0]) for t in db.execute(text("SELECT id FROM " + view[view_name]['table']))}
+
+
+# This function returns the normalized values of the unique key of row2, or None
+# if one of them is null (a null never matches in the uniqueness query)
+def keyValues(view_name, key, row2):
+    values = tuple(refKey(row2.get(column)) for column in keyColumns(view_name, key))
+    if any(v is None for v in values):
+        return None
+    return values
+
+
+# This function registers the unique keys of row2 for the record id, so later rows
+# of the same upload are checked against it
+def registerKeys(view_name, lookups, row2, id):
+    for n, (key, keyset) in enumerate(zip(view[view_name].get('keys', []), lookups['keys'])):
+        values = keyValues(view_name, key, row2)
+        if values is not None:
+            keyset[values] = id
+            lookups['ids'].setdefault(id, []).append((n, values))
+
+
+# This function removes the unique keys registered for the record id, found through
+# the reverse map instead of a scan of the keysets
+def unregisterKeys(lookups, id):
+    for n, values in lookups['ids'].pop(id, []):
+        keyset = lookups['keys'][n]
+        if keyset.get(values) == id:
+            del keyset[values]
+
+
+# Maximum number of ids in a single IN (...) list, below the 2100 parameters of SQL Server
+chunk_size = 1000
+
+
+# Numeric values are compared as floats, so Decimal(5) read from the database equals 5.0
+def sameValues(values1, values2):
+    return [None if v is None else float(v) for v in values1] == \
+           [None if v is None else float(v) for v in values2]
+
+
+# This function reconciles the detail table (parent_col, variable_id, value_cols) of the
+# records parent_ids with detail {(parent id, variable id): values}. Only the rows that
+# changed are deleted, updated or inserted, with one executemany per statement.
+def syncDetail(db, table, parent_col, parent_ids, detail, value_cols=()):
+    columns = ", ".join([parent_col, 'variable_id'] + list(value_cols))
+    select = text(f"SELECT {columns} FROM {table} WHERE {parent_col} IN :ids").bindparams(
+        bindparam('ids', expanding=True))
+    current = {}
+    parent_ids = list(set(parent_ids))
+    for k in range(0, len(parent_ids), chunk_size):
+        for t in db.execute(select, {'ids': parent_ids[k:k + chunk_size]}):
+            current[(int(t[0]), int(t[1]))] = tuple(t[2:])
+
+    def params(key, values):
+        return dict({'p': key[0], 'v': key[1]}, **dict(zip(value_cols, values)))
+
+    deletes = [params(key, ()) for key in current if key not in detail]
+    inserts = [params(key, values) for key, values in detail.items() if key not in current]
+    updates = [params(key, values) for key, values in detail.items()
+               if key in current and not sameValues(current[key], values)]
+
+    if deletes:
+        db.execute(text(f"DELETE FROM {table} WHERE {parent_col}=:p AND variable_id=:v"), deletes)
+    if updates:
+        assignments = ", ".join(f"{col}=:{col}" for col in value_cols)
+        db.execute(text(f"UPDATE {table} SET {assignments} WHERE {parent_col}=:p AND variable_id=:v"), updates)
+    if inserts:
+        values = "".join(f", :{col}" for col in value_cols)
+        db.execute(text(f"INSERT INTO {table}({columns}) VALUES(:p, :v{values})"), inserts)
+
+
+# This function updates the detail of specification in dspec table based on
+# the intervals saved in spec for the given (id, row) records
+def updatedSpec(db, rows, cols):
+    detail = {}
+    for id, row in rows:
+        for col in cols:
+            min_val = row.get('min_'+col[0].strip().lower())
+            if col[1]['typevar'] == 'I':
+                max_val = row.get('max_'+col[0].strip().lower())
+            else:
+                max_val = None
+            idvariable = col[1]['id']
+            if not min_val is None or not max_val is None:
+                detail[(id, idvariable)] = (min_val, max_val)
+    syncDetail(db, 'dspec', 'spec_id', [id for id, _ in rows], detail, ('min_value', 'max_value'))
 
 
 
 # This function updates the detail of specification in dsamplematrix table based on
-# the boolean selections saved in spec for a given id (idspec)
-def updatedSampleMatrix(db, id, row, cols):
-    sql = "DELETE FROM dsamplematrix WHERE sample_matrix_id=:id"
-    db.execute(text(sql), {'id':id} )
-    db.commit()
-    for col in cols:
-        min_val = row[col[0].strip().lower()]
-        idvariable = col[1]['id']  
-        if not min_val is None:                            
-           sql = "INSERT INTO dsamplematrix(sample_matrix_id, variable_id) VALUES( :p1, :p2) ; "
-           db.execute(text(sql), {'p1':id, 'p2':idvariable}    )
-    db.commit()
+# the boolean selections saved in samplematrix for the given (id, row) records
+def updatedSampleMatrix(db, rows, cols):
+    detail = {}
+    for id, row in rows:
+        for col in cols:
+            min_val = row[col[0].strip().lower()]
+            idvariable = col[1]['id']
+            if not min_val is None:
+                detail[(id, idvariable)] = ()
+    syncDetail(db, 'dsamplematrix', 'sample_matrix_id', [id for id, _ in rows], detail)
+
 
 
+# Pattern of the intervals accepted by check_interval
+interval_pattern = r'^(\d*\.?\d*-\d*\.?\d*|-\d*\.\d*|\d*\.\d*-)$'
 
 #\d*-\d*|
 # Validates the format of the interval for variables in CustomerList and GenSpec
@@ -174,7 +311,7 @@ def check_interval(label, ss):
     
     #print('label ', label, 'ss ', ss, 'type(ss) ', type(ss) )
     # Pattern to match the specified formats
-    pattern = r'^(\d*\.?\d*-\d*\.?\d*|-\d*\.\d*|\d*\.\d*-)$' 
+    pattern = interval_pattern
     global msg
     ss = ss.strip()
     msg = ""
@@ -224,6 +361,10 @@ def check_samplematrixparam( db, i, id, row, cols ):
     return msg
 
 
+# Validators that can be referenced by name in the dnorm queries
+validators = {'check_interval': check_interval}
+
+
 view = {}
 view['products'] = {'table':'product', 'order': 'id'}
 view['products']['cols'] = {}
@@ -368,23 +509,18 @@ def preProcData( db, data, view_name ):
     idx = data.action.isin(["I", "D", "U"])
     data = data[idx].copy()
     
-    # Set nan values to zero for all columns
+    # Set nan values to None (str and float columns) and to zero for the id column,
+    # column by column instead of cell by cell
     for col in data.columns:
-        df = data[ data[col].isna() ]
+        missing = data[col].isna()
         if col in view[view_name]['cols']:
             if view[view_name]['cols'][col]['p'][0] == str:
-              data[col] = data[col].astype(str)        
-              for index, row in df.iterrows():
-                 data.loc[index, col] = None
-    
-            if type(data[col].values[0]) is float:
-              for index, row in df.iterrows():
-                 data.loc[index, col] = None
-    
-    df = data[ data['id'].isna() ]
-    for index, row in df.iterrows():
-        data.loc[index, col] = 0
-    data.id = data.id.astype(int)
+              data[col] = data[col].astype(str).astype(object).mask(missing, None)
+
+            if len(data) > 0 and type(data[col].values[0]) is float:
+              data[col] = data[col].astype(object).mask(missing, None)
+
+    data['id'] = data['id'].fillna(0).astype(int)
     
     return msgerror, data
 
@@ -407,8 +543,30 @@ def checkDataCols(data, colNames, additional_cols):
     return ok, msg
 
 
-# Addition of the denormalized columns to view
+# Python types allowed in the datatype column of the dnorm queries
+datatypes = {'str': str, 'int': int, 'float': float, 'bool': bool}
+
+# Denormalized columns by (view_name, typesql). They only depend on the variable table,
+# so the cache is invalidated by saveView when that table is modified. That only clears
+# the cache of the process running the import; the other gunicorn and Celery workers
+# reload their copy after MASTER_DATA_CACHE_TTL, like the lookup lists
+dnorm_cache = ReferenceCache("dnorm", ttl=settings.MASTER_DATA_CACHE_TTL)
+
+
+# Addition of the denormalized columns to view (cached, see loadDnormColumns)
 def getDnormColumns(db, view_name, typesql='query'):
+    if 'dnorm' not in view[view_name]:
+        return []
+    return list(dnorm_cache.get((view_name, typesql), lambda: loadDnormColumns(db, view_name, typesql)))
+
+
+# This function invalidates the cached denormalized columns of every view
+def invalidateDnormColumns():
+    dnorm_cache.invalidate()
+
+
+# This function runs the dnorm queries of view_name and builds the denormalized columns
+def loadDnormColumns(db, view_name, typesql='query'):
     additional_cols = []
     if 'dnorm' in view[view_name]:
         for _, value in view[view_name]['dnorm'].items():
@@ -417,20 +575,15 @@ def getDnormColumns(db, view_name, typesql='query'):
             for tt in vars:
                 id, datatype, not_null, label, column, lv, validator, typevar, ord = tt 
                 label = label.strip().lower()
-                validator_name = validator.strip()
-                exec( "p=" + datatype, None, locals() ) 
-                datatype = locals()['p']
-                exec( "p=" + not_null , None, locals() )
-                null = locals()['p']
+                datatype = datatypes[datatype.strip()]
+                null = bool(ast.literal_eval(not_null.strip()))
                 lv_description = lv.strip()
                 validator_name = validator.strip()
                 col_info = {'id':id, 'p':(datatype, null), 'column': column, 'typevar':typevar }
                 if validator_name:
                     col_info['validator'] = validator_name
                 if  lv_description:
-                    exec( "p ="+ lv , None, locals()  )
-                    lv = locals()['p'] # Extraction of the validator function
-                    col_info['lv'] = lv # List of values 
+                    col_info['lv'] = ast.literal_eval(lv_description) # List of values 
                 
                 # Handle reserved keywords for all cases
                 #if label.lower() in ['as', 'in'] and typesql=='*':
@@ -452,7 +605,10 @@ def getDnormColumns(db, view_name, typesql='query'):
     return additional_cols
 
 
-def saveView(view_name, db, data):
+# This function saves the rows of data (an uploaded sheet) in view_name. progress, if given,
+# is called as progress(step, done, total) while the rows are validated and saved
+def saveView(view_name, db, data, progress=None):
+    start = time.perf_counter()
     pendingdata = pd.DataFrame()
     ndeleted = 0
     nupdated = 0
@@ -464,84 +620,102 @@ def saveView(view_name, db, data):
     if msgerror:
         # Convert stat DataFrame to dict with native Python types
         stat_dict = convert_numpy_types(stat.to_dict('records')[0])
+        observeSave(view_name, start, 'errors')
         return msgerror, stat_dict, pendingdata
     
     data.columns = [col.strip() for col in data.columns] # Elimination of blanks in column names
     additional_cols_dml = getDnormColumns(db, view_name, '*') # additional columns for DML 
     additional_cols_query = getDnormColumns(db, view_name) # additional columns for query 
-    for i, row in data.iterrows():        
+    lookups = loadLookups(db, view_name) # FK maps and unique keys, loaded once per upload
+    ids = loadIds(db, view_name) # ids of the existing records, to check the U rows
+
+    # First step: every row is validated, nothing is written to the database
+    deletes = []  # ids to delete
+    updates = []  # (row index, id, parameters)
+    inserts = []  # (row index, parameters)
+    # The columns of the I and U rows are validated at once, dcols and keys row by row
+    active = data[data['action'].isin(["I", "U"])]
+    rows2, colerrors = validateFrame(view_name, active, additional_cols_query, lookups)
+    for n, (i, row) in enumerate(records(data).items()):
+        if progress:
+            progress('validating', n, len(data))
         Action = row['action']
-        id = int( row['id'] )        
+        id = int( row['id'] )
         if Action == "D":
-            if not pd.isna(row['id']):
-                sql = text("DELETE FROM " + view[view_name]['table'] +"  WHERE id = :id")
-                db.execute(sql, {'id': int(row['id']) })
-                db.commit()
-                ndeleted += 1
-            else:
-                msgerror.append(f"Action={Action}, row {i}, id:{id}.  The row can not be deleted.")
-                data.loc[i,'action'] =  "*" + Action
-    
-        elif Action == "U": 
-            row2, msg = validateView(view_name, i, db, row, additional_cols_query)            
+            deletes.append(id)
+            unregisterKeys(lookups, id)
+
+        elif Action == "U":
+            row2, msg = validateRow(view_name, i, db, row, rows2, colerrors, lookups)
+            if not msg and 'global_check' in view[view_name]:
+                msg = view[view_name]['global_check'](row2)
+            if not msg and id not in ids:
+                msg = f"Action {Action}, row {i}, Invalid id. Upload this file with the latest version. The row is not updated."
+            if not msg:
+                row3 = setAdditionalParameters(view_name, row2, action='update')
+                if 'before' in view[view_name]:
+                    msg = view[view_name]['before'](db, i, id, row3, additional_cols_query)
             if msg:
-                msgerror.extend(msg)
+                msgerror.extend(msg if isinstance(msg, list) else [msg])
                 data.loc[i,'action'] =  "*" + Action
             else:
-                if 'global_check' in view[view_name]:
-                    msg = view[view_name]['global_check'](row2)
-                if msg:
-                    msgerror.extend(msg)
-                    data.loc[i,'action'] =  "*" + Action
-                else:
-                    id = checkFK(db, f"SELECT id FROM " + view[view_name]['table'] +" WHERE id=:id", id=id)
-                    if id > 0:
-                        update = buildUpdateSimple( view_name, additional_cols_dml )
-                        row3 = setAdditionalParameters(view_name, row2, action='update')
-                        if 'before' in view[view_name]:
-                            # For UPDATE, use the existing id instead of trying to get from result
-                            msg = view[view_name]['before'](db, i, id, row3, additional_cols_query)
-                            if msg:
-                                msgerror.append(msg)
-                                data.loc[i,'action'] =  "*" + Action
-                                continue                                
-                        result = db.execute(text(update), row3 )
-                        if 'after' in view[view_name]:
-                            # For UPDATE, use the existing id instead of trying to get from result
-                            view[view_name]['after'](db, id, row3, additional_cols_query)
-                        db.commit()
-                        nupdated += 1
-                    else:
-                        msgerror.append(f"Action {Action}, row {i}, Invalid id. Upload this file with the latest version. The row is not updated.")
-                        data.loc[i,'action'] =  "*" + Action
-        elif Action == "I":  
-            row2, msg = validateView(view_name, i, db, row, additional_cols_query)
+                updates.append((i, id, row3))
+                unregisterKeys(lookups, id)
+                registerKeys(view_name, lookups, row3, id)
+
+        elif Action == "I":
+            row2, msg = validateRow(view_name, i, db, row, rows2, colerrors, lookups)
+            if not msg and 'global_check' in view[view_name]:
+                msg = view[view_name]['global_check'](row2)
+            if not msg:
+                row3 = setAdditionalParameters(view_name, row2, action='insert')
+                if 'before' in view[view_name]:
+                    msg = view[view_name]['before'](db, i, id, row3, additional_cols_query)
             if msg:
-                msgerror.extend(msg)
+                msgerror.extend(msg if isinstance(msg, list) else [msg])
                 data.loc[i,'action'] =  "*" + Action
             else:
-                if 'global_check' in view[view_name]:
-                    msg = view[view_name]['global_check'](row2)
-                if msg:
-                    msgerror.append(msg)
-                    data.loc[i,'action'] =  "*" + Action
-                else:    
-                    insert = buildInsertSimple(view_name, additional_cols_dml)
-                    row3 = setAdditionalParameters(view_name, row2, action='insert')
-                    if 'before' in view[view_name]:
-                        # For UPDATE, use the existing id instead of trying to get from result
-                        msg = view[view_name]['before'](db, i, id, row3, additional_cols_query)
-                        if msg:
-                            msgerror.extend(msg)
-                            data.loc[i,'action'] =  "*" + Action
-                            continue                                
-                    result = db.execute(text(insert), row3)
-                    if 'after' in view[view_name]:
-                        new_id = result.scalar()
-                        view[view_name]['after'](db, new_id, row3, additional_cols_query)
-                    ninserted += 1
-                    db.commit()
-    
+                inserts.append((i, row3))
+                # Pending inserts get a negative placeholder id until they are written
+                registerKeys(view_name, lookups, row3, -len(inserts))
+
+    # Second step: the valid rows are applied in a single transaction
+    if progress:
+        progress('saving', len(data), len(data))
+    try:
+        if deletes:
+            sql = text("DELETE FROM " + view[view_name]['table'] +"  WHERE id = :id")
+            db.execute(sql, [{'id': id} for id in deletes])
+            ndeleted = len(deletes)
+
+        after = [] # (id, row) of the updated and inserted records, for the 'after' hook
+        if updates:
+            update = text(buildUpdateSimple(view_name, additional_cols_dml))
+            db.execute(update, [row3 for _, _, row3 in updates])
+            after.extend((id, row3) for _, id, row3 in updates)
+            nupdated = len(updates)
+
+        if inserts:
+            if 'after' in view[view_name]:
+                after.extend(insertReturningIds(view_name, db, [row3 for _, row3 in inserts], additional_cols_dml))
+            else:
+                insert = text(buildInsertSimple(view_name, additional_cols_dml))
+                db.execute(insert, [row3 for _, row3 in inserts])
+            ninserted = len(inserts)
+
+        if after and 'after' in view[view_name]:
+            # The detail tables of all the records are reconciled at once
+            view[view_name]['after'](db, after, additional_cols_query)
+
+        db.commit()
+    except Exception:
+        db.rollback()
+        observeSave(view_name, start, 'failed')
+        raise
+    finally:
+        if view[view_name]['table'] == 'variable':
+            invalidateDnormColumns()
+
     for i in range(len(msgerror)):
         msgerror[i] = str(i + 1) + ")" + msgerror[i]
 
@@ -552,9 +726,57 @@ def saveView(view_name, db, data):
     idx = (data['action'] == "*I") | (data['action'] == "*D") | (data['action'] == "*U")
     pendingdata = data[idx]
 
+    observeSave(view_name, start, 'errors' if msgerror else 'ok')
     return msgerror, stat_dict, pendingdata
 
 
+# This function records the duration of a saveView call in the import metrics
+def observeSave(view_name, start, outcome):
+    MASTER_DATA_IMPORT_DURATION.labels(view=view_name, outcome=outcome).observe(time.perf_counter() - start)
+
+
+# This function inserts rows and returns their (new id, row). The rows are inserted with
+# executemany and their ids read back by the first unique key of the view, looking only
+# at the records above the highest id before the insert (so a record that already had
+# the key is never taken for the new one), in chunks of the first key column values.
+# The read-back must find exactly one record per inserted row: a record inserted by
+# another session in the meantime, or ids that did not increase, fail the whole upload
+# instead of linking a row to the wrong id. When a row has a null key value it is
+# inserted alone with OUTPUT inserted.id
+def insertReturningIds(view_name, db, rows, additional_cols):
+    key = view[view_name].get('keys', [None])[0]
+    keyed = [row for row in rows if key is not None and keyValues(view_name, key, row) is not None]
+    others = [row for row in rows if key is None or keyValues(view_name, key, row) is None]
+
+    inserted = []
+    if keyed:
+        table = view[view_name]['table']
+        columns = keyColumns(view_name, key)
+        last_id = db.execute(text("SELECT MAX(id) FROM " + table)).scalar() or 0
+        db.execute(text(buildInsertSimple(view_name, additional_cols, output=False)), keyed)
+
+        select = text("SELECT id, " + ", ".join(columns) + " FROM " + table +
+                      " WHERE id > :last_id AND " + columns[0] + " IN :values").bindparams(
+            bindparam('values', expanding=True))
+        first_values = list({row[columns[0]] for row in keyed})
+        keyset = {}
+        found = 0
+        for k in range(0, len(first_values), chunk_size):
+            for t in db.execute(select, {'last_id': last_id, 'values': first_values[k:k + chunk_size]}):
+                keyset[tuple(refKey(v) for v in t[1:])] = int(t[0])
+                found += 1
+        keys = [keyValues(view_name, key, row) for row in keyed]
+        if found != len(keyed) or any(values not in keyset for values in keys):
+            raise RuntimeError(
+                f"The ids of the {len(keyed)} records inserted in {table} could not be read back "
+                f"({found} records found). Nothing was saved, upload the file again."
+            )
+        inserted.extend((keyset[values], row) for values, row in zip(keys, keyed))
+
+    insert = text(buildInsertSimple(view_name, additional_cols, output=True))
+    for row in others:
+        inserted.append((db.execute(insert, row).scalar(), row))
+    return inserted
 
 # This function sets parameters of derivated columns and filters of the view_name
 def setAdditionalParameters( view_name, row2, action='insert'):
@@ -608,8 +830,11 @@ def buildUpdateSimple( view_name, additional_cols ):
     update = update[0:-1] + " WHERE id=:id"
     return update
 
-# This function computes the sql insert for a simple view
-def buildInsertSimple( view_name, additional_cols ):
+# This function computes the sql insert for a simple view. By default the inserted id is
+# returned (OUTPUT inserted.id) when the view has an 'after' hook
+def buildInsertSimple( view_name, additional_cols, output=None ):
+    if output is None:
+        output = 'after' in view[view_name]
     insert = "INSERT into " + view[view_name]['table'] + "("
     for label, value in view[view_name]['cols'].items():
         label = label.strip()
@@ -642,8 +867,8 @@ def buildInsertSimple( view_name, additional_cols ):
     
     insert = insert[0:-1] + ") "
     
-    # Add OUTPUT clause for SQL Server to return the inserted ID when 'after' callback is present
-    if 'after' in view[view_name]:
+    # Add OUTPUT clause for SQL Server to return the inserted ID
+    if output:
         insert = insert + "OUTPUT inserted.id "
     
     insert = insert + "VALUES( "
@@ -676,100 +901,13 @@ def buildInsertSimple( view_name, additional_cols ):
     return insert
 
 
-def validateView(view_name, i, db, row, additional_cols):
+# This function completes the validation of a row whose columns are valid: it resolves
+# the denormalized columns (dcols) and checks the uniqueness of the keys
+def validateKeys(view_name, i, db, row, row2, lookups):
     msgerror = []
     id = int(row['id'] )
-    Action = row['action'].strip()
-    id2 = 0
-    row2={'action':Action}
-    if Action == "U" and id ==0:
-       msgerror.append(f"Action={Action}, id {id} row {i}. id must be not null")
-       return row2, id2, msgerror
-    
-    if Action == "U" and not type(id) is int:
-        msgerror.append(f"Action={Action}, id {id} row {i}. id must be Integer.")
-        return row2, id2, msgerror
-    
-    cols = list(view[view_name]['cols'].items()).copy()
-    cols.extend(additional_cols)
-    
-    # Pre-initialize all expected keys with None for interval validators
-    # This ensures that even if a column is empty, the key exists in row2
-    for col, value in additional_cols:
-        if 'validator' in value and value['validator'] == 'check_interval':
-            # For interval validators, we need both min and max keys
-            label = col
-            row2['min_'+label.lower()] = None
-            row2['max_'+label.lower()] = None
-    
-    # First we validate for not null column, FK and Enum
-    for col, value in cols:
-        colinfo = value['p']
-        label = col 
-        key = label.lower()        
-        if  colinfo[1]: # if the column is not null
-            if isNull(row[key]): 
-              msgerror.append(f"Action={Action}, row {i}. {label} must not be null.")
-              return row2, msgerror
-    
-        if 'validator' in value:
-            validator = value['validator']
-            # Get the actual database column name from col_info (already has min_/max_ prefix)
-            if isinstance(row[key], str):
-                ss = row[key].replace(' ','')
-                exec( "msg = " + validator + "(label, ss)" ,  globals(), locals() )
-                msg = globals()['msg']
-                if msg:
-                    msgerror.append(msg)
-                    return row2, msgerror
-                ll = ss.split('-')
-                # db_column already has min_ prefix from getDnormColumns, use it directly
-                # But we need both min and max, so construct them based on label
-                row2['min_'+label.lower()] = None
-                row2['max_'+label.lower()] = None
-                if len(ll)>0 and ll[0] != '':
-                  row2['min_'+label.lower()] = float(ll[0])
-                if len(ll)>1 and ll[1] != '':
-                   row2['max_'+label.lower()] = float(ll[1])
-        
-            if isinstance(row[key], float) and math.isnan(row[key]):
-               row2['min_'+label.lower()] = None
-               row2['max_'+label.lower()] = None
-                         
-        else:
-            # Convert nan to None to avoid SQL Server ODBC errors
-            row2[key] = None if (isinstance(row[key], float) and math.isnan(row[key])) else row[key]
-            if isinstance(row[key], str) and row[key] is not None:
-                row2[key] = row[key].strip()
-        
-        if 'lv' in value:
-            lv = value['lv']
-            if not isNull(row2[key]) and  not row2[key].strip() in lv:
-                msgerror.append(f"Action={Action}. Value {row[key]}  and {key} must be {lv}.")
-                return row2, msgerror
-        
-            # Convert nan to None to avoid SQL Server ODBC errors
-            row2[key] = None if (isinstance(row[key], float) and math.isnan(row[key])) else row[key]
-            if type(row[key]) is str:
-               row2[key] = row[key].strip()
-         
-        elif 'fk' in value:
-            table =  value['fk']
-            colFk = value['column']
-            # Check if the value is null/empty
-            if isNull(row[key]):
-                # For nullable FK columns, set to None
-                if not colinfo[1]:  # if column is nullable
-                    row2[colFk] = None
-                else:  # if column is not null but value is null, it's an error
-                    msgerror.append(f"Action={Action}, row {i}. {label} must not be null.")
-                    return row2, msgerror
-            else:
-                row2[colFk] = checkFK(db, "Select id From "+ table +" Where name=:p1", p1=row[key])
-                if row2[colFk] == 0: # If the FK value does not exist
-                    msgerror.append(f"Action={Action}, row {i}, id:{id}. {col}:{row[key]} does not exist.")
-                    return row2, msgerror
-    
+    Action = row2['action']
+
     # Process denormalized columns (dcols) - computed columns based on queries
     if 'dcols' in view[view_name]:
         for dcol_name, dcol_def in view[view_name]['dcols'].items():
@@ -792,8 +930,11 @@ def validateView(view_name, i, db, row, additional_cols):
                             # Store the display value (original input) for error message
                             param_values_display.append(f"{param_name}='{row[param_name.lower()]}'")
 
-            # Execute the query to get the denormalized column value
-            dcol_value = checkFK(db, query, **query_params)
+            # Execute the query to get the denormalized column value (once per parameter values)
+            memo_key = (dcol_name, tuple(sorted(query_params.items())))
+            if memo_key not in lookups['dcols']:
+                lookups['dcols'][memo_key] = checkFK(db, query, **query_params)
+            dcol_value = lookups['dcols'][memo_key]
 
             # Validate: check if the denormalized column value is NULL/None
             if dcol_value == 0 or dcol_value is None:
@@ -808,46 +949,121 @@ def validateView(view_name, i, db, row, additional_cols):
                 # Store the valid value in row2
                 row2[dcol_name] = dcol_value
 
-    # Checking uniqueness of keys   
+    # Checking uniqueness of keys against the keys preloaded by loadLookups
     if 'keys' in view[view_name] and Action =='I':
-        for key in view[view_name]['keys']:
-            sql = "SELECT id FROM "+ view[view_name]['table'] +" WHERE "
-            if 'filter' in view[view_name]:
-                for col, value in view[view_name]['filter'].items():            
-                    if type(value) is str:
-                        value = "'" + value + "'"
-                    sql = sql + col + "=" + value + " AND "
-    
-            parameters = {}
-            for col in key:                
-                colinfo = view[view_name]['cols'][col]['p']
-                if 'fk' in view[view_name]['cols'][col]:
-                    column = view[view_name]['cols'][col]['column']
-                else:
-                    column = col
-    
-                sql = sql + column + f"=:{column} AND " 
-                parameters[column] = row2[column] 
-        sql = sql[0:-4]
-        id2 = checkFK0(db, sql, parameters )
-        if  id2 > 0:
-            msg =f"Action {Action}, row {i}, The combination " 
-            for col in key:
-                msg = msg + col  + ","
-            msg = msg[0:-1] + ":("
-            for col in key:
-                msg = msg + row[col] + ","
-    
-            msg = msg[0:-1] + ")  already exists."
-            msgerror.append(msg)
-            return row2, msgerror 
-    
+        for key, keyset in zip(view[view_name]['keys'], lookups['keys']):
+            values = keyValues(view_name, key, row2)
+            if values is not None and values in keyset:
+                msg =f"Action {Action}, row {i}, The combination "
+                for col in key:
+                    msg = msg + col  + ","
+                msg = msg[0:-1] + ":("
+                for col in key:
+                    msg = msg + str(row[col]) + ","
+
+                msg = msg[0:-1] + ")  already exists."
+                msgerror.append(msg)
+                return row2, msgerror
+
     if Action == "U":
        row2['id']=id
           
     return row2, msgerror 
 
 
+# This function validates the columns of all the rows of data at once (not null, list of
+# values, intervals and FK) with pandas operations over the whole sheet. For every row it
+# gives either its parameters (row2) or its first error, in the order of the columns, like
+# the former row-by-row validation (see benchmarks/bench_view_validation.py). dcols and keys
+# are checked afterwards with validateKeys.
+def validateFrame(view_name, data, additional_cols, lookups):
+    action = data['action'].astype(str).str.strip()
+    ids = data['id'].astype(int)
+    rows = pd.Series(data.index, index=data.index).astype(str)
+    errors = pd.Series(None, index=data.index, dtype=object)
+    params = {'action': action}
+
+    # Keeps the message of the rows in mask which have no error yet
+    def report(mask, msgs):
+        mask = mask.reindex(data.index, fill_value=False) & errors.isna()
+        if mask.any():
+            errors[mask] = msgs.reindex(data.index)[mask]
+
+    # Returns an object column with None instead of nan
+    def nullable(values):
+        values = values.reindex(data.index).astype(object)
+        return values.where(values.notna(), None)
+
+    report((action == "U") & (ids == 0),
+           "Action=" + action + ", id " + ids.astype(str) + " row " + rows + ". id must be not null")
+
+    cols = list(view[view_name]['cols'].items()) + list(additional_cols)
+    for col, value in cols:
+        if value.get('validator') == 'check_interval':
+            params['min_'+col.lower()] = nullable(pd.Series(np.nan, index=data.index))
+            params['max_'+col.lower()] = nullable(pd.Series(np.nan, index=data.index))
+
+    for col, value in cols:
+        colinfo = value['p']
+        label = col
+        key = label.lower()
+        cells = data[key]
+        raw = cells.astype(str)
+        is_str = cells.map(type) == str
+        strings = cells[is_str].astype(str)
+        null = cells.isna() | (strings.str.strip() == '').reindex(data.index, fill_value=False)
+
+        if colinfo[1]: # if the column is not null
+            report(null, "Action=" + action + ", row " + rows + ". " + label + " must not be null.")
+
+        if 'validator' in value:
+            ss = strings.str.replace(' ', '').str.strip()
+            parts = ss.str.split('-', n=1, expand=True).reindex(columns=[0, 1])
+            low = pd.to_numeric(parts[0].replace('', np.nan), errors='coerce')
+            high = pd.to_numeric(parts[1].replace('', np.nan), errors='coerce')
+            wrong = (ss != '') & ~ss.str.match(interval_pattern)
+            report(wrong, "Column " + label + ". Interval " + ss + " of has no correct format")
+            report(~wrong & (low > high), "Column " + label + ". The lower limit " + parts[0].astype(str) +
+                   " is higher than the upper one " + parts[1].astype(str))
+            params['min_'+key] = nullable(low.where(~wrong))
+            params['max_'+key] = nullable(high.where(~wrong))
+        else:
+            # nan is converted to None to avoid SQL Server ODBC errors, strings are trimmed
+            params[key] = nullable(cells)
+            params[key][is_str] = strings.str.strip()
+
+        if 'lv' in value:
+            report(~null & ~params[key].isin(value['lv']),
+                   "Action=" + action + ". Value " + raw + "  and " + key + " must be " + str(value['lv']) + ".")
+
+        elif 'fk' in value:
+            fk_ids = cells.where(~null).map(refKey).map(lookups['fk'][value['fk']])
+            report(~null & fk_ids.isna(),
+                   "Action=" + action + ", row " + rows + ", id:" + ids.astype(str) + ". " + col + ":" + raw + " does not exist.")
+            # Python ints, so a null cell in the column does not turn the ids into floats
+            params[value['column']] = nullable(fk_ids.dropna().map(int).astype(object))
+
+    valid = errors.isna()
+    rows2 = records(pd.DataFrame(params)[valid])
+    for i, row2 in rows2.items():
+        if row2['action'] == "U":
+            row2['id'] = int(ids[i])
+    return rows2, errors[~valid].to_dict()
+
+
+# This function returns the rows of data as {index: {column: value}} (like to_dict('index'),
+# without boxing every cell again)
+def records(data):
+    columns = list(data.columns)
+    return {i: dict(zip(columns, values)) for i, values in zip(data.index, data.itertuples(index=False, name=None))}
+
+
+# This function returns the row2 and errors of the row i of an upload validated by validateFrame
+def validateRow(view_name, i, db, row, rows2, colerrors, lookups):
+    if i in colerrors:
+        return {'action': row['action'].strip()}, [colerrors[i]]
+    return validateKeys(view_name, i, db, row, rows2[i], lookups)
+
 def getView(db, view_name):
     query, label_names = buildQuery(db, view_name)
     tts = db.execute(text(query)) # List of tuples
@@ -855,3 +1071,40 @@ def getView(db, view_name):
     if len(dict_list) == 0:
         dict_list.append( dict.fromkeys(label_names) )
     return dict_list    
+
+
+# This function returns the column labels of view_name and an iterator over its rows, which
+# are fetched from the cursor in batches of batch_size instead of being loaded at once
+def streamView(db, view_name, batch_size=1000):
+    query, label_names = buildQuery(db, view_name)
+    result = db.execute(text(query), execution_options={'stream_results': True})
+
+    def rows():
+        try:
+            for batch in result.partitions(batch_size):
+                yield from batch
+        finally:
+            result.close()
+
+    return label_names, rows()
+
+
+# This function returns the tables read by the query of view_name
+def viewTables(view_name):
+    tables = [view[view_name]['table']]
+    for _, value in view[view_name]['cols'].items():
+        if 'fk' in value and value['fk'] not in tables:
+            tables.append(value['fk'])
+    if 'dnorm' in view[view_name] and 'variable' not in tables:
+        tables.append('variable')
+    return tables
+
+
+# This function returns the data version of view_name: for every table it reads, the
+# number of rows, the highest id and the last updated_at. Any insert, delete or update
+# made through the application changes it
+def viewVersion(db, view_name):
+    sql = " UNION ALL ".join(
+        f"SELECT '{table}' tbl, COUNT(*) cnt, MAX(id) maxid, MAX(updated_at) updated FROM {table}"
+        for table in viewTables(view_name))
+    return [tuple(t) for t in db.execute(text(sql))]
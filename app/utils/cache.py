@@ -0,0 +1,91 @@
+"""
+In-process cache utilities module.
+
+This module provides a small thread-safe read-through cache for reference data
+that changes rarely (menu options, master data lookup lists, view metadata).
+Entries are loaded on first use, optionally expire after a time-to-live, and
+can be invalidated explicitly whenever the underlying table is modified.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class ReferenceCache:
+    """
+    Thread-safe read-through cache with optional TTL and version counter.
+
+    Each call to invalidate() bumps the cache version, so callers can use
+    the version to build validators (e.g. HTTP ETags) for cached content.
+
+    Attributes:
+        name (str): Descriptive cache name used in logs.
+        ttl (Optional[float]): Entry lifetime in seconds. None means entries
+            only expire on explicit invalidation.
+        version (int): Counter incremented on every invalidation.
+    """
+
+    def __init__(self, name: str, ttl: Optional[float] = None):
+        self.name = name
+        self.ttl = ttl
+        self.version = 0
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.RLock()
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, calling loader on a miss.
+
+        The loader runs outside the lock. Its value is only stored if the
+        cache was not invalidated meanwhile, so an invalidation during the
+        load is not overwritten with data read before it.
+
+        Args:
+            key (Hashable): Cache key.
+            loader (Callable[[], Any]): Function that loads the value.
+
+        Returns:
+            Any: Cached or freshly loaded value.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._expired(entry[0]):
+                return entry[1]
+            version = self.version
+
+        value = loader()
+        with self._lock:
+            if self.version == version:
+                self._entries[key] = (time.monotonic(), value)
+        return value
+
+    def peek(self, key: Hashable) -> Any:
+        """Return the cached value for key without loading it (None on a miss)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry[0]):
+                return None
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any):
+        """Store a value for key"""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """
+        Drop one entry, or every entry when key is None, and bump the version.
+
+        Args:
+            key (Optional[Hashable]): Key to drop. Drops all entries if None.
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+            self.version += 1
+
+    def _expired(self, loaded_at: float) -> bool:
+        return self.ttl is not None and time.monotonic() - loaded_at > self.ttl
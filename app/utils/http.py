@@ -0,0 +1,101 @@
+"""
+HTTP caching utilities module.
+
+This module provides helpers for conditional GET requests: building ETag and
+Last-Modified validators and deciding whether a request can be answered with
+304 Not Modified instead of the full response.
+"""
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request
+
+
+def http_date(value: datetime) -> str:
+    """
+    Format a datetime as an HTTP date (RFC 7231).
+
+    Naive datetimes are taken as server local time, like the timestamps
+    stored by the application.
+
+    Args:
+        value (datetime): Datetime to format.
+
+    Returns:
+        str: Date such as 'Mon, 19 Oct 2026 10:00:00 GMT'.
+    """
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def content_etag(data: Any) -> str:
+    """
+    Compute an entity tag from JSON-serializable content.
+
+    The tag only depends on the content, so every worker process computes
+    the same tag for the same data.
+
+    Args:
+        data (Any): Response content.
+
+    Returns:
+        str: Entity tag without quotes.
+    """
+    payload = json.dumps(data, sort_keys=True, default=str).encode()
+    return hashlib.sha1(payload).hexdigest()[:20]
+
+
+def cache_headers(etag: str, last_modified: Optional[datetime] = None,
+                  cache_control: str = "private, no-cache") -> Dict[str, str]:
+    """
+    Build the validator headers of a cacheable response.
+
+    Args:
+        etag (str): Entity tag without quotes.
+        last_modified (Optional[datetime]): Last modification of the content.
+        cache_control (str): Cache-Control header value.
+
+    Returns:
+        Dict[str, str]: ETag, Cache-Control and optionally Last-Modified headers.
+    """
+    headers = {"ETag": f'"{etag}"', "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def is_not_modified(request: Request, etag: str,
+                    last_modified: Optional[datetime] = None) -> bool:
+    """
+    Check the conditional headers of a request against the current validators.
+
+    If-None-Match takes precedence over If-Modified-Since, as required by
+    RFC 7232.
+
+    Args:
+        request (Request): Incoming request.
+        etag (str): Current entity tag without quotes.
+        last_modified (Optional[datetime]): Current last modification time.
+
+    Returns:
+        bool: True if the client copy is still valid (respond with 304).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or any(
+            tag.removeprefix("W/").strip('"') == etag for tag in tags
+        )
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        modified = last_modified.astimezone(timezone.utc).replace(microsecond=0)
+        return modified <= since
+    return False
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the logistic data ingestion.
+
+Generates DAYS days of logistic data with ORDERS orders per day on an in-memory
+SQLite database (see benchmarks/sqlite_db.py) and times:
+
+    full reload     the former load_logisticdata.py: delete everything, insert row by row, commit per row
+    first batch     LogisticIngestionService.ingest of the same rows into an empty table
+    same batch      the same rows again (nothing changes)
+    next batch      1% of the orders changed plus one new day
+
+reporting throughput, SQL statements and the dates to reload per step.
+
+Usage:
+    python -m benchmarks.bench_logistic_ingestion [--days 30] [--orders 50 500]
+"""
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.services.logistic_ingestion_service import LogisticIngestionService
+from benchmarks.sqlite_db import QueryCounter, create_database
+
+FIRST_DATE = date(2026, 6, 1)
+LOADING_TIMES = ['06:00', '07:10', '08:12', '09:14', '12:23', '14:50', '16:15', '17:00']
+
+
+def generate(days, orders, first_day=0):
+    rows = []
+    for day in range(first_day, first_day + days):
+        loading_date = (FIRST_DATE + timedelta(days=day)).isoformat()
+        for k in range(orders):
+            rows.append({
+                "date": loading_date,
+                "time": random.choice(LOADING_TIMES),
+                "name_client": f"Customer {random.randint(0, 49)}",
+                "order_number_pvs": 100000 + day * orders + k,
+                "article_no": 1000 + random.randint(0, 199),
+                "order_number_client": str(random.randint(0, 50000)),
+                "description": "P1 Q1",
+                "loading_ton": random.randint(0, 10000) / 100
+            })
+    return rows
+
+
+def full_reload(db, rows):
+    db.execute(text("DELETE FROM logisticdata"))
+    db.commit()
+    for row in rows:
+        db.execute(text("""INSERT into logisticdata( date,time, name_client,  order_number_PVS,  article_no,
+                 order_number_client, Description, loading_ton) VALUES (:date, :time,
+                 :name_client, :order_number_pvs, :article_no, :order_number_client, :description, :loading_ton)"""),
+                   row)
+        db.commit()
+
+
+def run(days, orders):
+    random.seed(orders)
+    engine = create_database()
+    counter = QueryCounter(engine)
+    db = Session(engine)
+    service = LogisticIngestionService(db)
+    rows = generate(days, orders)
+
+    changed = random.sample(rows, max(1, len(rows) // 100))
+    next_batch = [dict(row, loading_ton=row['loading_ton'] + 1) for row in changed] + generate(1, orders, days)
+
+    results = []
+
+    def measure(step, batch, call):
+        counter.reset()
+        start = time.perf_counter()
+        result = call(batch)
+        elapsed = time.perf_counter() - start
+        dates = len(result['changed_dates']) if result else days
+        results.append((step, len(batch), elapsed, counter.reset(), dates))
+        return result
+
+    measure('full reload', rows, lambda batch: full_reload(db, batch))
+    db.execute(text("DELETE FROM logisticdata"))
+    db.commit()
+    measure('first batch', rows, service.ingest)
+    result = measure('same batch', rows, service.ingest)
+    assert result['unchanged'] == len(rows), result['message']
+    result = measure('next batch', next_batch, service.ingest)
+    assert result['updated'] == len(changed) and result['inserted'] == orders, result['message']
+
+    total = db.execute(text("SELECT COUNT(*) FROM logisticdata")).scalar()
+    assert total == len(rows) + orders, f"{total} rows in logisticdata"
+
+    db.close()
+    engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--orders', type=int, nargs='+', default=[50, 500])
+    args = parser.parse_args()
+
+    print(f"{'orders':>7} {'step':<12} {'rows':>7} {'seconds':>9} {'rows/s':>9} {'queries':>8} {'dates':>6}")
+    for orders in args.orders:
+        for step, items, elapsed, queries, dates in run(args.days, orders):
+            print(f"{orders:>7} {step:<12} {items:>7} {elapsed:>9.3f} {items / elapsed:>9.0f} "
+                  f"{queries:>8} {dates:>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the master data import and export.
+
+Generates 'products', 'spec-gen', 'spec-client', 'samplematrix' and 'maps'
+workbooks of the given number of rows, with the column layout of buildQuery
+(view columns, the denormalized columns of getDnormColumns and id), and runs
+them through an in-memory SQLite database (see benchmarks/sqlite_db.py):
+
+    insert  read_excel_stream + saveView of the generated sheet (I rows)
+    export  MasterDataQuery.export_to_excel of the view
+    update  read_excel_stream + saveView of the exported sheet (U rows), like
+            the monthly specification refresh
+
+reporting throughput, SQL statements and peak RSS of every step. With
+--trace-memory the peak of the Python allocations of every step is reported
+too; tracing slows the steps down, so compare timings only between runs with
+the same flags.
+
+Usage:
+    python -m benchmarks.bench_master_data [--rows 100 1000] [--trace-memory]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import resource
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import openpyxl  # noqa: F401 (imported lazily by read_excel_stream, kept out of its timing)
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.services import view as v
+from app.services.master_data_service import MasterDataQuery, MasterDataService
+from benchmarks.sqlite_db import QueryCounter, create_database
+
+VIEWS = ['products', 'spec-gen', 'spec-client', 'samplematrix', 'maps']
+# Interval variables with min_/max_ columns in spec and has_ columns in samplematrix
+VARIABLES = ['conc', 'free_so3', 'nh3', 'so3', 'cl', 'fe', 'cr', 'ni', 'cu', 'zn', 'pb', 'mg']
+N_QUALITIES = 5
+N_SAMPLE_POINTS = 10
+FREQUENCIES = ['Day', 'Week', 'Month', 'Quarter', 'Batch']
+
+
+def seed(db):
+    db.execute(text("INSERT INTO variable(name, test, unit, ord, typevar) VALUES (:name, :name, '%', :ord, 'I')"),
+               [{'name': name, 'ord': k} for k, name in enumerate(VARIABLES)])
+    db.execute(text("INSERT INTO quality(name) VALUES (:name)"),
+               [{'name': f"Q{k}"} for k in range(N_QUALITIES)])
+    db.execute(text("INSERT INTO samplepoint(name) VALUES (:name)"),
+               [{'name': f"T{k}"} for k in range(N_SAMPLE_POINTS)])
+    db.commit()
+
+
+def tested(k):
+    """Variables with limits in the general specification of product k"""
+    return random.Random(k).sample(VARIABLES, 6)
+
+
+def interval(name):
+    return random.choice([f"{random.randint(0, 4)}-{random.randint(5, 9)}", "2.5-", "-7.5"])
+
+
+def build_row(view_name, k):
+    """Values of the k-th generated row of view_name, by column label"""
+    product = {'product': f"P{k}", 'quality': f"Q{k % N_QUALITIES}"}
+    if view_name == 'products':
+        return {'name': f"P{k}", 'bruto': f"B{k % 50}", 'name_coa': f"Product {k}"}
+    if view_name == 'spec-gen':
+        # The export joins variable1..3, so rows without them would not be exported
+        row = dict(product, tds=f"TDS-{k}", visual='Clear',
+                   **dict(zip(['variable1', 'variable2', 'variable3'], random.sample(VARIABLES, 3))))
+        row.update((name, interval(name)) for name in tested(k))
+        return row
+    if view_name == 'spec-client':
+        row = dict(product, customer=f"Customer {k}", status='ACTIVE', certificate=random.choice(['Y', 'N', 'M']),
+                   coa=random.choice(['X', 'N']), day_coa=random.choice(['X', 'N']), coc='X', visual='Y',
+                   onedecimal=random.choice(['Y', None]))
+        row.update((name, interval(name)) for name in random.sample(VARIABLES, 6))
+        return row
+    if view_name == 'samplematrix':
+        # The tests of a sample matrix must be in the general specification
+        row = dict(product, samplepoint=f"T{k % N_SAMPLE_POINTS}", frequency=random.choice(FREQUENCIES), visual='X')
+        row.update((name, 'X') for name in tested(k)[:4])
+        return row
+    return dict(product, article_code=1000 + k, logistic_info=f"L{k}")
+
+
+def build_sheet(db, view_name, rows, path):
+    """Write a workbook of rows insert rows of view_name and return its path"""
+    _, label_names = v.buildQuery(db, view_name)
+    records = []
+    for k in range(rows):
+        record = dict.fromkeys(label_names)
+        record.update(build_row(view_name, k))
+        record['action'] = 'I'
+        records.append(record)
+    pd.DataFrame(records, columns=label_names).to_excel(path, index=False, engine='xlsxwriter')
+    return path
+
+
+def save_sheet(db, view_name, path, action=None):
+    """Read a workbook like an upload and save it with saveView"""
+    with open(path, 'rb') as stream:
+        df = MasterDataService(db).read_excel_stream(stream, path)
+    if action:
+        df['action'] = action
+    msgerror, stat, _ = v.saveView(view_name, db, df)
+    if msgerror:
+        raise SystemExit(f"{view_name}: {len(msgerror)} rows rejected, first: {msgerror[0]}")
+    return sum(stat.values())
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(rows, trace_memory):
+    random.seed(rows)
+    engine = create_database()
+    counter = QueryCounter(engine)
+    db = Session(engine)
+    seed(db)
+    v.invalidateDnormColumns()
+    workdir = tempfile.mkdtemp(prefix='bench_master_data_')
+
+    results = []
+
+    def measure(view_name, step, call):
+        counter.reset()
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        items = call()
+        elapsed = time.perf_counter() - start
+        traced = tracemalloc.get_traced_memory()[1] / 2 ** 20 if trace_memory else None
+        tracemalloc.stop()
+        results.append((rows, view_name, step, items, elapsed, counter.reset(), peak_rss_mb(), traced))
+
+    def export(view_name, path):
+        asyncio.run(MasterDataQuery(db).export_to_excel(view_name, path))
+        return rows
+
+    try:
+        for view_name in VIEWS:
+            sheet = build_sheet(db, view_name, rows, os.path.join(workdir, f"{view_name}-insert.xlsx"))
+            exported = os.path.join(workdir, f"{view_name}.xlsx")
+            measure(view_name, 'insert', lambda: save_sheet(db, view_name, sheet))
+            measure(view_name, 'export', lambda: export(view_name, exported))
+            measure(view_name, 'update', lambda: save_sheet(db, view_name, exported, action='U'))
+            if results[-1][3] != rows:
+                raise SystemExit(f"{view_name}: {results[-1][3]} of {rows} rows exported and updated")
+    finally:
+        db.close()
+        engine.dispose()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='report the peak Python allocations of every step (slower)')
+    args = parser.parse_args()
+
+    print(f"{'rows':>6} {'view':<13} {'step':<7} {'seconds':>8} {'rows/s':>8} {'queries':>8} "
+          f"{'RSS MB':>7}" + (f" {'traced MB':>9}" if args.trace_memory else ""))
+    for rows in args.rows:
+        for rows_, view_name, step, items, elapsed, queries, rss, traced in run(rows, args.trace_memory):
+            print(f"{rows_:>6} {view_name:<13} {step:<7} {elapsed:>8.3f} {items / elapsed:>8.0f} {queries:>8} "
+                  f"{rss:>7.0f}" + (f" {traced:>9.1f}" if traced is not None else ""))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the PDF report generators.
+
+Renders COA, COC and day certificates with ReportService for synthetic samples
+shaped like the output of _get_sample_with_measurements and _get_COA_Data, so
+no database is needed. Every report type and measurement count is rendered
+serially and then by a pool of worker processes, reporting p50/p95 render time,
+throughput, PDF size and peak RSS.
+
+Usage:
+    python -m benchmarks.bench_reports [--measurements 10 30 100] [--renders 20] [--workers 4]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import resource
+import shutil
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from app.services.report_service import ReportService
+
+REPORT_TYPES = {
+    'COA': 'generate_coa_report',
+    'COC': 'generate_coc_report',
+    'DAY_COA': 'generate_day_certificate_report',
+}
+
+
+class SyntheticReportService(ReportService):
+    """ReportService reading synthetic samples instead of the database"""
+
+    def __init__(self, measurements):
+        super().__init__(db=None)
+        self.measurements = measurements
+
+    async def _get_sample_with_measurements(self, sample_number):
+        random.seed(self.measurements)
+        return {
+            "id": 1,
+            "sample_number": sample_number,
+            "product": "Iron chloride",
+            "quality": "40%",
+            "sample_point": "T1",
+            "sample_date": "2026-06-01",
+            "sample_time": "06:00",
+            "customer": "Customer 1",
+            "batch_number": "B1",
+            "container_number": "C1",
+            "loading_ton": 24.5,
+            "measurements": [
+                {
+                    "variable": f"V{k}",
+                    "unit": "%",
+                    "value": round(random.uniform(1, 9), 3),
+                    "min_value": 1.0,
+                    "max_value": 9.0,
+                    "test_date": "2026-06-01 10:00:00"
+                }
+                for k in range(self.measurements)
+            ]
+        }
+
+    async def _get_COA_Data(self, sample_number):
+        random.seed(self.measurements)
+        return {
+            'sample': {
+                'grade': 'Iron chloride',
+                'technical_grade': 'Technical grade 40%',
+                'customer': 'Customer 1',
+                'order_number_pvs': 100001,
+                'order_number_client': 'PO-1',
+                'sample_date': '2026-06-01',
+                'bruto': 'FeCl3',
+                'batch_number': 'B1',
+                'container_number': 'C1'
+            },
+            'measurements': [
+                {
+                    'test': f"Test {k}",
+                    'element': f"E{k}",
+                    'test_results': round(random.uniform(1, 9), 3),
+                    'min': '1.000000',
+                    'max': '9.000000',
+                    'unit': '%',
+                    'less': k % 7 == 0,
+                    'typevar': 'I',
+                    'test_date': '2026-06-01'
+                }
+                for k in range(self.measurements)
+            ]
+        }
+
+
+def render(report_type, measurements):
+    """Render one report and return (seconds, PDF bytes)"""
+    service = SyntheticReportService(measurements)
+    generator = getattr(service, REPORT_TYPES[report_type])
+    start = time.perf_counter()
+    pdf_path = asyncio.run(generator(sample_number="C01062026_001", username="Bench"))
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(pdf_path)
+    shutil.rmtree(os.path.dirname(pdf_path), ignore_errors=True)
+    return elapsed, size
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def report(mode, report_type, measurements, results, wall):
+    times = [elapsed for elapsed, _ in results]
+    size = statistics.mean(size for _, size in results)
+    print(f"{mode:<9} {report_type:<8} {measurements:>6} {percentile(times, 0.5) * 1000:>8.1f} "
+          f"{percentile(times, 0.95) * 1000:>8.1f} {len(results) / wall:>9.1f} {size / 1024:>8.1f}")
+
+
+def peak_rss_mb(who):
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(who).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--measurements', type=int, nargs='+', default=[10, 30, 100])
+    parser.add_argument('--renders', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1))
+    args = parser.parse_args()
+
+    # Warm up fonts and styles outside the timings
+    render('COA', 1)
+
+    print(f"{'mode':<9} {'report':<8} {'meas.':>6} {'p50 ms':>8} {'p95 ms':>8} {'reports/s':>9} {'PDF KB':>8}")
+    for report_type in REPORT_TYPES:
+        for measurements in args.measurements:
+            start = time.perf_counter()
+            results = [render(report_type, measurements) for _ in range(args.renders)]
+            report('serial', report_type, measurements, results, time.perf_counter() - start)
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        list(pool.map(render, ['COA'] * args.workers, [1] * args.workers))
+        for report_type in REPORT_TYPES:
+            for measurements in args.measurements:
+                start = time.perf_counter()
+                results = list(pool.map(render, [report_type] * args.renders, [measurements] * args.renders))
+                report(f"{args.workers} procs", report_type, measurements, results, time.perf_counter() - start)
+
+    print(f"peak RSS: {peak_rss_mb(resource.RUSAGE_SELF):.0f} MB serial, "
+          f"{peak_rss_mb(resource.RUSAGE_CHILDREN):.0f} MB largest worker")
+
+
+if __name__ == '__main__':
+    main()
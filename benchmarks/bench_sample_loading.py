@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the sample loading hot paths.
+
+Seeds an in-memory SQLite database (see benchmarks/sqlite_db.py) with synthetic
+products, specifications, maps, sample matrices, holidays and one day of
+logistic data, in the style of load_logisticdata.py, then times:
+
+    customer load   SampleLoadingService.load_customer_samples (new samples)
+    update batch    SampleService.update_samples_batch (values of every measurement)
+    customer reload SampleLoadingService.load_customer_samples (existing samples)
+    production load SampleLoadingService.load_production_samples
+
+for each number of orders per day, reporting throughput and SQL statements.
+Duplicate sample numbers left by the loaders are reported as a warning.
+
+Usage:
+    python -m benchmarks.bench_sample_loading [--orders 10 100 1000]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+import fastapi  # noqa: F401 (imported lazily by update_samples_batch, kept out of its timing)
+from sqlalchemy import text
+from sqlalchemy.orm import Session, configure_mappers
+
+from app.services.sample_loading_service import SampleLoadingService
+from app.services.sample_service import SampleService
+from benchmarks.sqlite_db import QueryCounter, create_database
+
+# First day of a month and a Monday, so the Week and Month matrices are due too
+SAMPLE_DATE = '2026-06-01'
+USER_ID = 1
+N_VARIABLES = 20
+N_PRODUCTS = 20
+N_QUALITIES = 5
+N_CUSTOMERS = 50
+LOADING_TIMES = ['06:00', '07:10', '08:12', '09:14', '12:23', '14:50', '16:15', '17:00']
+
+
+def seed(db, orders):
+    random.seed(orders)
+    db.execute(text("INSERT INTO tuser(id, code, name, hashcode, status, is_admin, temp_password) "
+                    "VALUES (1, 'bench', 'Bench', '-', 1, 0, 0)"))
+    db.execute(text("INSERT INTO variable(name, test, unit, ord, typevar) VALUES (:name, :name, '%', :ord, 'I')"),
+               [{'name': f"V{k}", 'ord': k} for k in range(N_VARIABLES)])
+    db.execute(text("INSERT INTO product(name, name_coa) VALUES (:name, :name)"),
+               [{'name': f"P{k}"} for k in range(N_PRODUCTS)])
+    db.execute(text("INSERT INTO quality(name) VALUES (:name)"),
+               [{'name': f"Q{k}"} for k in range(N_QUALITIES)])
+    db.execute(text("INSERT INTO samplepoint(name) VALUES (:name)"),
+               [{'name': f"T{k}"} for k in range(10)])
+    db.execute(text("INSERT INTO holidays(date) VALUES (:date)"),
+               [{'date': date} for date in ('2026-01-01', '2026-05-01', '2026-12-25')])
+
+    combinations = [(p, q) for p in range(1, N_PRODUCTS + 1) for q in range(1, N_QUALITIES + 1)]
+
+    # Two article codes per product/quality
+    maps = []
+    for k, (p, q) in enumerate(combinations):
+        maps += [{'code': 1000 + 2 * k, 'p': p, 'q': q}, {'code': 1001 + 2 * k, 'p': p, 'q': q}]
+    db.execute(text("INSERT INTO map(article_code, product_id, quality_id) VALUES (:code, :p, :q)"), maps)
+
+    def add_spec(type_spec, p, q, customer):
+        spec_id = db.execute(text(
+            "INSERT INTO spec(type_spec, product_id, quality_id, customer, certificate, coa, coc, day_coa) "
+            "OUTPUT INSERTED.id VALUES (:type_spec, :p, :q, :customer, 'Y', :coa, 'X', :day_coa)"
+        ), {'type_spec': type_spec, 'p': p, 'q': q, 'customer': customer,
+            'coa': random.choice(['X', 'N']), 'day_coa': random.choice(['X', 'N'])}).scalar()
+        variables = random.sample(range(1, N_VARIABLES + 1), 10)
+        db.execute(text("INSERT INTO dspec(spec_id, variable_id, min_value, max_value) VALUES (:s, :v, :min, :max)"),
+                   [{'s': spec_id, 'v': v, 'min': 1, 'max': 9} for v in variables])
+
+    customers = []
+    for k in range(N_CUSTOMERS):
+        p, q = random.choice(combinations)
+        add_spec('CLI', p, q, f"Customer {k}")
+        customers.append((f"Customer {k}", p, q))
+    for p, q in combinations:
+        add_spec('GEN', p, q, None)
+
+    # One sample matrix per 10 orders, with 8 variables each
+    for k in range(max(1, orders // 10)):
+        p, q = random.choice(combinations)
+        matrix_id = db.execute(text(
+            "INSERT INTO samplematrix(product_id, quality_id, sample_point_id, spec_id, frequency) "
+            "OUTPUT INSERTED.id VALUES (:p, :q, :sp, 1, :frequency)"
+        ), {'p': p, 'q': q, 'sp': k % 10 + 1, 'frequency': random.choice(['Day', 'Week', 'Month'])}).scalar()
+        db.execute(text("INSERT INTO dsamplematrix(sample_matrix_id, variable_id) VALUES (:m, :v)"),
+                   [{'m': matrix_id, 'v': v} for v in random.sample(range(1, N_VARIABLES + 1), 8)])
+
+    rows = []
+    for k in range(orders):
+        customer, p, q = random.choice(customers)
+        article_code = 1000 + 2 * combinations.index((p, q)) + random.randint(0, 1)
+        rows.append({
+            "date": f"{SAMPLE_DATE} 00:00:00",
+            "time": random.choice(LOADING_TIMES),
+            "customer": customer,
+            "order1": 100000 + k,
+            "article_code": article_code,
+            "order2": str(random.randint(0, 50000)),
+            "description": f"P{p - 1} Q{q - 1}",
+            "ton": random.randint(0, 10000) / 100
+        })
+    db.execute(text("""INSERT into logisticdata( date,time, name_client,  order_number_PVS,  article_no,
+                 order_number_client, Description, loading_ton) VALUES (:date, :time,
+                 :customer, :order1, :article_code, :order2, :description, :ton)"""), rows)
+    db.commit()
+
+
+def update_payload(db):
+    """Build the update_samples payload that fills every measurement of the CLI samples"""
+    samples = {}
+    rows = db.execute(text("""
+        SELECT s.sample_number, v.name, m.min_value, m.max_value
+        FROM sample s JOIN measurement m ON m.sample_id = s.id JOIN variable v ON v.id = m.variable_id
+        WHERE s.type_sample = 'CLI' AND s.date = :date
+    """), {'date': SAMPLE_DATE})
+    for sample_number, variable, min_value, max_value in rows:
+        samples.setdefault(sample_number, []).append({
+            'variable': variable, 'value': 5.0,
+            'min': float(min_value) if min_value is not None else None,
+            'max': float(max_value) if max_value is not None else None
+        })
+    return [
+        {'sample_number': number, 'tank': None, 'container_number': None, 'batch_number': 'B1',
+         'remark': None, 'quality_info': quality_info}
+        for number, quality_info in samples.items()
+    ]
+
+
+def run(orders):
+    configure_mappers()  # keep the one-off mapper setup out of the first ORM timing
+    engine = create_database()
+    counter = QueryCounter(engine)
+    db = Session(engine)
+    seed(db, orders)
+    loader = SampleLoadingService(db)
+    samples = SampleService(db)
+
+    results = []
+
+    def measure(step, items, call):
+        counter.reset()
+        start = time.perf_counter()
+        asyncio.run(call())
+        elapsed = time.perf_counter() - start
+        results.append((orders, step, items, elapsed, counter.reset()))
+
+    measure('customer load', orders, lambda: loader.load_customer_samples(SAMPLE_DATE, USER_ID))
+
+    # The lab fills in the values before the next reload renumbers the samples
+    payload = update_payload(db)
+    measure('update batch', len(payload), lambda: samples.update_samples_batch(payload))
+    filled = db.execute(text("SELECT COUNT(*) FROM measurement WHERE value IS NOT NULL")).scalar()
+    expected = sum(len(sample['quality_info']) for sample in payload)
+    assert filled == expected, f"{filled} measurements filled, {expected} expected"
+
+    measure('customer reload', orders, lambda: loader.load_customer_samples(SAMPLE_DATE, USER_ID))
+    matrices = db.execute(text("SELECT COUNT(*) FROM samplematrix")).scalar()
+    measure('production load', matrices, lambda: loader.load_production_samples(SAMPLE_DATE, USER_ID))
+
+    duplicates = db.execute(text(
+        "SELECT COUNT(*) - COUNT(DISTINCT sample_number) FROM sample WHERE date = :date"
+    ), {'date': SAMPLE_DATE}).scalar()
+    if duplicates:
+        # The sequence of _get_sample_number has three digits
+        print(f"warning: {duplicates} duplicate sample numbers at {orders} orders per day")
+
+    db.close()
+    engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--orders', type=int, nargs='+', default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    print(f"{'orders':>7} {'step':<16} {'rows':>6} {'seconds':>9} {'rows/s':>9} {'queries':>8} {'q/row':>7}")
+    for orders in args.orders:
+        for orders_, step, items, elapsed, queries in run(orders):
+            print(f"{orders_:>7} {step:<16} {items:>6} {elapsed:>9.3f} {items / elapsed:>9.0f} "
+                  f"{queries:>8} {queries / max(items, 1):>7.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Startup profile of the application.
+
+Imports main.py in fresh interpreters (like a worker starting) and reports the
+median import time, the slowest modules imported by main according to
+python -X importtime and which heavy libraries were loaded at startup. pandas, numpy, reportlab,
+openpyxl and xlsxwriter should only be imported by the requests that need them.
+
+The settings are read from the environment/.env as usual; no database
+connection is made, since the lifespan does not run.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5] [--top 15]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ['pandas', 'numpy', 'reportlab', 'openpyxl', 'xlsxwriter']
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def python(*args):
+    result = subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode:
+        raise SystemExit(f"python {' '.join(args)} failed:\n{result.stderr}")
+    return result
+
+
+def import_seconds():
+    start = time.perf_counter()
+    python('-c', 'import main')
+    return time.perf_counter() - start
+
+
+def top_packages(top):
+    """Cumulative import time (ms) of the slowest modules imported by main"""
+    stderr = python('-X', 'importtime', '-c', 'import main').stderr
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Every nesting level is indented by two more spaces
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((depth, name.strip(), int(cumulative) / 1000))
+
+    # The imports of main are listed before it, one level deeper
+    packages = {}
+    end = max(k for k, (depth, name, _) in enumerate(entries) if depth == 0 and name == 'main')
+    for depth, name, ms in reversed(entries[:end]):
+        if depth == 0:
+            break
+        if depth == 1:
+            packages[name] = ms
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def loaded_heavy_modules():
+    code = f"import main, sys; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    return python('-c', code).stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    times = [import_seconds() for _ in range(args.runs)]
+    print(f"import main: {statistics.median(times) * 1000:.0f} ms median of {args.runs} "
+          f"(interpreter start included)")
+
+    print(f"\n{'module':<32} {'ms':>8}")
+    for package, ms in top_packages(args.top):
+        print(f"{package:<32} {ms:>8.1f}")
+
+    loaded = loaded_heavy_modules()
+    print(f"\nheavy modules loaded at startup: {', '.join(loaded) if loaded else 'none'}")
+    if loaded:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
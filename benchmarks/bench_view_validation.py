@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the master data upload validation.
+
+Builds a 10k-row 'spec-client' sheet against an in-memory SQLite database and
+compares the former row-by-row validation (preProcData cell loop + validateView per
+row, kept here as legacy_validate_view) with the columnar one (preProcData +
+validateFrame + validateKeys). Both paths must produce the same error messages
+and parameters; the script fails otherwise.
+
+Usage:
+    python -m benchmarks.bench_view_validation [--rows 10000]
+"""
+
+import argparse
+import math
+import random
+import time
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.services import view as v
+
+VIEW_NAME = 'spec-client'
+INTERVALS = ['fe', 'cu', 'zn', 'moisture', 'density', 'ph', 'ash', 'sulfur']
+LISTS = ['odour', 'colour']
+
+
+def create_database():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE product(id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(text("CREATE TABLE quality(id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(text("CREATE TABLE variable(id INTEGER PRIMARY KEY, name TEXT, typevar TEXT, ord INT)"))
+        conn.execute(text("CREATE TABLE spec(id INTEGER PRIMARY KEY, customer TEXT, product_id INT, quality_id INT, type_spec TEXT)"))
+        conn.execute(text("INSERT INTO product(name) VALUES (:name)"), [{'name': f"P{k}"} for k in range(200)])
+        conn.execute(text("INSERT INTO quality(name) VALUES (:name)"), [{'name': f"Q{k}"} for k in range(50)])
+        variables = [{'name': name, 'typevar': 'I', 'ord': k} for k, name in enumerate(INTERVALS)]
+        variables += [{'name': name, 'typevar': 'L', 'ord': 100 + k} for k, name in enumerate(LISTS)]
+        conn.execute(text("INSERT INTO variable(name, typevar, ord) VALUES (:name, :typevar, :ord)"), variables)
+    return Session(engine)
+
+
+def build_sheet(rows):
+    random.seed(1)
+    records = []
+    for k in range(rows):
+        record = {
+            'Action': 'I', 'Customer': f"C{k}", 'product': f"P{k % 200}", 'quality': f"Q{k % 50}",
+            'status': random.choice(['active', None]), 'certificate': random.choice(['Y', 'N', 'M']),
+            'opm': None, 'coa': random.choice(['X', 'N', None]), 'day_coa': 'X', 'coc': 'N',
+            'visual': 'Y', 'onedecimal': random.choice(['X', 'Y', None]),
+        }
+        for name in INTERVALS:
+            record[name] = random.choice([f"{random.randint(0, 5)}-{random.randint(5, 9)}", "2.5-", "-7.5", None])
+        for name in LISTS:
+            record[name] = random.choice(['X', 'Y', None])
+        record['id'] = None
+        # About 5% of the rows are wrong
+        error = random.random()
+        if error < 0.01:
+            record['product'] = 'unknown'
+        elif error < 0.02:
+            record['fe'] = '9-1'
+        elif error < 0.03:
+            record['cu'] = 'abc'
+        elif error < 0.04:
+            record['certificate'] = 'Z'
+        elif error < 0.05:
+            record['quality'] = None
+        records.append(record)
+    return pd.DataFrame(records)
+
+
+# Cell by cell null handling of preProcData before it was vectorized
+def legacy_preproc(data):
+    for col in data.columns:
+        df = data[data[col].isna()]
+        if col in v.view[VIEW_NAME]['cols']:
+            if v.view[VIEW_NAME]['cols'][col]['p'][0] == str:
+                data[col] = data[col].astype(str)
+                for index, row in df.iterrows():
+                    data.loc[index, col] = None
+            if type(data[col].values[0]) is float:
+                for index, row in df.iterrows():
+                    data.loc[index, col] = None
+    data['id'] = data['id'].fillna(0).astype(int)
+    return data
+
+
+# Row by row validation of the columns (former view.validateView), the baseline of validateFrame
+def legacy_validate_view(view_name, i, db, row, additional_cols, lookups):
+    msgerror = []
+    id = int(row['id'] )
+    Action = row['action'].strip()
+    row2={'action':Action}
+    if Action == "U" and id ==0:
+       msgerror.append(f"Action={Action}, id {id} row {i}. id must be not null")
+       return row2, msgerror
+    
+    if Action == "U" and not type(id) is int:
+        msgerror.append(f"Action={Action}, id {id} row {i}. id must be Integer.")
+        return row2, msgerror
+    
+    cols = list(v.view[view_name]['cols'].items()).copy()
+    cols.extend(additional_cols)
+    
+    # Pre-initialize all expected keys with None for interval validators
+    # This ensures that even if a column is empty, the key exists in row2
+    for col, value in additional_cols:
+        if 'validator' in value and value['validator'] == 'check_interval':
+            # For interval validators, we need both min and max keys
+            label = col
+            row2['min_'+label.lower()] = None
+            row2['max_'+label.lower()] = None
+    
+    # First we validate for not null column, FK and Enum
+    for col, value in cols:
+        colinfo = value['p']
+        label = col 
+        key = label.lower()        
+        if  colinfo[1]: # if the column is not null
+            if v.isNull(row[key]): 
+              msgerror.append(f"Action={Action}, row {i}. {label} must not be null.")
+              return row2, msgerror
+    
+        if 'validator' in value:
+            validator = value['validator']
+            # Get the actual database column name from col_info (already has min_/max_ prefix)
+            if isinstance(row[key], str):
+                ss = row[key].replace(' ','')
+                msg = v.validators[validator](label, ss)
+                if isinstance(msg, tuple):
+                    msg = msg[0]
+                if msg:
+                    msgerror.append(msg)
+                    return row2, msgerror
+                ll = ss.split('-')
+                # db_column already has min_ prefix from getDnormColumns, use it directly
+                # But we need both min and max, so construct them based on label
+                row2['min_'+label.lower()] = None
+                row2['max_'+label.lower()] = None
+                if len(ll)>0 and ll[0] != '':
+                  row2['min_'+label.lower()] = float(ll[0])
+                if len(ll)>1 and ll[1] != '':
+                   row2['max_'+label.lower()] = float(ll[1])
+        
+            if isinstance(row[key], float) and math.isnan(row[key]):
+               row2['min_'+label.lower()] = None
+               row2['max_'+label.lower()] = None
+                         
+        else:
+            # Convert nan to None to avoid SQL Server ODBC errors
+            row2[key] = None if (isinstance(row[key], float) and math.isnan(row[key])) else row[key]
+            if isinstance(row[key], str) and row[key] is not None:
+                row2[key] = row[key].strip()
+        
+        if 'lv' in value:
+            lv = value['lv']
+            if not v.isNull(row2[key]) and  not row2[key].strip() in lv:
+                msgerror.append(f"Action={Action}. Value {row[key]}  and {key} must be {lv}.")
+                return row2, msgerror
+        
+            # Convert nan to None to avoid SQL Server ODBC errors
+            row2[key] = None if (isinstance(row[key], float) and math.isnan(row[key])) else row[key]
+            if type(row[key]) is str:
+               row2[key] = row[key].strip()
+         
+        elif 'fk' in value:
+            table =  value['fk']
+            colFk = value['column']
+            # Check if the value is null/empty
+            if v.isNull(row[key]):
+                # For nullable FK columns, set to None
+                if not colinfo[1]:  # if column is nullable
+                    row2[colFk] = None
+                else:  # if column is not null but value is null, it's an error
+                    msgerror.append(f"Action={Action}, row {i}. {label} must not be null.")
+                    return row2, msgerror
+            else:
+                row2[colFk] = lookups['fk'][table].get(v.refKey(row[key]), 0)
+                if row2[colFk] == 0: # If the FK value does not exist
+                    msgerror.append(f"Action={Action}, row {i}, id:{id}. {col}:{row[key]} does not exist.")
+                    return row2, msgerror
+    
+    return v.validateKeys(view_name, i, db, row, row2, lookups)
+
+
+def run_rows(db, sheet, additional_cols):
+    lookups = v.loadLookups(db, VIEW_NAME)
+    data = sheet.copy()
+    data.columns = [col.lower() for col in data.columns]
+    data = legacy_preproc(data)
+    results = {}
+    for i, row in data.iterrows():
+        results[i] = legacy_validate_view(VIEW_NAME, i, db, row, additional_cols, lookups)
+    return results
+
+
+def run_frame(db, sheet, additional_cols):
+    lookups = v.loadLookups(db, VIEW_NAME)
+    _, data = v.preProcData(db, sheet.copy(), VIEW_NAME)
+    rows2, colerrors = v.validateFrame(VIEW_NAME, data, additional_cols, lookups)
+    results = {}
+    for i, row in v.records(data).items():
+        results[i] = v.validateRow(VIEW_NAME, i, db, row, rows2, colerrors, lookups)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=10000)
+    args = parser.parse_args()
+
+    db = create_database()
+    sheet = build_sheet(args.rows)
+    additional_cols = v.getDnormColumns(db, VIEW_NAME)
+
+    start = time.perf_counter()
+    expected = run_rows(db, sheet, additional_cols)
+    rows_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = run_frame(db, sheet, additional_cols)
+    frame_time = time.perf_counter() - start
+
+    mismatches = 0
+    for i, (row2, msg) in expected.items():
+        row2b, msgb = actual[i]
+        if msg != msgb or (not msg and row2 != row2b):
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"row {i}:\n  rows : {msg} {row2}\n  frame: {msgb} {row2b}")
+
+    nerrors = sum(1 for _, msg in expected.values() if msg)
+    print(f"{args.rows} rows, {nerrors} with errors")
+    print(f"row by row : {rows_time:8.3f} s")
+    print(f"columnar   : {frame_time:8.3f} s  ({rows_time / frame_time:.1f}x)")
+    if mismatches:
+        raise SystemExit(f"{mismatches} rows differ between both validations")
+
+
+if __name__ == "__main__":
+    main()
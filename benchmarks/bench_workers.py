@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Load test of the multi-worker deployment.
+
+Starts the application with gunicorn.conf.py for every number of workers and
+sends requests to PATH from CLIENTS processes with keep-alive connections for
+DURATION seconds, reporting throughput, p50/p95 latency, errors and the
+speedup over the first worker count. The application uses the database of the
+settings (environment/.env), like a normal start.
+
+The default path measures the request overhead of the framework and one query.
+For CPU-heavy requests pass a report path and a JWT, e.g.
+--path /api/reports/coa/C01062026_001 --token <access token>.
+With --url an already running server is tested instead.
+
+Usage:
+    python -m benchmarks.bench_workers [--workers 1 2 4] [--clients 8] [--duration 20] [--path /health]
+"""
+
+import argparse
+import http.client
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from multiprocessing import Pool
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def client(args):
+    """Send requests for duration seconds and return (latencies, errors)"""
+    url, path, token, duration = args
+    parts = urlsplit(url)
+    headers = {'Authorization': f"Bearer {token}"} if token else {}
+    connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=60)
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+            connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=60)
+    connection.close()
+    return latencies, errors
+
+
+def load(url, path, token, clients, duration):
+    with Pool(clients) as pool:
+        results = pool.map(client, [(url, path, token, duration)] * clients)
+    latencies = sorted(latency for result in results for latency in result[0])
+    return latencies, sum(result[1] for result in results)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers, port):
+    env = dict(os.environ, WORKERS=str(workers), BIND=f"127.0.0.1:{port}")
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'main:app'],
+                              cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    # Ready when every worker may have finished its startup
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"gunicorn exited with code {server.returncode}")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            connection.request('GET', '/api')
+            if connection.getresponse().status == 200:
+                time.sleep(2)
+                return server
+        except OSError:
+            time.sleep(0.5)
+    server.kill()
+    raise SystemExit("gunicorn did not start in 120 seconds")
+
+
+def stop_server(server):
+    server.send_signal(signal.SIGTERM)
+    try:
+        server.wait(timeout=60)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))] if values else float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--path', default='/health')
+    parser.add_argument('--token')
+    parser.add_argument('--url', help='test a running server instead of starting gunicorn')
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPU cores, {args.clients} clients, {args.duration:.0f} s per run, GET {args.path}")
+    print(f"{'workers':>7} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7} {'speedup':>8}")
+    runs = [None] if args.url else args.workers
+    baseline = None
+    for workers in runs:
+        server = None
+        url = args.url
+        if url is None:
+            port = free_port()
+            server = start_server(workers, port)
+            url = f"http://127.0.0.1:{port}"
+        try:
+            latencies, errors = load(url, args.path, args.token, args.clients, args.duration)
+        finally:
+            if server:
+                stop_server(server)
+        throughput = len(latencies) / args.duration
+        baseline = baseline or throughput
+        print(f"{workers or '-':>7} {len(latencies):>9} {throughput:>8.1f} {percentile(latencies, 0.5) * 1000:>8.1f} "
+              f"{percentile(latencies, 0.95) * 1000:>8.1f} {errors:>7} {throughput / baseline if baseline else 0:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
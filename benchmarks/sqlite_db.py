@@ -0,0 +1,107 @@
+"""
+SQLite stand-in for the SQL Server database of the benchmarks.
+
+Creates an in-memory SQLite database with the schema of the application models
+and rewrites the SQL Server specific syntax used by the services, so the real
+service code runs unchanged:
+
+    CONVERT(VARCHAR, expr, style)   ->  expr (dates are stored as ISO text)
+    INSERT ... OUTPUT INSERTED.col  ->  INSERT ... RETURNING col
+    @@IDENTITY                      ->  last_insert_rowid()
+    CONCAT(a, b, ...)               ->  registered SQL function
+
+Columns used by the raw SQL of the services but missing from the models are
+added to the schema, and created_at/updated_at get a server default like in
+the production database.
+"""
+
+import re
+
+from sqlalchemy import Column, DefaultClause, Integer, MetaData, Numeric, String, Table, create_engine, event, text
+from sqlalchemy.pool import StaticPool
+
+from app.models.base import Base
+from app.models import laboratory, sample, specification, user  # noqa: F401 (register the tables)
+
+CONVERT_PATTERN = re.compile(r"CONVERT\(\s*VARCHAR\s*,\s*([\w.]+)\s*,\s*\d+\s*\)", re.IGNORECASE)
+OUTPUT_PATTERN = re.compile(r"OUTPUT\s+INSERTED\.(\w+)", re.IGNORECASE)
+
+# Columns of the production database that the models do not map
+EXTRA_COLUMNS = {
+    "sample": [("article_code", Integer), ("opm", String(200)), ("onedecimal", String(1)),
+               ("test_date", String(20))],
+    "spec": [("onedecimal", String(1))],
+    "samplematrix": [("visual", String(2)), ("visueel", String(2))],
+    "measurement": [("variable", String(20)), ("variable_name", String(20))],
+}
+
+
+def rewrite_statement(statement):
+    """Translate the SQL Server syntax of a statement to SQLite"""
+    statement = CONVERT_PATTERN.sub(r"\1", statement)
+    match = OUTPUT_PATTERN.search(statement)
+    if match:
+        statement = OUTPUT_PATTERN.sub("", statement).rstrip().rstrip(";") + f" RETURNING {match.group(1)}"
+    return statement.replace("@@IDENTITY", "last_insert_rowid()")
+
+
+def _concat(*values):
+    return "".join("" if value is None else str(value) for value in values)
+
+
+def create_database(url="sqlite://"):
+    """
+    Create the benchmark database engine and schema.
+
+    Returns:
+        Engine: SQLAlchemy engine with the SQL Server syntax rewriting installed.
+    """
+    engine = create_engine(url, poolclass=StaticPool, connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def register_functions(dbapi_connection, connection_record):
+        dbapi_connection.create_function("concat", -1, _concat)
+
+    @event.listens_for(engine, "before_cursor_execute", retval=True)
+    def translate(conn, cursor, statement, parameters, context, executemany):
+        return rewrite_statement(statement), parameters
+
+    metadata = MetaData()
+    for table in Base.metadata.sorted_tables:
+        copy = table.to_metadata(metadata)
+        for name in ("created_at", "updated_at"):
+            if name in copy.c:
+                copy.c[name].server_default = DefaultClause(text("CURRENT_TIMESTAMP"))
+        for name, type_ in EXTRA_COLUMNS.get(table.name, []):
+            if name not in copy.c:
+                copy.append_column(Column(name, type_))
+
+    Table(
+        "logisticdata", metadata,
+        Column("id", Integer, primary_key=True),
+        Column("date", String(19)),
+        Column("time", String(5)),
+        Column("name_client", String(60)),
+        Column("order_number_pvs", Integer),
+        Column("article_no", Integer),
+        Column("order_number_client", String(40)),
+        Column("Description", String(60)),
+        Column("loading_ton", Numeric(12, 6)),
+    )
+    metadata.create_all(engine)
+    return engine
+
+
+class QueryCounter:
+    """Count the statements executed by an engine"""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def reset(self):
+        count, self.count = self.count, 0
+        return count
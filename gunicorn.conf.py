@@ -0,0 +1,60 @@
+"""
+Gunicorn configuration for production deployments.
+
+Runs the FastAPI application in several uvicorn worker processes, so a PDF
+being rendered or a workbook being imported in one request does not hold up
+the requests handled by the other workers:
+
+    gunicorn -c gunicorn.conf.py main:app
+
+The number of workers, the timeouts and preloading come from the application
+settings (WORKERS, WORKER_TIMEOUT, GRACEFUL_TIMEOUT, KEEPALIVE, PRELOAD_APP,
+MAX_REQUESTS); the listen address from BIND (default 0.0.0.0:8000). With
+DB_POOL_SIZE > 0 every worker has its own database connection pool
+(DB_POOL_SIZE + DB_MAX_OVERFLOW).
+When PROMETHEUS_MULTIPROC_DIR is set, /metrics aggregates all the workers.
+"""
+
+import glob
+import multiprocessing
+import os
+
+from app.core.config import settings
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = settings.WORKERS or multiprocessing.cpu_count()
+timeout = settings.WORKER_TIMEOUT
+graceful_timeout = settings.GRACEFUL_TIMEOUT
+keepalive = settings.KEEPALIVE
+preload_app = settings.PRELOAD_APP
+max_requests = settings.MAX_REQUESTS
+max_requests_jitter = settings.MAX_REQUESTS // 10
+
+# Requests are logged by the application with their query counts
+accesslog = None
+errorlog = "-"
+loglevel = settings.LOG_LEVEL.lower()
+
+
+def on_starting(server):
+    """Remove the metric files left by the workers of a previous run"""
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, "*.db")):
+            os.remove(path)
+
+
+def post_fork(server, worker):
+    """Give the worker its own connection pool instead of the one copied from the master"""
+    if preload_app:
+        from app.database.connection import engine
+        engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    """Drop the live gauges of a worker that exited from the aggregated metrics"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
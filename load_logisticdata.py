@@ -2,7 +2,8 @@
 Logistic Data Loading Script
 
 This script populates the logisticdata table with randomly generated test data
-for customers, products, and orders spanning a date range.
+for customers, products, and orders spanning a date range. The rows are loaded
+with LogisticIngestionService, replacing the data of the generated dates.
 
 Purpose:
     - Generate realistic test data for logistics operations
@@ -14,6 +15,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 
 from app.core.config import settings
+from app.services.logistic_ingestion_service import LogisticIngestionService
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy import create_engine, event, text
 from sqlalchemy.pool import NullPool
@@ -108,11 +110,8 @@ lst_times = ['06:00', '07:10', '08:12', '09:14', '12:23', '14:50', '16:15', '17:
 # ========================================
 # Data Generation
 # ========================================
-# Clear existing logistic data before generating new test data
-result = db.execute(text("DELETE FROM logisticdata"))
-db.commit()
-
 # Generate random logistic data for each date
+rows = []
 for date in lst_dates:
     print('date:', date)
 
@@ -132,22 +131,20 @@ for date in lst_dates:
         time = lst_times[random.randint(0, len(lst_times) - 1)]
         
         # Create a row with random data
-        row = {
+        rows.append({
             "date": date,
             "time": time,
-            "customer": customer,
-            "order1": random.randint(0, 50000),  # PVS order number
-            "article_code": article_code,
-            "order2": str(random.randint(0, 50000)),  # Client order number
+            "name_client": customer,
+            "order_number_pvs": random.randint(0, 50000),  # PVS order number
+            "article_no": article_code,
+            "order_number_client": str(random.randint(0, 50000)),  # Client order number
             "description": description,
-            "ton": random.randint(0, 10000) / 100  # Loading tonnage (0-100 tons)
-        }
-
-        # Insert the generated data into the logisticdata table
-        insert = """INSERT into logisticdata( date,time, name_client,  order_number_PVS,  article_no,
-                 order_number_client, Description, loading_ton) VALUES (:date, :time,
-                 :customer, :order1, :article_code, :order2, :description, :ton)"""
-        result = db.execute(text(insert), row)
-        db.commit()
-
-
+            "loading_ton": random.randint(0, 10000) / 100  # Loading tonnage (0-100 tons)
+        })
+
+# Replace the logistic data of the generated dates in one transaction; the other
+# dates are kept. Run load_customer_samples again for the dates it reports
+result = LogisticIngestionService(db).ingest(rows, source='generator', replace_dates=True)
+print(result['message'])
+print('changed dates:', len(result['changed_dates']))
+db.close()
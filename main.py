@@ -20,9 +20,14 @@ The application uses:
     - JWT tokens for authentication
 """
 
-from fastapi import FastAPI, Depends, HTTPException
+import time
+
+# Start of the module imports, reported in the startup profile
+import_started = time.perf_counter()
+
+from fastapi import FastAPI, Depends, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.exceptions import RequestValidationError
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
@@ -33,8 +38,12 @@ import sys
 import os
 
 from app.core.config  import settings
-from app.database.connection import get_db, test_connection, create_tables
+from app.core.metrics import REQUEST_DURATION, REQUESTS_IN_FLIGHT, render_metrics
+from app.database.connection import get_db, test_connection, create_tables, start_query_stats
 from app.api import auth, samples, reports, master_data, users
+from app.services.job_service import JobService
+
+import_ms = (time.perf_counter() - import_started) * 1000
 
 # ========================================
 # Logging Configuration
@@ -61,31 +70,45 @@ async def lifespan(app: FastAPI):
     Manage the application lifespan (startup and shutdown events).
     
     Startup tasks:
+        - Create the storage directories
         - Test database connection
-        - Initialize database tables
-        - Log application startup
+        - Create missing tables if AUTO_CREATE_TABLES is set (otherwise
+          this is done by python -m app.database.migrate)
+        - Fail the import jobs interrupted by a restart
+        - Log the startup profile
     
     Shutdown tasks:
         - Log application shutdown
         - Clean up resources
     """
     # Startup phase
+    started = time.perf_counter()
     logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
+    settings.ensure_directories()
     
     # Test database connection
     if not test_connection():
         logger.error("Database connection failed")
         raise Exception("Cannot connect to database")
+    connected = time.perf_counter()
     
     # Create tables if they don't exist (skip if error occurs)
-    try:
-        create_tables()
-        logger.info("Database tables initialized")
-    except Exception as e:
-        logger.warning(f"Could not create tables automatically: {e}")
-        logger.info("Tables may already exist or need manual creation")
+    if settings.AUTO_CREATE_TABLES:
+        try:
+            create_tables()
+            logger.info("Database tables initialized")
+        except Exception as e:
+            logger.warning(f"Could not create tables automatically: {e}")
+            logger.info("Tables may already exist or need manual creation")
     
-    logger.info("Application startup completed")
+    JobService().fail_orphaned_jobs()
+
+    finished = time.perf_counter()
+    logger.info(
+        f"Application startup completed - imports {import_ms:.0f} ms, "
+        f"database check {(connected - started) * 1000:.0f} ms, "
+        f"startup {(finished - started) * 1000:.0f} ms"
+    )
     
     yield
     
@@ -119,6 +142,52 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def query_stats_middleware(request: Request, call_next):
+    """
+    Count the SQL statements and DB time of each request.
+
+    The totals are sent in the Server-Timing header and logged per request.
+    """
+    stats = start_query_stats()
+    start = time.perf_counter()
+    response = await call_next(request)
+    total_ms = (time.perf_counter() - start) * 1000
+    db_ms = stats["duration"] * 1000
+
+    response.headers["Server-Timing"] = (
+        f'db;dur={db_ms:.1f};desc="{stats["count"]} queries", app;dur={total_ms:.1f}'
+    )
+    logger.info(
+        f"{request.method} {request.url.path} {response.status_code} - "
+        f"{stats['count']} queries, {db_ms:.1f} ms DB, {total_ms:.1f} ms total"
+    )
+    return response
+
+
+@app.middleware("http")
+async def metrics_middleware(request: Request, call_next):
+    """
+    Record the latency of each request by route template and the requests in flight.
+    """
+    REQUESTS_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        REQUESTS_IN_FLIGHT.dec()
+        # The route template keeps the label values bounded (no sample numbers)
+        route = request.scope.get("route")
+        REQUEST_DURATION.labels(
+            method=request.method,
+            route=route.path if route else "unmatched",
+            status=str(status_code)
+        ).observe(time.perf_counter() - start)
+
+
 # ========================================
 # Exception Handlers
 # ========================================
@@ -229,6 +298,17 @@ async def health_check(db: Session = Depends(get_db)):
         )
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Metrics endpoint - exposes the application metrics in the Prometheus text format.
+
+    With PROMETHEUS_MULTIPROC_DIR set, the metrics of all worker processes are aggregated.
+    """
+    content, content_type = render_metrics()
+    return Response(content=content, headers={"Content-Type": content_type})
+
+
 @app.get("/info")
 async def app_info():
     """
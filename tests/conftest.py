@@ -0,0 +1,29 @@
+"""
+Shared fixtures of the test suite.
+
+The tests run against the in-memory SQLite stand-in of the benchmarks
+(benchmarks/sqlite_db.py), so no SQL Server is needed.
+"""
+
+import os
+
+import pytest
+
+# Required settings without a default; the tests never use them
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("DATABASE_NAME", "lims_test")
+os.environ.setdefault("DATABASE_USER", "lims_test")
+os.environ.setdefault("DATABASE_PASSWORD", "lims_test")
+
+from sqlalchemy.orm import Session  # noqa: E402
+
+from benchmarks.sqlite_db import create_database  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    engine = create_database()
+    session = Session(engine)
+    yield session
+    session.close()
+    engine.dispose()
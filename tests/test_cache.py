@@ -0,0 +1,61 @@
+"""
+Tests of the in-process reference caches (app/utils/cache.py).
+"""
+
+from app.services import view
+from app.utils.cache import ReferenceCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr('app.utils.cache.time.monotonic', clock)
+    cache = ReferenceCache("test", ttl=10)
+    loads = []
+
+    def loader():
+        loads.append(clock.now)
+        return len(loads)
+
+    assert cache.get("key", loader) == 1
+    clock.now += 10
+    assert cache.get("key", loader) == 1
+    clock.now += 1
+    assert cache.get("key", loader) == 2
+    assert cache.peek("key") == 2
+
+
+def test_invalidate_drops_entries_and_bumps_the_version():
+    cache = ReferenceCache("test")
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    cache.invalidate("a")
+    assert (cache.peek("a"), cache.peek("b"), cache.version) == (None, 2, 1)
+    cache.invalidate()
+    assert (cache.peek("b"), cache.version) == (None, 2)
+
+
+def test_dnorm_columns_expire_in_every_worker():
+    assert view.dnorm_cache.ttl is not None
+
+
+def test_invalidation_during_a_load_is_not_overwritten():
+    cache = ReferenceCache("test")
+
+    def loader():
+        # The table changes while the value is being loaded
+        cache.invalidate()
+        return "stale"
+
+    assert cache.get("key", loader) == "stale"
+    assert cache.peek("key") is None
+    assert cache.get("key", lambda: "fresh") == "fresh"
+    assert cache.peek("key") == "fresh"
@@ -0,0 +1,95 @@
+"""
+Tests of the change-driven customer sample loading (SampleLoadingService.load_customer_samples).
+"""
+
+import asyncio
+
+from sqlalchemy import text
+
+from app.services.sample_loading_service import SampleLoadingService
+
+SAMPLE_DATE = '2026-06-01'
+
+
+def seed(db, orders=3):
+    db.execute(text("INSERT INTO variable(id, name, test, unit, ord, typevar) VALUES (1, 'V1', 'V1', '%', 1, 'I')"))
+    db.execute(text("INSERT INTO product(id, name, name_coa) VALUES (1, 'P1', 'P1')"))
+    db.execute(text("INSERT INTO quality(id, name) VALUES (1, 'Q1')"))
+    db.execute(text("INSERT INTO map(article_code, product_id, quality_id) VALUES (1000, 1, 1)"))
+    db.execute(text("INSERT INTO spec(id, type_spec, product_id, quality_id, customer, certificate, coa, coc, day_coa) "
+                    "VALUES (1, 'CLI', 1, 1, 'Customer', 'Y', 'X', 'X', 'N')"))
+    db.execute(text("INSERT INTO dspec(spec_id, variable_id, min_value, max_value) VALUES (1, 1, 1, 9)"))
+    db.execute(text("""INSERT INTO logisticdata(date, time, name_client, order_number_pvs, article_no,
+                       order_number_client, Description, loading_ton)
+                       VALUES (:date, '06:00', 'Customer', :order, 1000, 'X', 'P1 Q1', 10)"""),
+               [{'date': SAMPLE_DATE, 'order': order} for order in range(1, orders + 1)])
+    db.commit()
+
+
+def load(db):
+    return asyncio.run(SampleLoadingService(db).load_customer_samples(SAMPLE_DATE, 1))
+
+
+def sample_numbers(db):
+    return dict(db.execute(text("SELECT order_number_pvs, sample_number FROM sample WHERE type_sample='CLI'")).all())
+
+
+def test_reload_skips_unchanged_orders(db):
+    seed(db)
+    assert load(db)['new'] == 3
+    numbers = sample_numbers(db)
+
+    result = load(db)
+    assert (result['new'], result['changed'], result['removed'], result['unchanged']) == (0, 0, 0, 3)
+    assert sample_numbers(db) == numbers
+
+
+def test_changed_order_is_updated_and_keeps_its_number(db):
+    seed(db)
+    load(db)
+    numbers = sample_numbers(db)
+    db.execute(text("UPDATE logisticdata SET loading_ton=20 WHERE order_number_pvs=2"))
+    db.commit()
+
+    result = load(db)
+    assert (result['changed'], result['unchanged']) == (1, 2)
+    assert db.execute(text("SELECT loading_ton FROM sample WHERE order_number_pvs=2")).scalar() == 20
+    assert sample_numbers(db) == numbers
+
+
+def test_spec_limit_change_updates_the_samples(db):
+    seed(db)
+    load(db)
+    db.execute(text("UPDATE dspec SET max_value=8"))
+    db.commit()
+
+    assert load(db)['changed'] == 3
+    assert db.execute(text("SELECT DISTINCT max_value FROM measurement")).scalars().all() == [8]
+
+
+def test_removed_order_without_results_is_deleted(db):
+    seed(db)
+    load(db)
+    db.execute(text("DELETE FROM logisticdata WHERE order_number_pvs=1"))
+    db.commit()
+
+    result = load(db)
+    assert result['removed'] == 1
+    assert result['errors'] is None
+    assert 1 not in sample_numbers(db)
+    assert db.execute(text("SELECT COUNT(*) FROM sampleloadstate")).scalar() == 2
+
+
+def test_removed_order_with_results_is_kept_and_reported(db):
+    seed(db)
+    load(db)
+    sample_id = db.execute(text("SELECT id FROM sample WHERE order_number_pvs=1")).scalar()
+    db.execute(text("UPDATE measurement SET value=5 WHERE sample_id=:id"), {'id': sample_id})
+    db.execute(text("DELETE FROM logisticdata WHERE order_number_pvs=1"))
+    db.commit()
+
+    result = load(db)
+    assert result['removed'] == 0
+    assert not result['success']
+    assert any(sample_numbers(db)[1] in error for error in result['errors'])
+    assert db.execute(text("SELECT value FROM measurement WHERE sample_id=:id"), {'id': sample_id}).scalar() == 5
@@ -0,0 +1,44 @@
+"""
+Tests of the conditional GET helpers (app/utils/http.py).
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from fastapi import Request
+
+from app.utils.http import cache_headers, content_etag, http_date, is_not_modified
+
+MODIFIED = datetime(2026, 10, 19, 10, 0, 0, 500000, tzinfo=timezone.utc)
+
+
+def request(**headers):
+    return Request({'type': 'http', 'method': 'GET', 'path': '/',
+                    'headers': [(k.replace('_', '-').encode(), v.encode()) for k, v in headers.items()]})
+
+
+def test_etag_depends_only_on_the_content():
+    assert content_etag({'a': 1, 'b': [2]}) == content_etag({'b': [2], 'a': 1})
+    assert content_etag({'a': 1}) != content_etag({'a': 2})
+
+
+def test_cache_headers():
+    assert cache_headers('abc') == {'ETag': '"abc"', 'Cache-Control': 'private, no-cache'}
+    assert cache_headers('abc', MODIFIED)['Last-Modified'] == 'Mon, 19 Oct 2026 10:00:00 GMT'
+
+
+def test_if_none_match():
+    assert is_not_modified(request(if_none_match='"abc"'), 'abc')
+    assert is_not_modified(request(if_none_match='"x", W/"abc"'), 'abc')
+    assert is_not_modified(request(if_none_match='*'), 'abc')
+    assert not is_not_modified(request(if_none_match='"x"'), 'abc')
+    # If-None-Match takes precedence over If-Modified-Since
+    assert not is_not_modified(request(if_none_match='"x"', if_modified_since=http_date(MODIFIED)), 'abc', MODIFIED)
+
+
+def test_if_modified_since():
+    assert is_not_modified(request(if_modified_since=http_date(MODIFIED)), 'abc', MODIFIED)
+    assert not is_not_modified(request(if_modified_since=http_date(MODIFIED - timedelta(seconds=1))),
+                               'abc', MODIFIED)
+    assert not is_not_modified(request(if_modified_since='yesterday'), 'abc', MODIFIED)
+    assert not is_not_modified(request(if_modified_since=http_date(MODIFIED)), 'abc')
+    assert not is_not_modified(request(), 'abc', MODIFIED)
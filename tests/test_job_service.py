@@ -0,0 +1,80 @@
+"""
+Tests of the background job records (JobStore) and their access check.
+"""
+
+import asyncio
+import io
+import os
+import threading
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+# The job service opens its sessions from the application engine (SQL Server ODBC driver)
+pytest.importorskip("pyodbc")
+
+from app.api.master_data import get_master_data_job, upload_master_data_async  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services import job_service  # noqa: E402
+from app.services.job_service import JobService, JobStore  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = JobStore(str(tmp_path / "jobs"))
+    monkeypatch.setattr(job_service, "_job_store", store)
+    return store
+
+
+def test_directory_is_created_with_the_first_job(store):
+    assert not os.path.exists(store.directory)
+    job = store.create("master-data-import")
+    assert store.get(job["id"])["status"] == "queued"
+
+
+def test_jobs_of_a_gone_process_are_failed(store):
+    gone = store.create("master-data-import", pid=os.getpid())  # pid reused by the restarted process
+    running = store.create("master-data-import", pid=os.getppid())
+    celery = store.create("master-data-import", pid=None)
+    done = store.create("master-data-import", pid=os.getpid())
+    store.update(done["id"], status="completed")
+
+    assert JobService().fail_orphaned_jobs() == 1
+    assert store.get(gone["id"])["status"] == "failed"
+    assert [store.get(job["id"])["status"] for job in (running, celery, done)] == ["queued", "queued", "completed"]
+
+
+def test_fail_orphaned_without_jobs(store):
+    assert store.fail_orphaned() == 0
+
+
+def test_job_is_visible_to_its_owner_and_admins(store):
+    job = store.create("master-data-import", user_id=1)
+
+    def get(user):
+        return asyncio.run(get_master_data_job(job["id"], current_user=user))
+
+    assert get(User(id=1, is_admin=False))["id"] == job["id"]
+    assert get(User(id=2, is_admin=True))["id"] == job["id"]
+    with pytest.raises(HTTPException) as error:
+        get(User(id=2, is_admin=False))
+    assert error.value.status_code == 403
+
+
+def test_upload_is_copied_off_the_event_loop(store, monkeypatch):
+    threads = []
+
+    def submit(self, stream, filename, table_type, username, user_id=None):
+        threads.append(threading.get_ident())
+        return self.store.create("master-data-import", user_id=user_id)
+
+    monkeypatch.setattr(JobService, "submit_master_data_import", submit)
+
+    async def upload():
+        file = UploadFile(io.BytesIO(b"data"), filename="maps.xlsx")
+        return await upload_master_data_async("maps", file, current_user=User(id=1, name="admin", is_admin=True)), \
+            threading.get_ident()
+
+    response, loop_thread = asyncio.run(upload())
+    assert response["status"] == "queued"
+    assert threads and threads[0] != loop_thread
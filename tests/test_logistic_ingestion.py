@@ -0,0 +1,57 @@
+"""
+Tests of the incremental logistic data ingestion (LogisticIngestionService).
+"""
+
+import io
+
+from sqlalchemy import text
+
+from app.services.logistic_ingestion_service import LogisticIngestionService
+
+
+def order(number, date='2026-06-01', **values):
+    return dict({'date': date, 'time': '06:00', 'name_client': 'Customer', 'order_number_pvs': number,
+                 'article_no': 1000, 'order_number_client': 'X', 'description': 'P1 Q1',
+                 'loading_ton': 10}, **values)
+
+
+def rows(db):
+    return db.execute(text("SELECT order_number_pvs, date, loading_ton FROM logisticdata "
+                           "ORDER BY order_number_pvs, date")).all()
+
+
+def test_batches_are_upserted_on_order_and_date(db):
+    service = LogisticIngestionService(db)
+    result = service.ingest([order(1), order(2)])
+    assert (result['inserted'], result['changed_dates']) == (2, ['2026-06-01'])
+
+    result = service.ingest([order(1), order(2, loading_ton=20), order(3, date='2026-06-02', time='')])
+    assert (result['inserted'], result['updated'], result['unchanged']) == (1, 1, 1)
+    assert result['changed_dates'] == ['2026-06-01', '2026-06-02']
+    assert rows(db) == [(1, '2026-06-01', 10), (2, '2026-06-01', 20), (3, '2026-06-02', 10)]
+    assert result['high_water_mark'] == '2026-06-02 00:00'
+
+
+def test_replace_dates_deletes_the_missing_orders_and_duplicates(db):
+    db.execute(text("INSERT INTO logisticdata(date, order_number_pvs, loading_ton) "
+                    "VALUES ('2026-06-01', 1, 10), ('2026-06-01', 1, 10), ('2026-06-01', 2, 10)"))
+    db.commit()
+
+    result = LogisticIngestionService(db).ingest([order(1)], replace_dates=True)
+    assert (result['updated'], result['deleted']) == (1, 2)
+    assert rows(db) == [(1, '2026-06-01', 10)]
+
+
+def test_invalid_rows_reject_the_whole_batch(db):
+    result = LogisticIngestionService(db).ingest([order(1), order(None, date='01/06/2026', loading_ton='x')])
+    assert not result['success']
+    assert result['errors'] == ["Row 2: Invalid date '01/06/2026', expected YYYY-MM-DD",
+                                "Row 2: order_number_pvs is required",
+                                "Row 2: loading_ton 'x' is not a number"]
+    assert rows(db) == []
+
+
+def test_csv_batches_detect_the_delimiter():
+    stream = io.BytesIO("Date;Order_Number_PVS;Loading_ton\n2026-06-01 07:10;5;1,5\n".encode())
+    batch = LogisticIngestionService(None).read_batch(stream, 'loadings.csv')
+    assert batch == [{'Date': '2026-06-01 07:10', 'Order_Number_PVS': '5', 'Loading_ton': '1,5'}]
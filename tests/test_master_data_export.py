@@ -0,0 +1,51 @@
+"""
+Tests of the cached master data exports (MasterDataQuery.export_cached).
+"""
+
+import asyncio
+import os
+import time
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.services.master_data_service import MasterDataQuery
+
+
+def seed(db):
+    db.execute(text("INSERT INTO product(id, name) VALUES (1, 'P1')"))
+    db.execute(text("INSERT INTO quality(id, name) VALUES (1, 'Q1')"))
+    db.execute(text("INSERT INTO map(article_code, product_id, quality_id) VALUES (1000, 1, 1)"))
+    db.commit()
+
+
+def export(db):
+    return asyncio.run(MasterDataQuery(db).export_cached('maps'))
+
+
+def test_export_is_reused_until_the_data_changes(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'EXPORT_CACHE_DIR', str(tmp_path))
+    seed(db)
+    path, etag, _ = export(db)
+    assert export(db)[:2] == (path, etag)
+
+    db.execute(text("INSERT INTO map(article_code, product_id, quality_id) VALUES (1001, 1, 1)"))
+    db.commit()
+    new_path, new_etag, _ = export(db)
+    assert new_etag != etag and os.path.exists(new_path)
+
+
+def test_superseded_exports_are_kept_while_recently_served(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'EXPORT_CACHE_DIR', str(tmp_path))
+    seed(db)
+    served, _, _ = export(db)
+    stale = tmp_path / 'maps_stale.xlsx'
+    stale.write_bytes(b'')
+    old = time.time() - settings.EXPORT_CACHE_KEEP_MINUTES * 60 - 1
+    os.utime(stale, (old, old))
+
+    db.execute(text("INSERT INTO map(article_code, product_id, quality_id) VALUES (1001, 1, 1)"))
+    db.commit()
+    export(db)
+    assert os.path.exists(served)
+    assert not stale.exists()
@@ -0,0 +1,51 @@
+"""
+Tests of the streamed workbook reading of the master data imports (MasterDataService.read_excel_stream).
+"""
+
+import io
+
+import openpyxl
+import pandas as pd
+from openpyxl.styles import Font
+
+from app.services.master_data_service import MasterDataService
+
+
+def workbook(rows, formatted_rows=0):
+    book = openpyxl.Workbook()
+    sheet = book.active
+    for row in rows:
+        sheet.append(row)
+    # Formatted but empty cells below the data
+    for k in range(formatted_rows):
+        sheet.cell(row=len(rows) + 2 + k, column=2).font = Font(bold=True)
+    stream = io.BytesIO()
+    book.save(stream)
+    stream.seek(0)
+    return stream
+
+
+def read(stream):
+    return MasterDataService(None).read_excel_stream(stream, 'upload.xlsx')
+
+
+def test_blank_rows_are_kept_between_data_rows_and_dropped_at_the_end():
+    stream = workbook([['Action', 'name', 'id'], ['I', 'a', None], [None, None, None], ['U', 'b', 2]],
+                      formatted_rows=3)
+    data = read(stream)
+
+    assert len(data) == 3
+    assert data['Action'].tolist()[::2] == ['I', 'U']
+    assert data.iloc[1].isna().all()
+    stream.seek(0)
+    expected = pd.read_excel(stream)
+    assert list(data.columns) == list(expected.columns)
+    assert data.isna().equals(expected.isna())
+
+
+def test_unnamed_columns_and_short_rows():
+    data = read(workbook([['Action', None, 'id'], ['I']]))
+
+    assert list(data.columns) == ['Action', 'Unnamed: 1', 'id']
+    assert data.iloc[0].tolist()[0] == 'I'
+    assert data.iloc[0, 1:].isna().all()
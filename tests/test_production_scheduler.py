@@ -0,0 +1,93 @@
+"""
+Tests of the production sample calendar and schedule (app/services/production_scheduler.py).
+"""
+
+from datetime import date
+
+from sqlalchemy import text
+
+from app.services.production_scheduler import ProductionScheduler, build_calendar
+
+WEEKDAYS = (0, 1, 2, 3, 4)
+
+
+def calendar(year, *holidays):
+    return build_calendar(year, frozenset(holidays), WEEKDAYS)
+
+
+def test_week_starting_in_december_is_due_in_december():
+    # The week of Monday 2025-12-29 belongs to 2025, the first week of 2026 starts on 2026-01-05
+    assert calendar(2025)['Week'][-1] == date(2025, 12, 29)
+    assert calendar(2026)['Week'][0] == date(2026, 1, 5)
+    assert len(calendar(2026)['Week']) == 52
+    assert calendar(2026)['Week'][-1] == date(2026, 12, 28)
+    assert calendar(2027)['Week'][0] == date(2027, 1, 4)
+
+
+def test_week_without_working_days_in_december_is_due_in_january():
+    holidays = ('2025-12-29', '2025-12-30', '2025-12-31', '2026-01-01')
+    assert date(2026, 1, 2) not in calendar(2025, *holidays)['Week']
+    assert calendar(2026, *holidays)['Week'][:2] == (date(2026, 1, 2), date(2026, 1, 5))
+
+
+def test_holiday_on_the_first_day_of_a_period_moves_it_to_the_next_working_day():
+    due = calendar(2026, '2026-01-01', '2026-04-01')
+    for frequency in ('Month', 'Quarter', '1/2 year'):
+        assert due[frequency][0] == date(2026, 1, 2)
+    assert due['Quarter'][1] == date(2026, 4, 2)
+    assert due['Month'][3] == date(2026, 4, 2)
+
+
+def test_month_starting_on_a_weekend_is_due_on_monday():
+    # 2026-08-01 is a Saturday
+    assert date(2026, 8, 3) in calendar(2026)['Month']
+    assert len(calendar(2026)['Month']) == 12
+    assert len(calendar(2026)['1/2 year']) == 2
+
+
+def test_days_are_the_working_days_of_the_year():
+    due = calendar(2026, '2026-01-01', '2026-12-25', '2026-12-26')
+    assert len(due['Day']) == 261 - 2  # 2026-12-26 is a Saturday
+    assert all(day.weekday() < 5 and day.year == 2026 for day in due['Day'])
+    assert due['Day - loading'] == due['Day']
+
+
+def test_schedule_uses_the_holidays_table_and_the_loadings(db):
+    db.execute(text("INSERT INTO product(id, name) VALUES (1, 'P1')"))
+    db.execute(text("INSERT INTO quality(id, name) VALUES (1, 'Q1')"))
+    db.execute(text("INSERT INTO samplepoint(id, name) VALUES (1, 'T1')"))
+    db.execute(text("INSERT INTO spec(id, type_spec, product_id, quality_id) VALUES (1, 'GEN', 1, 1)"))
+    db.execute(text("INSERT INTO samplematrix(id, product_id, quality_id, sample_point_id, spec_id, frequency) "
+                    "VALUES (1, 1, 1, 1, 1, 'MONTH'), (2, 1, 1, 1, 1, 'Day - loading'), "
+                    "(3, 1, 1, 1, 1, 'Batch')"))
+    db.execute(text("INSERT INTO holidays(date) VALUES ('2026-06-01')"))
+    db.execute(text("INSERT INTO map(article_code, product_id, quality_id) VALUES (1000, 1, 1)"))
+    db.execute(text("INSERT INTO logisticdata(date, name_client, order_number_pvs, article_no) "
+                    "VALUES ('2026-06-03', 'Customer', 1, 1000)"))
+    db.commit()
+
+    schedule = ProductionScheduler(db).get_schedule('2026-06-01', '2026-06-05')
+    assert {day: [m['id'] for m in matrices] for day, matrices in schedule.items()} == \
+        {'2026-06-02': [1], '2026-06-03': [2]}
+    assert schedule['2026-06-02'][0]['frequency'] == 'Month'
+
+
+def test_samples_are_created_once(db):
+    db.execute(text("INSERT INTO variable(id, name, test, unit, ord, typevar) VALUES (1, 'V1', 'V1', '%', 1, 'I')"))
+    db.execute(text("INSERT INTO product(id, name) VALUES (1, 'P1')"))
+    db.execute(text("INSERT INTO quality(id, name) VALUES (1, 'Q1')"))
+    db.execute(text("INSERT INTO samplepoint(id, name) VALUES (1, 'T1')"))
+    db.execute(text("INSERT INTO spec(id, type_spec, product_id, quality_id) VALUES (1, 'GEN', 1, 1)"))
+    db.execute(text("INSERT INTO dspec(spec_id, variable_id, min_value, max_value) VALUES (1, 1, -1, 9)"))
+    db.execute(text("INSERT INTO samplematrix(id, product_id, quality_id, sample_point_id, spec_id, frequency) "
+                    "VALUES (1, 1, 1, 1, 1, 'Day')"))
+    db.execute(text("INSERT INTO dsamplematrix(sample_matrix_id, variable_id) VALUES (1, 1)"))
+    db.commit()
+    scheduler = ProductionScheduler(db)
+
+    result = scheduler.create_samples('2026-06-05', '2026-06-08', 1)
+    assert (result['created'], result['existing'], result['errors']) == (2, 0, None)
+    assert scheduler.create_samples('2026-06-05', '2026-06-08', 1)['existing'] == 2
+    assert db.execute(text("SELECT date, sample_number FROM sample ORDER BY date")).all() == \
+        [('2026-06-05', 'P05062026_001'), ('2026-06-08', 'P08062026_001')]
+    assert db.execute(text("SELECT DISTINCT min_value, max_value FROM measurement")).all() == [(None, 9)]
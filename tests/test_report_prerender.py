@@ -0,0 +1,65 @@
+"""
+Tests of the version stamps of the pre-rendered reports (ReportService).
+"""
+
+from sqlalchemy import text
+
+from app.services.report_service import ReportService
+
+
+def seed(db):
+    db.execute(text("INSERT INTO variable(id, name, test, unit, ord, typevar) VALUES (1, 'V1', 'V1', '%', 1, 'I')"))
+    db.execute(text("INSERT INTO product(id, name, name_coa) VALUES (1, 'P1', 'P1')"))
+    db.execute(text("INSERT INTO quality(id, name, long_name) VALUES (1, 'Q1', 'Quality 1')"))
+    db.execute(text("INSERT INTO sample(id, type_sample, product_id, quality_id, sample_number, customer, loading_ton) "
+                    "VALUES (1, 'CLI', 1, 1, 'S1', 'Customer', 10)"))
+    db.execute(text("INSERT INTO measurement(sample_id, variable, variable_id, min_value, max_value) "
+                    "VALUES (1, 'V1', 1, 1, 9)"))
+    db.commit()
+
+
+def test_raw_sql_updates_change_the_report_version(db):
+    seed(db)
+    service = ReportService(db)
+    version = service.report_version('S1')
+    assert service.report_version('S1') == version
+
+    # Raw SQL updates do not bump updated_at
+    db.execute(text("UPDATE measurement SET value=5 WHERE sample_id=1"))
+    db.commit()
+    measured = service.report_version('S1')
+    assert measured != version
+
+    db.execute(text("UPDATE sample SET loading_ton=20 WHERE id=1"))
+    db.commit()
+    assert service.report_version('S1') != measured
+
+
+def test_unknown_sample_has_no_version(db):
+    assert ReportService(db).report_version('S1') is None
+
+
+def test_prerendered_report_is_per_user(db, tmp_path, monkeypatch):
+    seed(db)
+    monkeypatch.setattr('app.services.report_service.PRERENDER_DIR', str(tmp_path))
+    service = ReportService(db)
+    version = f"{service.report_version('S1')}_{service.footer_version('alice')}"
+    path = service.prerendered_path('COA', 'S1', version)
+    open(path, 'wb').close()
+
+    assert service.get_prerendered_report('COA', 'S1', 'alice') == path
+    assert service.get_prerendered_report('COA', 'S1', 'bob') is None
+
+
+def test_other_users_miss_without_computing_the_version(db, tmp_path, monkeypatch):
+    seed(db)
+    monkeypatch.setattr('app.services.report_service.PRERENDER_DIR', str(tmp_path))
+    service = ReportService(db)
+    version = f"{service.report_version('S1')}_{service.footer_version('alice')}"
+    open(service.prerendered_path('COA', 'S1', version), 'wb').close()
+
+    def report_version(sample_number):
+        raise AssertionError("the data version is not needed")
+
+    monkeypatch.setattr(service, 'report_version', report_version)
+    assert service.get_prerendered_report('COA', 'S1', 'bob') is None
@@ -0,0 +1,44 @@
+"""
+Tests of the batched sample queries of SampleService.
+"""
+
+import asyncio
+
+from sqlalchemy import text
+
+from app.services.sample_service import SampleService
+
+
+def seed(db):
+    db.execute(text("INSERT INTO variable(id, name, test, unit, ord, typevar) VALUES (1, 'V1', 'V1', '%', 1, 'I')"))
+    db.execute(text("INSERT INTO product(id, name) VALUES (1, 'P1')"))
+    db.execute(text("INSERT INTO quality(id, name) VALUES (1, 'Q1')"))
+    db.execute(text("INSERT INTO spec(id, type_spec, product_id, quality_id, customer) "
+                    "VALUES (1, 'CLI', 1, 1, 'Customer')"))
+    db.execute(text("INSERT INTO sample(id, type_sample, product_id, quality_id, sample_number, customer) "
+                    "VALUES (1, 'CLI', 1, 1, 'S1', ' CUSTOMER '), (2, 'CLI', 1, 1, 'S2', 'Other')"))
+    db.execute(text("INSERT INTO measurement(sample_id, variable, variable_id, min_value, max_value) "
+                    "VALUES (1, 'V1', 1, 1, 9), (2, 'V1', 1, 1, 9)"))
+    db.commit()
+
+
+def test_customer_specifications_match_without_case_and_blanks(db):
+    seed(db)
+    result = asyncio.run(SampleService(db).refresh_samples_specifications(['S1', 'S2', 'S3']))
+
+    assert [m['variable'] for m in result['measurements']['S1']] == ['V1']
+    assert result['measurements']['S2'] is None
+    assert result['not_found'] == ['S3']
+
+
+def test_completion_status_is_counted_per_sample(db):
+    seed(db)
+    # A second sample with the number of sample 1, e.g. entered twice
+    db.execute(text("INSERT INTO sample(id, type_sample, product_id, quality_id, sample_number) "
+                    "VALUES (3, 'MAN', 1, 1, 'S1')"))
+    db.execute(text("UPDATE measurement SET value=5 WHERE sample_id=1"))
+    db.commit()
+
+    statuses = asyncio.run(SampleService(db).get_samples_completion_status(sample_numbers=['S1', 'S2']))
+    assert [(s['sample_id'], s['sample_number'], s['total_measurements'], s['is_complete'])
+            for s in statuses] == [(1, 'S1', 1, True), (2, 'S2', 1, False), (3, 'S1', 0, False)]
@@ -0,0 +1,59 @@
+"""
+Tests of the user access update (UserService.update_user_access).
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from app.services.user_service import UserService, invalidate_option_menu_cache
+
+
+@pytest.fixture(autouse=True)
+def option_menu_cache():
+    # The optionmenu map is cached per process; every test has its own database
+    invalidate_option_menu_cache()
+    yield
+    invalidate_option_menu_cache()
+
+
+def seed(db):
+    db.execute(text("INSERT INTO tuser(id, code, name, hashcode, status, is_admin, temp_password) "
+                    "VALUES (1, 'u1', 'User 1', 'x', 1, 0, 0), (2, 'u2', 'User 2', 'x', 1, 0, 0)"))
+    db.execute(text("INSERT INTO optionmenu(id, name) VALUES (1, 'Samples'), (2, 'Reports'), (3, 'Users')"))
+    db.execute(text("INSERT INTO optionuser(user_id, option_id) VALUES (1, 1), (1, 3), (2, 3)"))
+    db.commit()
+
+
+def options(db, user_id):
+    return db.execute(text("SELECT option_id FROM optionuser WHERE user_id=:user_id ORDER BY option_id"),
+                      {'user_id': user_id}).scalars().all()
+
+
+def update(db, user_id, names):
+    return asyncio.run(UserService(db).update_user_access(user_id, names))
+
+
+def test_only_the_difference_is_applied(db):
+    seed(db)
+    before = db.execute(text("SELECT id FROM optionuser WHERE user_id=1 AND option_id=1")).scalar()
+
+    update(db, 1, [' samples', 'REPORTS', 'Unknown'])
+    assert options(db, 1) == [1, 2]
+    # The kept option is not deleted and inserted again
+    assert db.execute(text("SELECT id FROM optionuser WHERE user_id=1 AND option_id=1")).scalar() == before
+    assert options(db, 2) == [3]
+
+    update(db, 1, [])
+    assert options(db, 1) == []
+
+
+def test_options_added_after_caching_are_found(db):
+    seed(db)
+    update(db, 1, ['Samples'])
+    db.execute(text("INSERT INTO optionmenu(id, name) VALUES (4, 'Jobs')"))
+    db.commit()
+
+    update(db, 1, ['Samples', 'Jobs'])
+    assert options(db, 1) == [1, 4]
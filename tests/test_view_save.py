@@ -0,0 +1,111 @@
+"""
+Tests of the master data uploads (view.saveView) on the 'maps' view.
+"""
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from app.services import view as v
+
+COLUMNS = ['Action', 'article_code', 'product', 'logistic_info', 'quality', 'id']
+
+
+def seed(db):
+    db.execute(text("INSERT INTO product(id, name) VALUES (1, 'P1'), (2, 'P2')"))
+    db.execute(text("INSERT INTO quality(id, name) VALUES (1, 'Q1')"))
+    db.execute(text("INSERT INTO map(id, article_code, product_id, quality_id, logistic_info) "
+                    "VALUES (1, 1000, 1, 1, 'A'), (2, 2000, 2, 1, 'B')"))
+    db.commit()
+
+
+def save(db, rows):
+    return v.saveView('maps', db, pd.DataFrame(rows, columns=COLUMNS))
+
+
+def maps(db):
+    return db.execute(text("SELECT article_code, product_id, logistic_info FROM map ORDER BY article_code")).all()
+
+
+def test_key_of_a_deleted_row_can_be_inserted(db):
+    seed(db)
+    errors, stat, _ = save(db, [['D', 1000, 'P1', 'A', 'Q1', 1],
+                                ['I', 1001, 'P1', 'A', 'Q1', None]])
+    assert errors == []
+    assert (stat['ndeleted'], stat['ninserted']) == (1, 1)
+    assert maps(db) == [(1001, 1, 'A'), (2000, 2, 'B')]
+
+
+def test_key_released_by_an_update_can_be_inserted(db):
+    seed(db)
+    errors, stat, _ = save(db, [['U', 2000, 'P2', 'C', 'Q1', 2],
+                                ['I', 2001, 'P2', 'B', 'Q1', None]])
+    assert errors == []
+    assert maps(db) == [(1000, 1, 'A'), (2000, 2, 'C'), (2001, 2, 'B')]
+
+
+def test_duplicate_keys_are_rejected(db):
+    seed(db)
+    errors, stat, pending = save(db, [['I', 1001, 'P1', 'A', 'Q1', None],
+                                      ['I', 3000, 'P2', 'D', 'Q1', None],
+                                      ['I', 3001, 'P2', 'D', 'Q1', None]])
+    assert len(errors) == 2
+    assert all('already exists' in error for error in errors)
+    assert stat['ninserted'] == 1
+    assert list(pending['article_code']) == [1001, 3001]
+
+
+def test_reverse_key_map_follows_the_keysets(db):
+    seed(db)
+    lookups = v.loadLookups(db, 'maps')
+    assert lookups['ids'] == {1: [(0, (1, 1, 'a'))], 2: [(0, (2, 1, 'b'))]}
+
+    v.unregisterKeys(lookups, 1)
+    assert lookups['keys'] == [{(2, 1, 'b'): 2}]
+    assert 1 not in lookups['ids']
+
+
+def test_inserted_ids_skip_records_that_already_had_the_key(db):
+    seed(db)
+    # A record that already has the key of the new row (e.g. loaded before the key was unique)
+    db.execute(text("INSERT INTO map(id, article_code, product_id, quality_id, logistic_info) "
+                    "VALUES (3, 3000, 1, 1, 'C')"))
+    rows = [v.setAdditionalParameters('maps', row) for row in (
+        {'article_code': 3001, 'product_id': 1, 'quality_id': 1, 'logistic_info': 'C'},
+        {'article_code': 3002, 'product_id': 2, 'quality_id': 1, 'logistic_info': 'C'})]
+
+    inserted = v.insertReturningIds('maps', db, rows, [])
+    ids = {row['article_code']: id for id, row in inserted}
+    assert db.execute(text("SELECT article_code, id FROM map WHERE id > 3 ORDER BY id")).all() == \
+        [(3001, ids[3001]), (3002, ids[3002])]
+
+
+def test_fk_ids_stay_integers_next_to_null_cells(db):
+    seed(db)
+    data = pd.DataFrame([['I', 3000, 'P1', 'A', 'Q1', None],
+                         ['I', 3001, None, 'B', 'Q1', None],
+                         ['I', 3002, 'P2', 'C', 'Q1', None]], columns=COLUMNS)
+    _, data = v.preProcData(db, data, 'maps')
+    rows2, errors = v.validateFrame('maps', data, [], v.loadLookups(db, 'maps'))
+
+    assert list(errors) == [1]
+    assert [(row2['product_id'], type(row2['product_id'])) for row2 in rows2.values()] == [(1, int), (2, int)]
+
+
+def test_inserted_ids_mixed_with_another_session_fail_the_upload(db, monkeypatch):
+    seed(db)
+    execute = db.execute
+
+    def concurrent_execute(statement, params=None, *args, **kwargs):
+        result = execute(statement, params, *args, **kwargs)
+        if str(statement).startswith('INSERT into map') and isinstance(params, list):
+            # Another session inserts the same key before the ids are read back
+            execute(text("INSERT INTO map(article_code, product_id, quality_id, logistic_info) "
+                         "VALUES (9999, 1, 1, 'C')"))
+        return result
+
+    monkeypatch.setattr(db, 'execute', concurrent_execute)
+    rows = [v.setAdditionalParameters('maps', {'article_code': 3001, 'product_id': 1, 'quality_id': 1,
+                                               'logistic_info': 'C'})]
+    with pytest.raises(RuntimeError, match="could not be read back"):
+        v.insertReturningIds('maps', db, rows, [])